@@ -0,0 +1,109 @@
+import argparse
+import json
+import resource
+import sys
+import time
+
+import numpy as np
+
+from bench.synthetic import tickers as fake_tickers
+from utils.live_chart import encode_points
+from utils.live_stream import DEFAULT_CAPACITY, LiveFeed, ReplaySource, make_source, synthetic_tape
+
+# 실시간 모드 부하 테스트 (네트워크 없이)
+# 가짜 테이프를 ReplaySource로 빠르게 재생하고, 여러 세션이 차트처럼 주기적으로 새 점만 읽어 가는 상황을 흉내 냅니다.
+# - latency: 점이 테이프상 나와야 하는 시각부터 세션이 그 점을 읽은 시각까지 (초)
+# - delta_bytes: 한 번에 브라우저로 보내는 JSON 크기 (새 점만)
+# - peak_rss_mb: 프로세스 최대 메모리 (링 버퍼 덕분에 재생 시간이 길어져도 늘지 않아야 합니다)
+#
+# 사용법:
+#   python -m bench.live --tickers 50 --speed 600 --seconds 20 --sessions 10
+#   python -m bench.live --record tape.csv --source yfinance --seconds 600 AAPL MSFT   # 실제 장중 데이터 녹화
+
+
+def _peak_rss_mb():
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def load_test(n_tickers, speed, seconds, sessions, refresh, capacity, step_seconds):
+    names = fake_tickers(n_tickers)
+    # 재생 시간보다 긴 테이프를 만들어 한 바퀴 안에서 측정합니다.
+    minutes = max(60, int(seconds * speed / 60) + 1)
+    source = ReplaySource(synthetic_tape(names, minutes=minutes, step_seconds=step_seconds), speed=speed)
+    feed = LiveFeed(source, names, capacity=capacity)
+    feed.ensure_running()
+
+    latencies, delta_bytes, points_read = [], [], 0
+    cursors = [None] * sessions
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        tick = time.monotonic()
+        for i in range(sessions):
+            points, cursors[i] = feed.delta(names, cursors[i])
+            now = time.monotonic()
+            if not points or source._started is None:
+                continue
+            base = {t: values[0] for t, (_, values) in points.items()}
+            delta_bytes.append(len(json.dumps(encode_points(points, base))))
+            for times, _ in points.values():
+                points_read += len(times)
+                due = source._started + (times - source.tape_start) / speed / 1e9
+                latencies.append(now - due)
+        time.sleep(max(0.0, refresh - (time.monotonic() - tick)))
+
+    latencies = np.concatenate([np.atleast_1d(x) for x in latencies]) if latencies else np.array([0.0])
+    return {
+        "tickers": n_tickers,
+        "sessions": sessions,
+        "speed": speed,
+        "points_per_second": round(points_read / sessions / seconds, 1),
+        "latency_p50_s": round(float(np.percentile(latencies, 50)), 3),
+        "latency_p95_s": round(float(np.percentile(latencies, 95)), 3),
+        "latency_max_s": round(float(latencies.max()), 3),
+        "delta_bytes_p95": int(np.percentile(delta_bytes, 95)) if delta_bytes else 0,
+        "buffered_points": sum(len(b) for b in feed.book._buffers.values()),
+        "peak_rss_mb": _peak_rss_mb(),
+    }
+
+
+def record(path, source_kind, tickers, seconds):
+    """공급자에서 seconds초 동안 받은 점을 테이프 파일(CSV 또는 Parquet)로 저장합니다."""
+    feed = LiveFeed(make_source(source_kind, tickers), tickers, capacity=DEFAULT_CAPACITY * 10)
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        feed.ensure_running()
+        time.sleep(1)
+    tape = feed.book.to_tape()
+    if str(path).endswith(".parquet"):
+        tape.to_parquet(path, index=False)
+    else:
+        tape.to_csv(path, index=False)
+    return len(tape)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="실시간 모드 부하 테스트 (ReplaySource)")
+    parser.add_argument("--tickers", type=int, default=50)
+    parser.add_argument("--speed", type=float, default=600, help="재생 배속")
+    parser.add_argument("--seconds", type=float, default=20)
+    parser.add_argument("--sessions", type=int, default=10, help="동시에 읽는 세션 수")
+    parser.add_argument("--refresh", type=float, default=0.5, help="세션이 새 점을 읽는 간격 (초)")
+    parser.add_argument("--capacity", type=int, default=DEFAULT_CAPACITY)
+    parser.add_argument("--step-seconds", type=int, default=60, help="테이프의 점 간격 (초)")
+    parser.add_argument("--record", help="부하 테스트 대신 공급자의 데이터를 이 파일에 녹화합니다.")
+    parser.add_argument("--source", default="yfinance", help="--record에 쓸 공급자")
+    parser.add_argument("symbols", nargs="*", help="--record할 티커")
+    args = parser.parse_args(argv)
+
+    if args.record:
+        count = record(args.record, args.source, args.symbols or fake_tickers(args.tickers), args.seconds)
+        print(f"{count}개 점을 {args.record}에 저장했습니다.")
+        return 0
+    result = load_test(args.tickers, args.speed, args.seconds, args.sessions, args.refresh,
+                       args.capacity, args.step_seconds)
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,277 @@
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+# 페이지 벤치마크
+# 각 페이지를 Streamlit AppTest로 화면 없이, 네트워크 없이(가짜 데이터) 실행하고 다음을 기록합니다.
+# - first_run_s: 새 프로세스에서 처음 실행한 시간 (import 포함)
+# - cold_s:      시나리오 입력(업로드, 학생 수 등)을 넣고 처음 실행한 시간 (캐시 미스)
+# - warm_s:      같은 입력으로 다시 실행한 시간 (캐시 적중)
+# - peak_rss_mb: 프로세스 최대 메모리
+# - payload_bytes: 페이지가 브라우저로 보내는 요소(proto)의 크기 합 (HTML, JSON, 표 포함)
+# - heavy_imports: 첫 실행 동안 불러온 무거운 라이브러리 (utils.warmup.HEAVY_MODULES 중)
+# 따로, 무거운 라이브러리마다 새 프로세스에서 `python -X importtime`으로 잰 import 시간도 기록합니다. (imports)
+# 시나리오마다 새 프로세스에서 돌려 서로의 캐시와 메모리에 영향을 주지 않게 합니다.
+#
+# 사용법:
+#   python -m bench.run --scale small
+#   python -m bench.run --scale medium --baseline bench/results/이전결과.json --fail-on-regression
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+RESULTS_DIR = ROOT_DIR / "bench" / "results"
+
+SCALES = {
+    "small": {"spots": 50, "tickers": 10, "years": 3, "map_countries": 50,
+              "trend_countries": 20, "trend_years": 30, "students": 29},
+    "medium": {"spots": 2_000, "tickers": 50, "years": 5, "map_countries": 177,
+               "trend_countries": 200, "trend_years": 60, "students": 500},
+    "large": {"spots": 20_000, "tickers": 200, "years": 10, "map_countries": 177,
+              "trend_countries": 2_000, "trend_years": 60, "students": 5_000},
+}
+
+# 시나리오 이름 -> 페이지 경로
+PAGES = {
+    "main": "main.py",
+    "stocks": "pages/00_주식데이터시각화.py",
+    "carbon_map": "pages/01_세계의 나라별 탄소배출량.py",
+    "emission_trend": "pages/02_그래프그리기.py",
+    "friends": "fold/친구관계그래프.py",
+}
+METRICS = ("first_run_s", "cold_s", "warm_s", "peak_rss_mb", "payload_bytes")
+
+
+# --- 시나리오 준비 (작업 프로세스 안에서 실행) ---
+
+def _setup(name, params, workdir):
+    """(환경 변수, 첫 실행 뒤 입력을 넣는 함수 또는 None)"""
+    from bench import synthetic
+
+    env = {
+        # 모든 디스크 캐시를 작업 폴더로 돌려 매번 캐시가 빈 상태에서 시작합니다.
+        "STOCK_STORE_DIR": str(workdir / "prices"),
+        "UPLOAD_CACHE_DIR": str(workdir / "uploads"),
+        "IMAGE_CACHE_DIR": str(workdir / "images"),
+        "IMAGE_STATIC_DIR": str(workdir / "static-images"),
+        "IMAGE_PROXY_FETCH": "0",
+        "FRIEND_DB_PATH": str(workdir / "friends.sqlite3"),
+        "APP_WARMUP": "0",  # 미리 불러오기가 첫 실행의 import 측정을 흐리지 않도록
+        "STOCK_PREFETCH": "0",  # 주가 미리 받기 없이, 첫 방문이 직접 받는 경우(가장 느린 경우)를 잽니다.
+    }
+    interact = None
+
+    if name == "main":
+        env["SAPPORO_SPOTS_FILE"] = str(synthetic.write_spots(workdir / "spots.json", params["spots"]))
+    elif name == "stocks":
+        names = synthetic.write_price_fixtures(workdir / "fixtures", params["tickers"], params["years"])
+        env["STOCK_PROVIDER"] = f"fixture:{workdir / 'fixtures'}"
+        env["STOCK_TICKERS"] = ",".join(names)
+    elif name == "carbon_map":
+        upload = synthetic.map_emissions(params["map_countries"])
+        interact = lambda at: at.sidebar.file_uploader[0].set_value(upload)
+    elif name == "emission_trend":
+        upload = synthetic.trend_emissions(params["trend_countries"], params["trend_years"])
+        interact = lambda at: at.file_uploader[0].set_value(upload)
+    elif name == "friends":
+        synthetic.seed_responses(env["FRIEND_DB_PATH"], params["students"])
+        interact = lambda at: at.sidebar.number_input[0].set_value(params["students"])
+    else:
+        raise ValueError(f"알 수 없는 시나리오: {name}")
+    return env, interact
+
+
+def _payload_bytes(at):
+    """화면에 그려진 모든 요소의 proto 크기 합"""
+    total = 0
+    for node in at._tree:
+        proto = getattr(node, "proto", None)
+        if proto is not None and hasattr(proto, "ByteSize"):
+            if not hasattr(node, "children"):  # 블록(컨테이너)은 자식 크기가 중복되지 않도록 뺍니다.
+                total += proto.ByteSize()
+    return total
+
+
+def _timed(at):
+    start = time.perf_counter()
+    at.run()
+    return round(time.perf_counter() - start, 4)
+
+
+def run_worker(name, scale, workdir, timeout):
+    params = SCALES[scale]
+    workdir = Path(workdir)
+    env, interact = _setup(name, params, workdir)
+    os.environ.update(env)
+    os.chdir(workdir)  # 페이지가 상대 경로로 쓰는 파일이 저장소를 건드리지 않도록
+    if str(ROOT_DIR) not in sys.path:
+        sys.path.insert(0, str(ROOT_DIR))
+
+    from streamlit.testing.v1 import AppTest
+    from utils.warmup import HEAVY_MODULES
+
+    at = AppTest.from_file(str(ROOT_DIR / PAGES[name]), default_timeout=timeout)
+    already_loaded = {m for m in HEAVY_MODULES if m in sys.modules}
+    first = _timed(at)
+    heavy_imports = [m for m in HEAVY_MODULES if m in sys.modules and m not in already_loaded]
+    if interact is not None:
+        interact(at)
+        cold = _timed(at)
+    else:
+        cold = first
+    warm = _timed(at)
+
+    return {
+        "first_run_s": first,
+        "cold_s": cold,
+        "warm_s": warm,
+        # ru_maxrss: 리눅스는 KB, macOS는 바이트 단위
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+                             / (1024 * 1024 if sys.platform == "darwin" else 1024), 1),
+        "payload_bytes": _payload_bytes(at),
+        "heavy_imports": heavy_imports,
+        "exceptions": [e.message[:500] for e in at.exception],
+    }
+
+
+# --- 실행과 비교 (부모 프로세스) ---
+
+def import_time(module):
+    """새 프로세스에서 module을 불러오는 데 걸린 시간 (초, 하위 모듈 포함). 불러올 수 없으면 None"""
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                          cwd=ROOT_DIR, capture_output=True, text=True)
+    if proc.returncode != 0:
+        return None
+    # stderr 줄 형식: "import time:  self [us] | cumulative | imported package"
+    for line in proc.stderr.splitlines():
+        parts = line.split("|")
+        if len(parts) == 3 and parts[2].strip() == module:
+            return round(int(parts[1]) / 1e6, 4)
+    return None
+
+
+def import_report():
+    from utils.warmup import HEAVY_MODULES
+
+    return {module: import_time(module) for module in ("streamlit", "pandas", *HEAVY_MODULES)}
+
+
+def run_scenario(name, scale, timeout):
+    with tempfile.TemporaryDirectory(prefix=f"bench-{name}-") as workdir:
+        proc = subprocess.run(
+            [sys.executable, "-m", "bench.run", "--worker", name, "--scale", scale,
+             "--workdir", workdir, "--timeout", str(timeout)],
+            cwd=ROOT_DIR, capture_output=True, text=True,
+            env={**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [str(ROOT_DIR), os.environ.get("PYTHONPATH")]))},
+        )
+    if proc.returncode != 0:
+        return {"error": (proc.stderr or proc.stdout)[-2000:]}
+    # 마지막 줄이 결과 JSON입니다. (그 앞은 페이지나 라이브러리가 찍은 로그)
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def compare(results, baseline, threshold):
+    """기준 결과와 비교해 (표 문자열 줄 목록, 느려진 항목 목록)을 돌려줍니다."""
+    lines = [f"{'시나리오':<16}{'지표':<15}{'기준':>12}{'이번':>12}{'변화':>9}"]
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get("results", {}).get(name)
+        if not base or "error" in base or "error" in result:
+            continue
+        for metric in METRICS:
+            old, new = base.get(metric), result.get(metric)
+            if not old or new is None:
+                continue
+            change = new / old - 1
+            mark = ""
+            if change > threshold:
+                mark = " !"
+                regressions.append((name, metric, old, new))
+            lines.append(f"{name:<16}{metric:<15}{old:>12}{new:>12}{change:>+8.0%}{mark}")
+    return lines, regressions
+
+
+def _git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR,
+                              capture_output=True, text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="페이지 벤치마크 (AppTest, 가짜 데이터)")
+    parser.add_argument("--scale", choices=list(SCALES), default="small")
+    parser.add_argument("--scenario", action="append", choices=list(PAGES),
+                        help="돌릴 시나리오 (여러 번 지정 가능, 기본값: 전부)")
+    parser.add_argument("--out", help="결과 JSON 경로 (기본값: bench/results/<시각>-<규모>.json)")
+    parser.add_argument("--baseline", help="비교할 이전 결과 JSON")
+    parser.add_argument("--threshold", type=float, default=0.2, help="이 비율보다 나빠지면 느려진 것으로 봅니다.")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    parser.add_argument("--timeout", type=float, default=600, help="페이지 실행 한 번의 제한 시간 (초)")
+    parser.add_argument("--skip-imports", action="store_true", help="라이브러리별 import 시간 측정을 건너뜁니다.")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    parser.add_argument("--workdir", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        print(json.dumps(run_worker(args.worker, args.scale, args.workdir, args.timeout), ensure_ascii=False))
+        return 0
+
+    results = {}
+    for name in args.scenario or list(PAGES):
+        print(f"[{args.scale}] {name} ...", flush=True)
+        results[name] = run_scenario(name, args.scale, args.timeout)
+        result = results[name]
+        if "error" in result:
+            print(f"  실패:\n{result['error']}")
+        else:
+            print("  " + ", ".join(f"{m}={result[m]}" for m in METRICS)
+                  + (f"  (페이지 예외 {len(result['exceptions'])}개)" if result["exceptions"] else ""))
+            print("  불러온 라이브러리: " + (", ".join(result["heavy_imports"]) or "없음"))
+
+    imports = {}
+    if not args.skip_imports:
+        print("라이브러리별 import 시간 (새 프로세스, 초)", flush=True)
+        imports = import_report()
+        for module, seconds in imports.items():
+            print(f"  {module:<16}{'설치 안 됨' if seconds is None else seconds}")
+
+    report = {
+        "meta": {
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "scale": args.scale,
+            "params": SCALES[args.scale],
+            "git_revision": _git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "results": results,
+        "imports": imports,
+    }
+    out = Path(args.out) if args.out else RESULTS_DIR / f"{datetime.now():%Y%m%d-%H%M%S}-{args.scale}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"결과 저장: {out}")
+
+    failed = any("error" in r or r.get("exceptions") for r in results.values())
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        lines, regressions = compare(results, baseline, args.threshold)
+        print("\n".join(lines))
+        if regressions:
+            print(f"{args.threshold:.0%} 넘게 나빠진 항목 {len(regressions)}개")
+            failed = failed or args.fail_on_regression
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,122 @@
+import io
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# 벤치마크용 가짜 데이터 생성기
+# 네트워크 없이 각 페이지를 원하는 규모로 돌릴 수 있도록 입력 데이터를 만듭니다.
+# 모든 생성기는 seed가 같으면 같은 데이터를 만듭니다.
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+
+
+def tickers(n):
+    """가짜 티커 이름 n개 (T0000, T0001, ...)"""
+    return [f"T{i:04d}" for i in range(n)]
+
+
+def write_price_fixtures(directory, n_tickers, years, seed=0, end=None):
+    """티커마다 <티커>.csv(Date, Close) 파일을 만들어 FixtureProvider가 읽게 합니다. 티커 목록을 돌려줍니다."""
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    end = pd.Timestamp(end or pd.Timestamp.now().normalize())
+    dates = pd.bdate_range(end=end, periods=int(years * 252))
+    names = tickers(n_tickers)
+    for ticker in names:
+        # 기하 브라운 운동 (일간 수익률 평균 0.03%, 변동성 2%)
+        returns = rng.normal(0.0003, 0.02, len(dates))
+        close = 100 * np.exp(np.cumsum(returns))
+        pd.DataFrame({"Close": close.round(4)}, index=pd.Index(dates, name="Date")).to_csv(directory / f"{ticker}.csv")
+    return names
+
+
+def country_codes(n):
+    """지도에 있는 ISO3 나라 코드 n개 (모자라면 가짜 코드로 채웁니다)"""
+    with open(ROOT_DIR / "pages" / "world-countries.json", encoding="utf-8") as f:
+        codes = sorted({feature["id"] for feature in json.load(f)["features"]})
+    codes += [f"X{i:03d}" for i in range(max(0, n - len(codes)))]
+    return codes[:n]
+
+
+def _to_bytes(df, fmt):
+    buffer = io.BytesIO()
+    if fmt == "csv":
+        buffer.write(df.to_csv(index=False).encode("utf-8"))
+    else:
+        df.to_excel(buffer, index=False, engine="openpyxl")
+    return buffer.getvalue()
+
+
+def map_emissions(n_countries, seed=0, fmt="xlsx"):
+    """탄소배출량 지도 페이지(01)에 올릴 파일 (country_code, emission_mt). (파일 이름, 바이트, MIME 형식)"""
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "country_code": country_codes(n_countries),
+        "emission_mt": rng.lognormal(3, 1.5, n_countries).round(2),
+    })
+    return _upload(f"map_emissions.{fmt}", _to_bytes(df, fmt), fmt)
+
+
+def trend_emissions(n_countries, years, seed=0, fmt="xlsx", start_year=1960):
+    """연도별 추이 페이지(02)에 올릴 파일 (연도, 나라, 탄소배출량). (파일 이름, 바이트, MIME 형식)"""
+    rng = np.random.default_rng(seed)
+    countries = [f"나라{i:04d}" for i in range(n_countries)]
+    year_values = np.arange(start_year, start_year + years)
+    base = rng.lognormal(3, 1.5, n_countries)
+    growth = rng.normal(0.02, 0.02, n_countries)
+    df = pd.DataFrame({
+        "연도": np.tile(year_values, n_countries),
+        "나라": np.repeat(countries, years),
+        "탄소배출량": (np.repeat(base, years) * np.exp(np.outer(growth, year_values - start_year)).ravel()).round(2),
+    })
+    return _upload(f"trend_emissions.{fmt}", _to_bytes(df, fmt), fmt)
+
+
+def _upload(name, data, fmt):
+    mime = "text/csv" if fmt == "csv" else "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    return name, data, mime
+
+
+def seed_responses(db_path, n_students, class_id="기본", seed=0):
+    """설문 응답 n_students개를 저장소에 넣습니다. (방 친구 3명, 짝 1명, 대화 상대 2~10명)"""
+    from utils.response_store import ResponseStore
+
+    rng = np.random.default_rng(seed)
+    store = ResponseStore(db_path)
+    students = np.arange(1, n_students + 1)
+    for student in students.tolist():
+        # 번호가 가까운 학생을 더 자주 고르도록 해서 무리(모둠)가 생기게 합니다.
+        others = students[students != student]
+        weights = 1.0 / (1 + np.abs(others - student))
+        weights /= weights.sum()
+        talk_count = int(rng.integers(2, 11))
+        picks = rng.choice(others, size=min(4 + talk_count, len(others)), replace=False, p=weights).tolist()
+        store.submit(student, picks[:3], picks[3] if len(picks) > 3 else None, picks[4:], class_id=class_id)
+    return store.version(class_id)
+
+
+def write_spots(path, n_spots, seed=0):
+    """홋카이도 안에 흩어진 관광지 n_spots곳을 JSON으로 씁니다. 이미지 주소는 받을 수 없는 가짜 주소입니다."""
+    rng = np.random.default_rng(seed)
+    # 절반은 삿포로 주변, 나머지는 홋카이도 전역
+    near = n_spots // 2
+    lats = np.concatenate([rng.normal(43.06, 0.05, near), rng.uniform(41.5, 45.4, n_spots - near)])
+    lons = np.concatenate([rng.normal(141.35, 0.07, near), rng.uniform(139.8, 145.5, n_spots - near)])
+    spots = [
+        {
+            "name": f"관광지 {i}",
+            "lat": round(float(lat), 5),
+            "lon": round(float(lon), 5),
+            "description": f"벤치마크용 관광지 {i}번입니다.",
+            "image_url": f"https://example.invalid/spots/{i}.jpg",
+        }
+        for i, (lat, lon) in enumerate(zip(lats, lons))
+    ]
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(spots, f, ensure_ascii=False)
+    return path
@@ -1,16 +1,44 @@
+import sys
+import time
+import uuid
+from pathlib import Path
+
 import streamlit as st
-import pandas as pd
-import networkx as nx
-import matplotlib.pyplot as plt
-from pyvis.network import Network # 인터랙티브 그래프를 위해 pyvis 사용 권장
+
+# 프로젝트 루트의 utils 패키지를 불러올 수 있도록 경로에 추가합니다.
+ROOT_DIR = str(Path(__file__).resolve().parent.parent)
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from utils import instrument
+from utils.graph_layout import LayoutCache
+from utils.graph_render import delta_data, graph_data, graph_options
+from utils.relation_graph import EDGE_STYLES, RelationGraph
+from utils.relation_map import relation_map
+from utils.response_store import DEFAULT_CLASS_ID, ResponseStore
+from utils.sociometry import analyze
 
 st.set_page_config(layout="wide")
+instrument.start_run("friends")
 
 st.title("중학교 학생 관계 시각화 맵")
 
+# 응답 저장소: 서버 프로세스 하나에 하나만 만들어 모든 세션이 공유합니다.
+@instrument.cached(st.cache_resource)
+def get_response_store():
+    return ResponseStore()
+
+store = get_response_store()
+class_id = st.sidebar.text_input("학급 이름", value=DEFAULT_CLASS_ID)
+class_size = int(st.sidebar.number_input("학생 수", min_value=2, max_value=100_000, value=29, step=1))
+students = range(1, class_size + 1)
+SERVER_LAYOUT = "서버에서 계산 (고정 배치)"
+layout_mode = st.sidebar.radio("관계 맵 배치", [SERVER_LAYOUT, "브라우저 물리 엔진"],
+                               help="학생 수가 많으면 서버 배치를 쓰세요. 브라우저 물리 엔진은 노드가 수백 개를 넘으면 화면이 멈출 수 있습니다.")
+
 # --- 1. 학생 이름 선택 (자신의 번호) ---
 st.header("1. 당신은 몇 번 학생입니까?")
-student_id = st.selectbox("자신의 학생 번호를 선택하세요:", options=range(1, 30))
+student_id = st.selectbox("자신의 학생 번호를 선택하세요:", options=students)
 st.write(f"당신은 {student_id}번 학생입니다.")
 
 # --- 2. 설문 질문 ---
@@ -18,81 +46,112 @@ st.header("2. 친구 관계 설문")
 
 # 질문 1: 수련회 방 (3명 선택)
 st.subheader("질문 1. 수련회에서 4명이 함께 방을 사용해야 한다면 누구와 함께 방을 사용하고 싶니? (3명 선택)")
-room_friends_options = [f"학생 {i}" for i in range(1, 30) if i != student_id]
+room_friends_options = [f"학생 {i}" for i in students if i != student_id]
 room_friends = st.multiselect("3명의 친구를 선택하세요:", options=room_friends_options, max_selections=3)
 room_friends_ids = [int(s.split(' ')[1]) for s in room_friends]
 
 # 질문 2: 교실 짝 (1명 선택)
 st.subheader("질문 2. 교실에서 짝이 되고 싶은 학생이 누구니? (1명 선택)")
-pair_friend_options = [f"학생 {i}" for i in range(1, 30) if i != student_id]
+pair_friend_options = [f"학생 {i}" for i in students if i != student_id]
 pair_friend = st.selectbox("1명의 친구를 선택하세요:", options=pair_friend_options)
 pair_friend_id = int(pair_friend.split(' ')[1]) if pair_friend else None
 
 # 질문 3: 대화 상대 (모두 선택)
 st.subheader("질문 3. 최근 3일간 누구와 대화를 나누었니? (모두 선택)")
-talk_friends_options = [f"학생 {i}" for i in range(1, 30) if i != student_id]
+talk_friends_options = [f"학생 {i}" for i in students if i != student_id]
 talk_friends = st.multiselect("대화 나눈 친구를 모두 선택하세요:", options=talk_friends_options)
 talk_friends_ids = [int(s.split(' ')[1]) for s in talk_friends]
 
-# --- 3. 데이터 저장 및 처리 (예시: 실제로는 DB 또는 파일에 저장) ---
-# 여기서는 간단히 세션 상태에 저장하여 시각화에 사용
-if 'responses' not in st.session_state:
-    st.session_state.responses = []
-
+# --- 3. 데이터 저장 및 처리 ---
+# 응답은 SQLite 저장소(WAL 모드)에 저장되어 모든 세션이 같은 응답을 보고, 서버를 다시 시작해도 남아 있습니다.
+# 같은 학생이 다시 제출하면 이전 응답을 새 응답으로 바꿉니다.
 if st.button("응답 제출"):
-    st.session_state.responses.append({
-        'student_id': student_id,
-        'room_friends': room_friends_ids,
-        'pair_friend': pair_friend_id,
-        'talk_friends': talk_friends_ids
-    })
+    store.submit(student_id, room_friends_ids, pair_friend_id, talk_friends_ids, class_id=class_id)
     st.success(f"{student_id}번 학생의 응답이 제출되었습니다!")
 
-# --- 4. 관계 맵 시각화 ---
-st.header("3. 학생 관계 시각화 맵")
-
-if st.session_state.responses:
-    G = nx.Graph()
+# 관계 분석은 응답 집합의 버전마다 한 번만 계산합니다. 새 응답이 들어와 버전이 바뀔 때만 다시 계산합니다.
+@instrument.cached(st.cache_data(max_entries=32, show_spinner="관계를 분석하는 중..."))
+def analyze_class(class_id, class_size, version, _compact, _choices, _responded):
+    with instrument.stage("관계 분석"):
+        return analyze(_compact, _choices, _responded)
 
-    # 모든 학생 노드 추가 (29명)
-    for i in range(1, 30):
-        G.add_node(i)
+# 서버 배치: 학급 그래프마다 하나씩 두고, 새로 연결된 학생만 배치합니다.
+@instrument.cached(st.cache_resource)
+def get_layout_cache(class_id, class_size):
+    return LayoutCache()
 
-    # 엣지 추가 및 가중치/속성 부여
-    for response in st.session_state.responses:
-        current_student = response['student_id']
+# 관계 그래프는 학급마다 서버 프로세스에 하나만 두고, 새로 들어오거나 바뀐 응답만 반영합니다.
+@instrument.cached(st.cache_resource)
+def get_relation_graph(class_id, class_size):
+    return RelationGraph(students=range(1, class_size + 1)) # 모든 학생 노드 추가
 
-        # 질문 1: 친밀한 관계
-        for friend in response['room_friends']:
-            G.add_edge(current_student, friend, type='친밀', weight=2, color='skyblue', width=2) # width는 pyvis에서 사용
+with instrument.stage("그래프 만들기 (응답 반영)"):
+    graph = get_relation_graph(class_id, class_size)
+    graph.sync(store, class_id)
 
-        # 질문 2: 가장 친밀한 관계
-        if response['pair_friend']:
-            G.add_edge(current_student, response['pair_friend'], type='가장_친밀', weight=3, color='red', width=4)
+# 관계 맵은 브라우저가 그래프를 들고 있고, 서버는 이 세션에 마지막으로 보낸 버전 이후에 바뀐 노드와 엣지만 보냅니다.
+# 처음이거나, 배치 방식이 바뀌었거나, 브라우저가 그래프를 잃었다고 알리면 전체를 다시 보냅니다.
+MAP_KEY = "relation_map"
+MAP_ACK_SECONDS = 2  # 전체를 보낸 뒤 브라우저의 응답을 기다리는 시간
 
-        # 질문 3: 약간 친밀한 관계
-        for friend in response['talk_friends']:
-            # 중복 엣지 방지 (이미 더 강한 관계가 있다면 추가하지 않음)
-            if not G.has_edge(current_student, friend) or G[current_student][friend].get('type') not in ['가장_친밀', '친밀']:
-                G.add_edge(current_student, friend, type='약간_친밀', weight=1, color='lightgray', width=1)
+# 전체 노드/엣지 목록은 그래프 버전(과 배치)마다 한 번만 만들어 여러 세션이 함께 씁니다.
+@instrument.cached(st.cache_resource(max_entries=8))
+def full_map_data(class_id, class_size, version, layout_key, _compact, _positions):
+    return graph_data(_compact, _positions)
 
+reader = st.session_state.setdefault('graph_reader', uuid.uuid4().hex)
 
-    # Pyvis를 이용한 인터랙티브 그래프
-    net = Network(height="750px", width="100%", bgcolor="#222222", font_color="white", notebook=True)
-    net.toggle_physics(True) # 노드 간의 물리적 힘 적용
-
-    for node in G.nodes():
-        net.add_node(node, label=str(node), title=f"학생 {node}")
-
-    for edge in G.edges(data=True):
-        source, target, data = edge
-        net.add_edge(source, target, title=data['type'], color=data['color'], width=data['width'])
+# --- 4. 관계 맵 시각화 ---
+st.header("3. 학생 관계 시각화 맵")
 
-    # HTML 파일로 저장하고 Streamlit에 임베드
-    net.save_graph("student_relationships.html")
-    with open("student_relationships.html", 'r', encoding='utf-8') as f:
-        html_content = f.read()
-    st.components.v1.html(html_content, height=800, scrolling=True)
+changes = None
+if graph.version > 0:
+    # 엣지 속성은 관계 강도로 정해집니다. 두 학생이 서로 다른 질문에서 서로를 골랐다면 더 강한 관계를 씁니다.
+    # 그래프는 배열(CompactGraph)로 내보내고, 버전이 그대로면 다시 만들지 않습니다.
+    version, compact, choices, responded = graph.export()
+
+    # vis.js를 이용한 인터랙티브 그래프 (utils/relation_map.py)
+    server_layout = layout_mode == SERVER_LAYOUT
+    positions, layout_key = None, None
+    if server_layout:
+        # 배치는 그래프 버전마다 서버에서 한 번만 계산하고, 브라우저의 물리 엔진은 끕니다.
+        layout = get_layout_cache(class_id, class_size)
+        if st.sidebar.button("배치 다시 계산"):
+            layout.reset()
+        with instrument.stage("서버 배치 계산"):
+            positions = layout.positions(version, compact)
+        layout_key = layout.generation
+
+    now = time.time()
+    view_key = (class_id, class_size, layout_mode, layout_key)
+    view = st.session_state.get('relation_map_view')
+    acked = st.session_state.get(MAP_KEY)
+    if view is not None and view['key'] == view_key and (acked == view['generation'] or now - view['sent_at'] <= MAP_ACK_SECONDS):
+        # 이 세션이 마지막으로 본 뒤에 바뀐 관계만 골라냅니다. (기록이 지워졌거나 움직인 노드를 모르면 전체)
+        changes = graph.changes_since(view['version'])
+        moved = layout.moved(view['version'], version) if server_layout else ()
+        if moved is None:
+            changes = None
+    full = changes is None
+    if full:
+        generation = view['generation'] + 1 if view is not None else 1
+        view = st.session_state['relation_map_view'] = {'key': view_key, 'generation': generation, 'sent_at': now}
+        with instrument.stage("관계 맵 데이터 (전체)"):
+            nodes, edges = full_map_data(class_id, class_size, version, layout_key, compact, positions)
+        removed = []
+    else:
+        with instrument.stage("관계 맵 데이터 (변경분)"):
+            nodes, edges, removed = delta_data(changes, compact, positions, moved)
+    view['version'] = version
+    graph.mark_seen(reader, version)
+
+    instrument.payload("relation_map", [nodes, edges, removed])
+    relation_map(nodes, edges, removed, view['generation'], full, graph_options("white", not server_layout),
+                 height=750, bgcolor="#222222", key=MAP_KEY)
+
+    if changes:
+        changed = [f"{a}–{b}: {EDGE_STYLES[strength]['type'] if strength else '관계 없음'}" for (a, b), strength in sorted(changes.edges.items())]
+        st.caption(f"마지막으로 본 뒤 바뀐 관계 {len(changed)}개: " + ", ".join(changed[:20]) + (" ..." if len(changed) > 20 else ""))
 
     st.write("---")
     st.write("**관계 맵 설명:**")
@@ -100,12 +159,35 @@ if st.session_state.responses:
     st.write("- **하늘색 보통 선:** 친밀한 관계 (수련회 방 친구)")
     st.write("- **회색 얇은 선:** 약간 친밀한 관계 (대화 나눈 친구)")
 
+    # --- 5. 관계 분석 ---
+    st.header("4. 학급 관계 분석")
+    report = analyze_class(class_id, class_size, version, compact, choices, responded)
+
+    col1, col2, col3 = st.columns(3)
+    col1.metric("고립 학생", f"{len(report['isolates'])}명")
+    col2.metric("짝 상호 선택 비율", f"{report['pair_reciprocity']:.0%}", help=f"짝 선택 {report['pair_choices']}건 중 서로 고른 비율")
+    col3.metric("모둠 수", f"{len(report['communities'])}개")
+
+    if report['isolates']:
+        st.warning("아무에게도 선택받지 못한 학생: " + ", ".join(f"{s}번" for s in report['isolates']))
+    if report['mutual_pairs']:
+        st.write("**서로 짝으로 고른 학생:** " + ", ".join(f"{a}–{b}" for a, b in report['mutual_pairs']))
+    for i, members in enumerate(report['communities'], start=1):
+        st.write(f"**모둠 {i}:** " + ", ".join(f"{s}번" for s in members))
+
+    st.dataframe(report['table'].sort_values('받은 선택', ascending=False), hide_index=True, use_container_width=True)
+    if report['betweenness_sampled']:
+        st.caption("학생 수가 많아 매개 중심성은 일부 학생을 표본으로 뽑아 근사한 값입니다.")
+
 else:
     st.info("학생들이 설문 응답을 제출하면 관계 맵이 여기에 표시됩니다.")
 
 st.markdown("---")
 st.markdown("### 개발 노트:")
-st.markdown("- **데이터 저장:** 실제 운영 환경에서는 `st.session_state` 대신 데이터베이스 (예: SQLite, PostgreSQL) 또는 CSV/JSON 파일에 응답을 저장하고 불러오는 로직이 필요합니다.")
-st.markdown("- **그래프 레이아웃:** `pyvis`는 자체적인 레이아웃 엔진을 가지고 있어 노드들이 서로 잘 보이도록 자동으로 배치됩니다. `networkx`를 `matplotlib`과 함께 사용할 경우 `nx.spring_layout`, `nx.circular_layout` 등을 사용하여 노드 위치를 조정할 수 있습니다.")
-st.markdown("- **사용자 경험:** 여러 학생이 동시에 접근하여 응답을 제출할 수 있도록 하려면 데이터 저장 방식을 더욱 견고하게 구현해야 합니다.")
+st.markdown("- **데이터 저장:** 응답은 SQLite 데이터베이스(`.cache/friends.sqlite3`, `FRIEND_DB_PATH` 환경 변수로 변경 가능)에 학급별로 저장됩니다. 같은 학생이 다시 제출하면 응답이 갱신됩니다.")
+st.markdown("- **그래프 레이아웃:** 기본으로 서버에서 힘 기반 배치를 한 번 계산해 고정된 좌표로 보내므로, 학생 수가 많아도 바로 열리고 새 응답이 들어와도 기존 학생의 위치가 바뀌지 않습니다. 사이드바에서 `pyvis`(vis.js)의 브라우저 물리 엔진 배치로 바꿀 수 있습니다.")
+st.markdown("- **사용자 경험:** 저장소는 WAL 모드와 제출 단위 트랜잭션을 사용하므로 여러 학생이 동시에 응답을 제출해도 안전합니다.")
 st.markdown("- **학생별 맵 보기:** 특정 학생이 선택한 관계만 보고 싶다면, 필터링 기능을 추가하여 해당 학생이 선택한 엣지만 강조하거나 보여줄 수 있습니다.")
+
+# 성능 측정 (APP_METRICS=1 또는 주소 뒤 ?debug=1일 때만)
+instrument.finish_run()
@@ -1,91 +1,146 @@
+import json
+import os
+from pathlib import Path
+
 import streamlit as st
-import folium
-from folium.plugins import MarkerCluster
-import pandas as pd
+
+from utils import instrument, warmup
+from utils.image_proxy import ImageProxy
+from utils.media import lazy_img, thumbnail_url, youtube_thumbnail
+from utils.preview import page_range
+from utils.spatial import load_index
+from utils.spot_map import POPUP_IMAGE_WIDTH, SAPPORO_CENTER, render_spot_map, spots_key
+
+# 데이터 파일 (관광지, 유튜브 브이로그)
+DATA_DIR = Path(__file__).resolve().parent
+# SAPPORO_SPOTS_FILE 환경 변수로 관광지 파일을 바꿀 수 있습니다. (벤치마크, 테스트용)
+SPOTS_FILE = Path(os.environ.get("SAPPORO_SPOTS_FILE", DATA_DIR / "sapporo_spots.json"))
+VLOGS_FILE = DATA_DIR / "sapporo_vlogs.json"
+SPOTS_PER_PAGE = 5
+VLOGS_PER_PAGE = 3
+DETAIL_IMAGE_WIDTH = 250  # 이미지는 페이지에서 실제로 보여주는 너비로 줄여 씁니다.
+VLOG_IMAGE_WIDTH = 300
+
+# 첫 화면 이미지
+HERO_IMAGE_URL = "https://i.ytimg.com/vi/NQymyZjjFw0/hq720.jpg?sqp=-oaymwEhCK4FEIIDSFryq4qpAxMIARUAAAAAGAElAADIQj0AgKJD&rs=AOn4CLDVZH224zSygXQ-8iawg_GnR_boUQ"
+HERO_IMAGE_WIDTH = 1280
+
+# 관광지 사진과 썸네일: 한 번 받아 줄인 WebP를 정적 폴더(static/images)에 만들어 두고 주소로 넣습니다.
+# 아직 만들지 못한 이미지는 원래 주소를 쓰고, 변형은 백그라운드에서 만듭니다.
+@instrument.cached(st.cache_resource)
+def get_image_proxy():
+    return ImageProxy()
+
+@instrument.cached(st.cache_data)
+def load_vlogs(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
 
 # 페이지 설정
 st.set_page_config(layout="wide", page_title="삿포로 관광 가이드")
+instrument.start_run("main")
 
 st.title("🌸 삿포로 주요 관광지 가이드 🌸")
 st.write("안녕하세요! 아름다운 삿포로 여행을 위한 친절하고 자세한 가이드에 오신 것을 환영합니다. 삿포로의 매력을 함께 탐험해볼까요?")
 
-st.image("https://i.ytimg.com/vi/NQymyZjjFw0/hq720.jpg?sqp=-oaymwEhCK4FEIIDSFryq4qpAxMIARUAAAAAGAElAADIQj0AgKJD&rs=AOn4CLDVZH224zSygXQ-8iawg_GnR_boUQ", caption="삿포로의 아름다운 풍경 (출처: youtube)", use_column_width=True)
+st.markdown(lazy_img(get_image_proxy().src(HERO_IMAGE_URL, HERO_IMAGE_WIDTH), "삿포로의 아름다운 풍경", width=HERO_IMAGE_WIDTH, style="width:100%;"), unsafe_allow_html=True)
+st.caption("삿포로의 아름다운 풍경 (출처: youtube)")
 
 st.header("🗺️ 삿포로 주요 관광지 지도")
 st.write("아래 지도에서 삿포로의 주요 관광지들을 한눈에 확인해보세요! 각 마커를 클릭하면 간단한 정보를 볼 수 있습니다.")
 
 # 삿포로 중심 좌표
-sapporo_coords = [43.0642, 141.3469]
-
-# 관광지 데이터 (Visit Sapporo 이미지 링크로 업데이트)
-tourist_spots = [
-    {"name": "오도리 공원", "lat": 43.0630, "lon": 141.3537,
-     "description": "삿포로 시내 중심을 가로지르는 아름다운 공원입니다. 사계절 내내 다양한 행사와 축제가 열립니다. 삿포로 눈 축제, 라일락 축제 등.",
-     "image_url": "https://www.sapporo.travel/cms/wp-content/uploads/2020/10/f_odoripark_01main-1200x600-1.jpg"},
-    {"name": "삿포로 TV 타워", "lat": 43.0614, "lon": 141.3571,
-     "description": "오도리 공원 동쪽 끝에 위치한 삿포로의 랜드마크입니다. 전망대에서 삿포로 시내를 한눈에 조망할 수 있습니다.",
-     "image_url": "https://visit.sapporo.travel/ko/wp-content/uploads/sites/8/2022/09/spot_tvtower-2.jpg"},
-    {"name": "삿포로 시계탑", "lat": 43.0634, "lon": 141.3524,
-     "description": "삿포로의 상징적인 건축물로, 1878년에 지어진 유서 깊은 건물입니다. 붉은 지붕과 흰 벽이 인상적입니다.",
-     "image_url": "https://www.sapporo.travel/cms/wp-content/uploads/2020/10/tokeidaiMV_slide1.jpg"},
-    {"name": "삿포로 맥주 박물관", "lat": 43.0766, "lon": 141.3725,
-     "description": "일본에서 가장 오래된 맥주 브랜드 중 하나인 삿포로 맥주의 역사와 양조 과정을 배울 수 있는 곳입니다. 시음도 가능합니다.",
-     "image_url": "https://encrypted-tbn0.gstatic.com/images?q=tbn:ANd9GcSln3-HKLIdCvKLkXf2T8X1sgnAg88lLQx-UQ&s"},
-    {"name": "홋카이도 구 본청사 (아카렌가 청사)", "lat": 43.0620, "lon": 141.3510,
-     "description": "붉은 벽돌로 지어진 아름다운 건물로, 홋카이도 개척 시대의 상징입니다. 내부에는 박물관과 자료실이 있습니다.",
-     "image_url": "https://www.sapporo.travel/cms/wp-content/uploads/2020/10/c005-012.jpg"},
-    {"name": "삿포로 팩토리", "lat": 43.0664, "lon": 141.3659,
-     "description": "옛 삿포로 맥주 공장 부지에 조성된 복합 쇼핑몰입니다. 쇼핑, 레스토랑, 영화관 등 다양한 시설이 있습니다.",
-     "image_url": "https://encrypted-tbn0.gstatic.com/images?q=tbn:ANd9GcQxE4zcrCrB2Nlo2Q74D5AGNwXF-_wBPDnPIg&s"},
-    {"name": "모이와 산 (모이와야마)", "lat": 43.0298, "lon": 141.3283,
-     "description": "삿포로 야경을 감상하기 좋은 명소입니다. 로프웨이를 타고 정상에 오르면 아름다운 삿포로의 파노라마 야경을 볼 수 있습니다.",
-     "image_url": "https://www.sapporo.travel/cms/wp-content/uploads/2020/10/moiwa-yakei-1200x600-1.jpg"},
-    {"name": "시로이 코이비토 파크", "lat": 43.0858, "lon": 141.2828,
-     "description": "홋카이도의 유명한 과자 '시로이 코이비토'를 테마로 한 테마파크입니다. 과자 만들기 체험, 정원, 카페 등이 있습니다.",
-     "image_url": "https://media.triple.guide/triple-cms/c_limit,f_auto,h_1024,w_1024/b723950c-e152-4bd9-8561-ae17a550dbc5.jpeg"},
-    {"name": "스스키노", "lat": 43.0563, "lon": 141.3524,
-     "description": "삿포로 최대의 번화가이자 유흥가입니다. 다양한 레스토랑, 바, 상점들이 밀집해 있으며 밤에는 화려한 네온사인으로 빛납니다.",
-     "image_url": "https://www.visit-hokkaido.jp/lsc/upfile/spot/0001/0009/10009_1_l.jpg"}
-]
-
-# Folium 지도 생성
-m = folium.Map(location=sapporo_coords, zoom_start=12, tiles="cartodbpositron")
-
-# 마커 클러스터 추가 (마커가 많을 경우 유용)
-marker_cluster = MarkerCluster().add_to(m)
-
-# 관광지 마커 추가
-for spot in tourist_spots:
-    html = f"""
-    <h4>{spot['name']}</h4>
-    <img src="{spot['image_url']}" alt="{spot['name']}" style="width:150px;height:auto;"><br>
-    <p>{spot['description']}</p>
-    """
-    iframe = folium.IFrame(html, width=200, height=250)
-    popup = folium.Popup(iframe, max_width=260)
-    folium.Marker(
-        location=[spot['lat'], spot['lon']],
-        popup=popup,
-        tooltip=spot['name'],
-        icon=folium.Icon(color='red', icon='info-sign')
-    ).add_to(marker_cluster)
-
-# 지도를 HTML로 저장 후 Streamlit에 표시
-st.components.v1.html(folium.Figure().add_child(m).render(), height=500)
+sapporo_coords = SAPPORO_CENTER
+
+# 관광지 데이터는 SPOTS_FILE(JSON)에서 읽어 격자 공간 색인에 담아 둡니다.
+# 파일이 바뀌면(수정 시각이 달라지면) 색인을 다시 만듭니다.
+@instrument.cached(st.cache_resource(max_entries=2))
+def get_spot_index(path, mtime):
+    return load_index(path)
+
+spot_index = get_spot_index(str(SPOTS_FILE), SPOTS_FILE.stat().st_mtime)
+
+# --- 사이드바: 관광지 검색 ---
+st.sidebar.header("🔎 관광지 찾기")
+search_mode = st.sidebar.radio("검색 방식", ["전체 보기", "반경 안의 관광지", "가까운 관광지", "지도 영역"])
+
+if search_mode == "전체 보기":
+    results = [(None, spot) for spot in spot_index.spots]
+    map_center = sapporo_coords
+elif search_mode == "지도 영역":
+    south, west = sapporo_coords[0] - 0.05, sapporo_coords[1] - 0.08
+    col_s, col_n = st.sidebar.columns(2)
+    south = col_s.number_input("남쪽 위도", value=south, format="%.4f")
+    north = col_n.number_input("북쪽 위도", value=sapporo_coords[0] + 0.05, format="%.4f")
+    col_w, col_e = st.sidebar.columns(2)
+    west = col_w.number_input("서쪽 경도", value=west, format="%.4f")
+    east = col_e.number_input("동쪽 경도", value=sapporo_coords[1] + 0.08, format="%.4f")
+    results = spot_index.bbox(south, west, north, east)
+    map_center = [(south + north) / 2, (west + east) / 2]
+else:
+    # 기준 위치: 삿포로 중심, 관광지 중 하나, 또는 직접 입력한 좌표
+    origin_options = ["삿포로 중심"] + [spot['name'] for spot in spot_index.spots] + ["직접 입력"]
+    origin = st.sidebar.selectbox("기준 위치", origin_options)
+    if origin == "삿포로 중심":
+        lat, lon = sapporo_coords
+    elif origin == "직접 입력":
+        lat = st.sidebar.number_input("위도", value=sapporo_coords[0], format="%.4f")
+        lon = st.sidebar.number_input("경도", value=sapporo_coords[1], format="%.4f")
+    else:
+        spot = spot_index.spots[origin_options.index(origin) - 1]
+        lat, lon = spot['lat'], spot['lon']
+
+    if search_mode == "반경 안의 관광지":
+        radius_km = st.sidebar.slider("반경 (km)", min_value=0.5, max_value=100.0, value=3.0, step=0.5)
+        results = spot_index.within(lat, lon, radius_km)
+    else:
+        k = st.sidebar.number_input("관광지 수", min_value=1, max_value=max(len(spot_index), 1), value=min(5, max(len(spot_index), 1)))
+        results = spot_index.nearest(lat, lon, int(k))
+    map_center = [lat, lon]
+
+result_spots = [spot for _, spot in results]
+st.sidebar.caption(f"전체 {len(spot_index)}곳 중 {len(result_spots)}곳")
+
+# 지도 HTML은 (검색 결과 관광지 목록, 지도 중심)의 내용 해시마다 한 번만 만들어 서버 프로세스에 캐시합니다.
+# (목록 자체는 _spots로 넘겨 해시 대상에서 빼고, 미리 계산한 spots_hash로만 캐시를 찾습니다.)
+# 팝업 사진을 아직 만드는 중이면 원래 주소로 그려 두고, 백그라운드 작업이 끝난 뒤 처음 실행될 때 한 번 더 그립니다.
+@instrument.cached(st.cache_resource(max_entries=32))
+def get_spot_map_html(spots_hash, center, images_ready, _spots):
+    proxy = get_image_proxy()
+    popup_src = lambda url: proxy.src(thumbnail_url(url, POPUP_IMAGE_WIDTH), POPUP_IMAGE_WIDTH)
+    with instrument.stage("folium 지도 렌더링"):
+        return render_spot_map(_spots, list(center), image_src=popup_src)
+
+with instrument.stage("팝업 이미지 확인"):
+    popup_waiting = get_image_proxy().prepare(
+        [thumbnail_url(spot['image_url'], POPUP_IMAGE_WIDTH) for spot in result_spots], POPUP_IMAGE_WIDTH
+    )
+# 캐시된 지도 HTML을 Streamlit에 표시
+instrument.html(get_spot_map_html(spots_key(result_spots), tuple(map_center), popup_waiting == 0, result_spots),
+                name="spot_map", height=500)
 
 # --- (이 줄이 76번 줄 근처일 가능성이 높습니다) ---
 st.markdown("---") # 76번째 줄 또는 그 주변일 수 있습니다.
 
 st.header("🌟 주요 관광지 상세 가이드")
 
-# 각 관광지에 대한 상세 정보 섹션
-for i, spot in enumerate(tourist_spots):
+# 각 관광지에 대한 상세 정보 섹션 (검색 결과만)
+if not results:
+    st.info("검색 조건에 맞는 관광지가 없습니다. 사이드바에서 범위를 넓혀보세요.")
+# 한 번에 SPOTS_PER_PAGE곳씩만 그리고, 이미지는 작은 크기로 화면에 보일 때만 불러옵니다.
+start, end = page_range(len(results), key="spot_detail_page", page_size=SPOTS_PER_PAGE, label="관광지 목록 쪽")
+page_results = results[start:end]
+image_srcs = [get_image_proxy().src(thumbnail_url(spot['image_url'], DETAIL_IMAGE_WIDTH), DETAIL_IMAGE_WIDTH) for _, spot in page_results]
+for i, (distance, spot), image_src in zip(range(start, end), page_results, image_srcs):
     st.subheader(f"{i+1}. {spot['name']}")
     col1, col2 = st.columns([1, 2])
     with col1:
-        st.image(spot['image_url'], caption=spot['name'], width=250)
+        st.markdown(lazy_img(image_src, spot['name'], width=DETAIL_IMAGE_WIDTH), unsafe_allow_html=True)
+        st.caption(spot['name'])
     with col2:
         st.write(f"**📍 위치:** 위도 {spot['lat']}, 경도 {spot['lon']}")
+        if distance is not None:
+            st.write(f"**📏 거리:** 기준 위치에서 약 {distance} km")
         st.write(f"**📝 설명:** {spot['description']}")
         st.write("더 자세한 정보를 원하시면 해당 장소의 공식 웹사이트나 여행 가이드를 참고해주세요!")
     st.markdown("---")
@@ -104,33 +159,21 @@ st.write("삿포로 여행의 생생함을 느껴보고 싶다면, 인기 유튜
 # https://img.youtube.com/vi/[VIDEO_ID]/mqdefault.jpg (중간 품질)
 # https://img.youtube.com/vi/[VIDEO_ID]/default.jpg (기본)
 # 대부분의 경우 mqdefault.jpg나 hqdefault.jpg가 안정적으로 작동합니다.
-youtube_vlogs = [
-    {
-        "title": "삿포로 혼자 여행 vlog 🇯🇵 역시 겨울 여행은 삿포로지❄️ 오타루, 르타오 디저트, 오르골당, 스프카레, 헌터 단톤 쇼핑, 스스키노 가성비 숙소 | EP.1",
-        "video_id": "YfcBGt_fbF8", # 실제 유튜브 영상 ID로 교체 (예시)
-        "thumbnail_url": "https://img.youtube.com/vi/YfcBGt_fbF8/hqdefault.jpg", # 위 video_id 기반
-        "youtube_url": "https://youtu.be/YfcBGt_fbF8?si=ypFPcGM0kwWlwFM7" # 위 video_id 기반
-    },
-    {
-        "title": "홋카이도여행 여길 안 가봤다고?(가장 인기 있는 코스 3박 4일 일정, 삿포로, 오타루, 비에이편)",
-        "video_id": "ml1rIL1Xkyc", 
-        "thumbnail_url": "https://img.youtube.com/vi/ml1rIL1Xkyc/sddefault.jpg", # 위 video_id 기반
-        "youtube_url": "https://youtu.be/ml1rIL1Xkyc?si=Rs4LMcuUHbXKEVcG" # 위 video_id 기반
-    },
-    {
-        "title": "올여름 무조건 가야하는 삿포로 3박4일 여행코스 완벽정리💯(+경비,꿀팁까지⁉️)",
-        "video_id": "2fG60iqVrDA", # 실제 유튜브 영상 ID로 교체 (예시)
-        "thumbnail_url": "https://img.youtube.com/vi/2fG60iqVrDA/sddefault.jpg", # 위 video_id 기반
-        "youtube_url": "https://youtu.be/2fG60iqVrDA?si=tKw_WRgO3bIV94wR" # 위 video_id 기반
-    }
+youtube_vlogs = load_vlogs(VLOGS_FILE)
+
+# 유튜브 브이로그 표시 (VLOGS_PER_PAGE개씩, 썸네일은 목록용 크기로 화면에 보일 때만 불러옵니다)
+start, end = page_range(len(youtube_vlogs), key="vlog_page", page_size=VLOGS_PER_PAGE, label="브이로그 쪽")
+page_vlogs = youtube_vlogs[start:end]
+thumbnails = [
+    get_image_proxy().src(youtube_thumbnail(vlog['video_id']) if vlog.get('video_id') else thumbnail_url(vlog['thumbnail_url']),
+                          VLOG_IMAGE_WIDTH)
+    for vlog in page_vlogs
 ]
-
-# 유튜브 브이로그 표시
-for vlog in youtube_vlogs:
+for vlog, thumbnail in zip(page_vlogs, thumbnails):
     st.subheader(vlog['title'])
     st.markdown(f"""
     <a href="{vlog['youtube_url']}" target="_blank">
-        <img src="{vlog['thumbnail_url']}" alt="{vlog['title']}" style="width:300px; border-radius: 8px;">
+        {lazy_img(thumbnail, vlog['title'], width=VLOG_IMAGE_WIDTH, style="border-radius: 8px;")}
     </a>
     """, unsafe_allow_html=True)
     st.write(f"[영상 보러가기]({vlog['youtube_url']})")
@@ -167,3 +210,14 @@ st.markdown("""
 
 st.markdown("---")
 st.write("이 가이드가 삿포로 여행에 도움이 되셨기를 바랍니다! 즐겁고 행복한 삿포로 여행 되세요! 🌸")
+
+# 성능 측정 (APP_METRICS=1 또는 주소 뒤 ?debug=1일 때만)
+instrument.finish_run()
+
+# 첫 화면을 다 그린 뒤, 다른 페이지에서 쓸 무거운 라이브러리(folium, plotly, yfinance 등)를 백그라운드에서 미리 불러 둡니다.
+warmup.start()
+# STOCK_PREFETCH=1이면 주가 페이지의 기본 티커도 지금 미리 받기 시작합니다. (utils.prefetch)
+# 지정하지 않으면 주가 페이지를 처음 열 때 시작하므로, 첫 페이지만 보는 서버는 yfinance를 부르지 않습니다.
+if os.environ.get("STOCK_PREFETCH") == "1":
+    from utils.prefetch import stock_prefetcher
+    stock_prefetcher()
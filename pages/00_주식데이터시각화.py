@@ -1,31 +1,30 @@
+import time
+
 import streamlit as st
-import yfinance as yf
-import pandas as pd
 from datetime import datetime, timedelta
 
+from utils import instrument
+from utils.downsample import METHODS, downsample_long
+from utils.live_chart import encode_points, live_chart
+from utils.live_stream import LIVE_SOURCES, LiveFeed, make_source
+from utils.prefetch import history_range, stock_prefetcher
+from utils.stock_analytics import ALIGN_POLICIES, align, correlation, drawdown, rebase, rolling_volatility
+from utils.stock_data import default_tickers
+
+instrument.start_run("stocks")
+
 # 1. 앱 제목 설정
 st.title("글로벌 시가총액 Top 10 기업 주가 변화 (최근 3년)")
 st.write("yfinance를 사용하여 주요 기업들의 지난 3년간 주가 변화를 시각화합니다.")
 
-# 2. 글로벌 시총 상위 기업 티커 (변동될 수 있으므로 최신 정보로 업데이트 필요)
-tickers = [
-    "AAPL",  # Apple
-    "MSFT",  # Microsoft
-    "GOOG",  # Alphabet (Google)
-    "AMZN",  # Amazon
-    "NVDA",  # NVIDIA
-    "META",  # Meta Platforms
-    "TSLA",  # Tesla
-    "BRK-A", # Berkshire Hathaway (Class A)
-    "LLY",   # Eli Lilly and Company
-    "JPM",   # JPMorgan Chase & Co.
-    "V",     # Visa Inc.
-    "JNJ"    # Johnson & Johnson
-]
+# 2. 글로벌 시총 상위 기업 티커 (utils.stock_data.DEFAULT_TICKERS, STOCK_TICKERS 환경 변수로 변경 가능)
+tickers = default_tickers()
 
 # 3. 날짜 범위 설정 (최근 3년)
-end_date = datetime.now()
-start_date = end_date - timedelta(days=3 * 365) # 대략 3년 전
+# 캐시 키가 실행할 때마다 바뀌지 않도록 시각을 버리고 날짜 단위로 맞춥니다.
+# end_date는 오늘을 포함하도록 내일 0시로 둡니다. (구간의 끝은 포함하지 않음)
+start_date, end_date = history_range()
+today = end_date - timedelta(days=1)
 
 st.sidebar.header("설정")
 selected_tickers = st.sidebar.multiselect(
@@ -33,80 +32,183 @@ selected_tickers = st.sidebar.multiselect(
     options=tickers,
     default=tickers # 기본적으로 모든 기업 선택
 )
+# 기본 목록에 없는 티커는 미리 받아 두지 않으므로, 처음 볼 때만 그 티커의 다운로드를 기다립니다.
+extra_input = st.sidebar.text_input("다른 티커 추가 (쉼표로 구분)", placeholder="예: ORCL, 005930.KS")
+extra_tickers = [t for t in dict.fromkeys(t.strip().upper() for t in extra_input.split(",")) if t and t not in tickers]
+selected_tickers = selected_tickers + extra_tickers
+align_policy = st.sidebar.selectbox(
+    "결측 날짜 처리",
+    options=list(ALIGN_POLICIES),
+    format_func=ALIGN_POLICIES.get,
+)
+downsample_method = st.sidebar.selectbox(
+    "차트 다운샘플링",
+    options=list(METHODS),
+    format_func=METHODS.get,
+)
+live_mode = st.sidebar.toggle("실시간 모드", help="선택한 기업의 장중 주가를 이어 받아, 새로 들어온 점만 차트에 덧붙입니다.")
+if live_mode:
+    live_source = st.sidebar.radio("실시간 데이터", options=list(LIVE_SOURCES), format_func=LIVE_SOURCES.get)
+    replay_speed = st.sidebar.select_slider(
+        "재생 속도 (배속)", options=[1, 10, 60, 300, 1000], value=60, disabled=live_source != "replay"
+    )
+
+# 차트 한 개에 티커마다 보낼 최대 점 개수 (차트 폭 1px당 1점)
+CHART_WIDTH_PX = 1200
+POINTS_PER_PX = 1
+
+
+def draw_line_chart(frame):
+    # 기간이 길어도 브라우저로 보내는 점 개수가 차트 폭을 넘지 않도록 줄여서 그립니다.
+    with instrument.stage("다운샘플링"):
+        long_data = downsample_long(
+            frame.rename_axis("날짜"), CHART_WIDTH_PX * POINTS_PER_PX, downsample_method, "티커", "값"
+        )
+    st.line_chart(long_data, x="날짜", y="값", color="티커")
+
+
+# 실시간 모드
+# 공급자마다 피드 하나를 서버 프로세스에 두고(백그라운드 폴링 + 티커별 링 버퍼), 모든 세션이 함께 읽습니다.
+# 차트 부분만 LIVE_REFRESH_SECONDS마다 다시 실행되어(st.fragment) 마지막으로 보낸 뒤 새로 들어온 점만 브라우저로 보냅니다.
+# LIVE_REDRAW_SECONDS마다, 또는 브라우저가 점을 잃었다고 알리면 링 버퍼 전체를 다시 보냅니다.
+LIVE_REFRESH_SECONDS = 0.5
+LIVE_REDRAW_SECONDS = 60
+LIVE_ACK_SECONDS = 2  # 전체를 보낸 뒤 브라우저의 응답을 기다리는 시간
+LIVE_CHART_KEY = "live_chart"
+
+
+@instrument.cached(st.cache_resource(max_entries=8))
+def get_live_feed(source, speed, tickers, _start_prices):
+    return LiveFeed(make_source(source, tickers, speed=speed, start_prices=_start_prices), tickers)
+
+
+@st.fragment(run_every=LIVE_REFRESH_SECONDS)
+def show_live_chart(feed, chart_tickers):
+    now = time.time()
+    view = st.session_state.get("live_view")
+    view_key = (id(feed), tuple(chart_tickers))
+    if view is None or view["key"] != view_key:
+        # 기준가(변화율 0%)는 피드나 티커 선택이 바뀔 때만 새로 잡습니다.
+        view = st.session_state["live_view"] = {"key": view_key, "generation": 0, "base": {}, "cursors": None, "sent_at": now}
+    acked = st.session_state.get(LIVE_CHART_KEY)
+    full = (view["cursors"] is None or now - view["sent_at"] > LIVE_REDRAW_SECONDS
+            or (acked != view["generation"] and now - view["sent_at"] > LIVE_ACK_SECONDS))
+    if full:
+        view["generation"] += 1
+        view["sent_at"] = now
+        view["cursors"] = None
+
+    points, view["cursors"] = feed.delta(chart_tickers, view["cursors"])
+    for ticker, (_, values) in points.items():
+        view["base"].setdefault(ticker, float(values[0]) or 1.0)
+    live_chart(encode_points(points, view["base"]), chart_tickers, view["generation"], full,
+               feed.book.capacity, key=LIVE_CHART_KEY)
+
+    status = f"실시간 피드: {LIVE_SOURCES[feed.source.name]}, 티커마다 최근 {feed.book.capacity:,}개 점"
+    if feed.updated_at:
+        status += f", 마지막 수신 {datetime.fromtimestamp(feed.updated_at):%H:%M:%S}"
+    st.caption(status)
+    if feed.error:
+        st.warning(f"실시간 데이터를 받지 못했습니다: {feed.error}")
 
 if not selected_tickers:
     st.warning("차트를 표시하려면 최소 하나 이상의 기업을 선택해주세요.")
 else:
     # 4. 데이터 다운로드 및 처리
-    @st.cache_data
-    def get_stock_data(ticker_list, start, end):
-        all_adj_close_data = pd.DataFrame()
-        failed_tickers = []
-
-        for ticker in ticker_list:
-            try:
-                # 각 티커별로 개별적으로 다운로드 시도
-                # 이렇게 하면 한 티커의 실패가 전체 다운로드를 망가뜨리지 않습니다.
-                stock = yf.Ticker(ticker)
-                # period='3y'를 사용하면 정확히 3년 데이터를 가져올 수 있고,
-                # start/end 날짜를 사용해도 됩니다.
-                # data = stock.history(start=start, end=end)
-                data = stock.history(period="3y") # 최근 3년 데이터 요청
-
-                if not data.empty and 'Adj Close' in data.columns:
-                    # 'Adj Close' 컬럼만 선택하여 DataFrame에 추가
-                    adj_close = data[['Adj Close']].rename(columns={'Adj Close': ticker})
-                    # 인덱스(날짜)를 기준으로 병합
-                    if all_adj_close_data.empty:
-                        all_adj_close_data = adj_close
-                    else:
-                        all_adj_close_data = all_adj_close_data.join(adj_close, how='outer')
-                else:
-                    st.warning(f"티커 '{ticker}'에 대한 'Adj Close' 데이터를 찾을 수 없거나 데이터가 비어 있습니다. 기간: {start.strftime('%Y-%m-%d')} ~ {end.strftime('%Y-%m-%d')}")
-                    failed_tickers.append(ticker)
-            except Exception as e:
-                st.error(f"티커 '{ticker}' 데이터 다운로드 중 오류 발생: {e}")
-                failed_tickers.append(ticker)
-        
-        if failed_tickers:
-            st.error(f"다음 티커들은 데이터를 가져오지 못했습니다: {', '.join(failed_tickers)}")
-            st.info("티커 심볼이 정확한지, 그리고 해당 기업이 지정된 기간 동안 주식 시장에 있었는지 확인해주세요.")
-
-        return all_adj_close_data.sort_index() # 날짜를 기준으로 정렬
-
-    st.info(f"데이터를 다운로드 중입니다... (시작일: {start_date.strftime('%Y-%m-%d')}, 종료일: {end_date.strftime('%Y-%m-%d')})")
-    stock_data = get_stock_data(selected_tickers, start_date, end_date)
+    # 기본 티커 전체의 주가는 서버 프로세스가 백그라운드에서 미리 받아 두고(utils.prefetch), 페이지는 그 데이터를 바로 씁니다.
+    # 데이터가 오래됐으면 기다리지 않고 가진 데이터를 보여주면서 백그라운드에서 새로 받고, 기준 시각을 함께 표시합니다.
+    # 서버가 막 시작해 아직 받은 데이터가 없을 때만 다운로드를 기다리고, 동시에 들어온 방문자는 같은 다운로드를 함께 기다립니다.
+    # (받은 주가는 로컬 저장소(.cache/prices)에 저장되고, 새로 받을 때는 마지막 저장일 이후의 날짜만 받습니다.)
+    prefetcher = stock_prefetcher()
+    loading = None
+    if not prefetcher.ready:
+        loading = st.info(f"데이터를 불러오는 중입니다... (시작일: {start_date.strftime('%Y-%m-%d')}, 종료일: {today.strftime('%Y-%m-%d')})")
+    with instrument.stage("주가 불러오기 (미리 받은 데이터)"):
+        snapshot, stale = prefetcher.snapshot(end_date)
+        stock_data, failed_tickers = prefetcher.frame(snapshot, selected_tickers, start_date, end_date)
+    if loading is not None:
+        loading.empty()
+
+    # 데이터 기준 시각 (오래됐으면 백그라운드에서 새로 받는 중)
+    age_minutes = int((time.time() - snapshot.fetched_at) // 60)
+    freshness = (f"주가 기준 시각: {datetime.fromtimestamp(snapshot.fetched_at):%Y-%m-%d %H:%M} ({age_minutes}분 전), "
+                 f"기간: {start_date:%Y-%m-%d} ~ {today:%Y-%m-%d}")
+    if stale:
+        st.warning(f"{freshness}  \n오래된 데이터입니다. 최신 데이터를 백그라운드에서 받고 있으니 잠시 뒤 새로 고침해주세요.")
+    else:
+        st.caption(freshness)
+
+    if live_mode:
+        st.subheader("실시간 주가 (첫 점 대비 변화율)")
+        # 재생용 가짜 테이프는 티커마다 마지막 종가에서 시작합니다.
+        last_close = {t: float(s.iloc[-1]) for t, s in snapshot.series.items() if len(s)}
+        last_close.update({t: float(stock_data[t].dropna().iloc[-1]) for t in extra_tickers
+                           if t in stock_data and stock_data[t].notna().any()})
+        speed = replay_speed if live_source == "replay" else None
+        # 피드는 기본 티커와 직접 추가한 티커를 함께 받습니다.
+        show_live_chart(get_live_feed(live_source, speed, tuple(tickers + extra_tickers), last_close), selected_tickers)
+
+    if failed_tickers:
+        for ticker, reason in failed_tickers.items():
+            st.warning(f"티커 '{ticker}' 데이터를 가져오지 못했습니다: {reason}")
+        st.error(f"다음 티커들은 데이터를 가져오지 못했습니다: {', '.join(failed_tickers)}")
+        st.info("티커 심볼이 정확한지, 그리고 해당 기업이 지정된 기간 동안 주식 시장에 있었는지 확인해주세요.")
 
     if stock_data.empty:
         st.error("선택한 모든 기업에 대해 유효한 주가 데이터를 불러올 수 없습니다. 티커나 날짜 범위를 다시 확인해주세요.")
     else:
-        # 결측치 제거
+        # 결측치 처리
         # join 방식이 outer이므로, 데이터가 없는 날짜에 NaN이 있을 수 있습니다.
-        # 차트 생성을 위해 NaN을 제거하는 것이 좋습니다.
-        stock_data_cleaned = stock_data.dropna()
+        # 사이드바에서 고른 정책에 따라 결측 날짜를 채우거나 잘라냅니다.
+        with instrument.stage("결측 날짜 처리"):
+            stock_data_cleaned = align(stock_data, align_policy)
 
-        if stock_data_cleaned.empty:
-            st.warning("결측치를 제거한 후 표시할 데이터가 없습니다. 모든 기업의 데이터가 특정 날짜에 완전히 일치하는지 확인해주세요.")
+        if stock_data_cleaned.dropna(how="all").empty:
+            st.warning("결측치를 처리한 후 표시할 데이터가 없습니다. 다른 결측 날짜 처리 방식을 선택해보세요.")
             st.write("--- 원본 데이터 (결측치 포함) ---")
             st.write(stock_data.head()) # 결측치 포함된 원본 데이터 일부 출력
             st.write(stock_data.isnull().sum()) # 각 컬럼별 결측치 개수 출력
         else:
-            # 첫날 주가로 나누어 상대적인 변화율 계산 (인덱스를 1로 정규화)
-            # 0으로 나누는 오류 방지를 위해, 첫날 주가가 0이 아닌 컬럼만 처리
-            normalized_stock_data = pd.DataFrame()
-            for col in stock_data_cleaned.columns:
-                if stock_data_cleaned[col].iloc[0] != 0:
-                    normalized_stock_data[col] = stock_data_cleaned[col] / stock_data_cleaned[col].iloc[0]
-                else:
-                    st.warning(f"티커 '{col}'의 첫날 주가가 0이므로 정규화할 수 없습니다.")
-                    normalized_stock_data[col] = stock_data_cleaned[col] # 정규화하지 않고 원본 값 사용
-
-            if normalized_stock_data.empty:
-                 st.error("정규화된 주가 데이터를 생성할 수 없습니다.")
-            else:
-                st.subheader("정규화된 주가 변화 (첫날 기준)")
-                st.write("모든 기업의 주가를 첫날 주가에 대한 상대적인 변화율로 정규화하여 비교합니다.")
-                st.line_chart(normalized_stock_data)
+            # 첫 유효값으로 나누어 상대적인 변화율 계산 (인덱스를 1로 정규화)
+            # 첫 유효값이 0인 티커는 정규화하지 않고 원본 값을 사용합니다.
+            normalized_stock_data, not_rebased = rebase(stock_data_cleaned)
+            for col in not_rebased:
+                st.warning(f"티커 '{col}'의 첫날 주가가 0이므로 정규화할 수 없습니다.")
+
+            # 차트 구간을 좁히면 그 구간만 다운샘플링하므로, 확대할수록 원본 해상도에 가까워집니다.
+            first_day, last_day = stock_data_cleaned.index[0].date(), stock_data_cleaned.index[-1].date()
+            zoom_start, zoom_end = (first_day, last_day)
+            if first_day < last_day:
+                zoom_start, zoom_end = st.sidebar.slider(
+                    "차트 구간",
+                    min_value=first_day,
+                    max_value=last_day,
+                    value=(first_day, last_day),
+                )
+            zoom = slice(str(zoom_start), str(zoom_end))
+
+            st.subheader("정규화된 주가 변화 (첫날 기준)")
+            st.write("모든 기업의 주가를 첫날 주가에 대한 상대적인 변화율로 정규화하여 비교합니다.")
+            draw_line_chart(normalized_stock_data.loc[zoom])
+
+            # 5. 위험 지표
+            st.subheader("변동성과 낙폭")
+            tab_vol, tab_dd, tab_corr = st.tabs(["연율화 변동성 (21일)", "최고점 대비 낙폭", "수익률 상관관계"])
+            with tab_vol:
+                with instrument.stage("위험 지표 계산"):
+                    volatility = rolling_volatility(stock_data_cleaned)
+                draw_line_chart(volatility.loc[zoom])
+            with tab_dd:
+                with instrument.stage("위험 지표 계산"):
+                    drawdowns = drawdown(stock_data_cleaned)
+                draw_line_chart(drawdowns.loc[zoom])
+            with tab_corr:
+                with instrument.stage("위험 지표 계산"):
+                    correlations = correlation(stock_data_cleaned)
+                st.dataframe(correlations.round(2))
 
             st.subheader("원본 데이터 (일별 종가)")
             st.write(stock_data_cleaned.tail()) # 최근 데이터 5개 행 표시
+
+# 성능 측정 (APP_METRICS=1 또는 주소 뒤 ?debug=1일 때만)
+instrument.finish_run()
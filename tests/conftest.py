@@ -0,0 +1,7 @@
+import sys
+from pathlib import Path
+
+# 프로젝트 루트의 utils 패키지를 불러올 수 있도록 경로에 추가합니다.
+ROOT_DIR = str(Path(__file__).resolve().parent.parent)
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
@@ -0,0 +1,49 @@
+import io
+
+import pandas as pd
+
+from bench import synthetic
+from bench.run import compare
+from utils.emission_ingest import MAP_SCHEMA, TREND_SCHEMA, read_emissions
+from utils.response_store import ResponseStore
+from utils.stock_data import FixtureProvider
+
+
+def test_price_fixtures_are_readable(tmp_path):
+    names = synthetic.write_price_fixtures(tmp_path, 3, years=1, end="2024-06-28")
+    assert names == ["T0000", "T0001", "T0002"]
+    series = FixtureProvider(directory=tmp_path).history("T0001", "2024-01-01", "2024-06-29")
+    assert series.index.max() == pd.Timestamp("2024-06-28")
+    assert (series > 0).all()
+
+
+def test_emission_uploads_match_page_schema():
+    name, data, _ = synthetic.trend_emissions(5, 10, fmt="csv")
+    df = read_emissions(io.BytesIO(data), name, TREND_SCHEMA)
+    assert len(df) == 50 and df["나라"].nunique() == 5
+
+    name, data, _ = synthetic.map_emissions(20)
+    df = read_emissions(io.BytesIO(data), name, MAP_SCHEMA)
+    assert len(df) == 20
+
+
+def test_generators_are_deterministic(tmp_path):
+    assert synthetic.trend_emissions(3, 4, seed=1, fmt="csv") == synthetic.trend_emissions(3, 4, seed=1, fmt="csv")
+    synthetic.write_spots(tmp_path / "a.json", 30, seed=2)
+    synthetic.write_spots(tmp_path / "b.json", 30, seed=2)
+    assert (tmp_path / "a.json").read_bytes() == (tmp_path / "b.json").read_bytes()
+
+
+def test_seed_responses(tmp_path):
+    version = synthetic.seed_responses(tmp_path / "friends.sqlite3", 12)
+    assert version == 12
+    responses = ResponseStore(tmp_path / "friends.sqlite3").responses()
+    assert all(len(r['room_friends']) == 3 and r['pair_friend'] for r in responses)
+
+
+def test_compare_flags_regressions():
+    baseline = {"results": {"main": {"cold_s": 1.0, "warm_s": 0.5}, "stock": {"error": "실패"}}}
+    results = {"main": {"cold_s": 1.05, "warm_s": 0.8}, "stock": {"cold_s": 9.0}}
+    lines, regressions = compare(results, baseline, threshold=0.2)
+    assert regressions == [("main", "warm_s", 0.5, 0.8)]
+    assert len(lines) == 3  # 제목 + 지표 두 줄 (오류가 난 시나리오는 비교하지 않습니다)
@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.downsample import downsample_long, lttb_indices, minmax_indices
+
+
+def test_lttb_keeps_endpoints_and_count():
+    rng = np.random.default_rng(0)
+    y = rng.normal(size=1000).cumsum()
+    picked = lttb_indices(np.arange(1000, dtype=float), y, 100)
+    assert len(picked) == 100
+    assert picked[0] == 0 and picked[-1] == 999
+    assert np.all(np.diff(picked) > 0)
+
+
+def test_lttb_short_series_unchanged():
+    y = np.arange(10, dtype=float)
+    assert lttb_indices(np.arange(10, dtype=float), y, 50).tolist() == list(range(10))
+
+
+def test_minmax_keeps_spikes():
+    y = np.zeros(10_000)
+    y[1234], y[8765] = 100.0, -100.0
+    picked = minmax_indices(y, 50)
+    assert 1234 in picked and 8765 in picked
+    assert picked[0] == 0 and picked[-1] == len(y) - 1
+    assert len(picked) <= 50 + 2
+
+
+@pytest.mark.parametrize("method", ["lttb", "minmax"])
+def test_downsample_long_caps_each_column(method):
+    index = pd.date_range("2020-01-01", periods=2000, freq="D", name="Date")
+    rng = np.random.default_rng(1)
+    frame = pd.DataFrame({"A": rng.normal(size=2000).cumsum(), "B": rng.normal(size=2000).cumsum()}, index=index)
+    frame.iloc[:500, 1] = np.nan  # 늦게 상장한 티커
+
+    long = downsample_long(frame, 200, method=method, var_name="Ticker", value_name="Price")
+    counts = long.groupby("Ticker").size()
+    assert counts.max() <= 202
+    assert list(long.columns) == ["Date", "Ticker", "Price"]
+    assert long["Price"].notna().all()
+    # 남긴 점은 원래 값 그대로입니다.
+    for ticker, part in long.groupby("Ticker"):
+        assert np.allclose(frame.loc[part["Date"], ticker].to_numpy(), part["Price"].to_numpy())
+
+
+def test_downsample_long_none_keeps_everything():
+    frame = pd.DataFrame({"A": [1.0, 2.0, np.nan, 4.0]})
+    long = downsample_long(frame, 2, method="none")
+    assert long["value"].tolist() == [1.0, 2.0, 4.0]
+
+
+def test_downsample_long_unknown_method():
+    with pytest.raises(ValueError):
+        downsample_long(pd.DataFrame({"A": [1.0]}), 10, method="median")
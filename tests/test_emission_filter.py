@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.emission_filter import EmissionIndex
+
+
+@pytest.fixture
+def emissions():
+    rng = np.random.default_rng(0)
+    countries = ['한국', '일본', '미국', '독일', '브라질']
+    rows = [(c, y, float(rng.random())) for c in countries for y in range(1990, 2021)]
+    df = pd.DataFrame(rows, columns=['나라', '연도', '배출량'])
+    return df.sample(frac=1, random_state=0).reset_index(drop=True)  # 순서를 섞어 둡니다.
+
+
+def expected_rows(df, countries, year_from, year_to):
+    mask = df['나라'].isin(countries) & df['연도'].between(year_from, year_to)
+    return df[mask].sort_values(['나라', '연도']).reset_index(drop=True)
+
+
+def test_index_summary(emissions):
+    index = EmissionIndex(emissions)
+    assert index.countries == sorted(emissions['나라'].unique())
+    assert (index.min_year, index.max_year) == (1990, 2020)
+    assert len(index) == len(emissions)
+
+
+@pytest.mark.parametrize("countries, year_from, year_to", [
+    (['한국'], 2000, 2010),
+    (['미국', '한국', '독일'], 1990, 2020),
+    (['일본'], 2020, 2020),
+    (['브라질'], 1980, 1995),
+    ([], 1990, 2020),
+    (['없는 나라', '일본'], 2005, 2006),
+])
+def test_filter_matches_boolean_mask(emissions, countries, year_from, year_to):
+    result = EmissionIndex(emissions).filter(countries, year_from, year_to).reset_index(drop=True)
+    expected = expected_rows(emissions, countries, year_from, year_to)
+    result = result.sort_values(['나라', '연도']).reset_index(drop=True)
+    assert result['나라'].astype(str).tolist() == expected['나라'].tolist()
+    assert result['연도'].tolist() == expected['연도'].tolist()
+    assert np.allclose(result['배출량'], expected['배출량'])
+
+
+def test_filter_empty_range(emissions):
+    assert EmissionIndex(emissions).filter(['한국'], 2015, 2010).empty
@@ -0,0 +1,65 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.emission_ingest import TREND_SCHEMA, IngestError, read_emissions
+
+
+def csv_file(df):
+    return io.BytesIO(df.to_csv(index=False).encode("utf-8"))
+
+
+def xlsx_file(df, header=True):
+    buffer = io.BytesIO()
+    df.to_excel(buffer, index=False, header=header, engine="openpyxl")
+    buffer.seek(0)
+    return buffer
+
+
+@pytest.fixture
+def trend():
+    return pd.DataFrame({
+        "연도": [2000, 2001, 2000, 2001, 2002, 2002],
+        "나라": ["한국", "한국", "일본", "일본", "미국", " 한국 "],
+        "탄소배출량": [1.5, "2.5", 3.0, None, 4.0, 5.0],
+    })
+
+
+@pytest.mark.parametrize("make_file, name", [(csv_file, "trend.csv"), (xlsx_file, "trend.xlsx")])
+def test_typed_chunks_with_category_union(trend, make_file, name):
+    # 청크마다 나라 범주가 달라도 합친 결과는 category 자료형을 유지합니다.
+    df = read_emissions(make_file(trend), name, TREND_SCHEMA, chunk_rows=2)
+    assert df.dtypes.astype(str).to_dict() == {"연도": "int16", "나라": "category", "탄소배출량": "float32"}
+    assert sorted(df["나라"].cat.categories) == ["미국", "일본", "한국"]
+    # 숫자가 아닌 값이나 빈 값이 있는 행은 버립니다.
+    assert df["나라"].tolist() == ["한국", "한국", "일본", "미국", "한국"]
+    assert np.allclose(df["탄소배출량"], [1.5, 2.5, 3.0, 4.0, 5.0])
+
+
+def test_first_chunk_callback(trend):
+    seen = []
+    read_emissions(csv_file(trend), "trend.csv", TREND_SCHEMA, chunk_rows=2, on_first_chunk=seen.append)
+    assert len(seen) == 1 and len(seen[0]) == 2
+
+
+@pytest.mark.parametrize("make_file, name", [(csv_file, "trend.csv"), (xlsx_file, "trend.xlsx")])
+def test_missing_column_is_reported(trend, make_file, name):
+    with pytest.raises(IngestError, match="탄소배출량"):
+        read_emissions(make_file(trend.drop(columns=["탄소배출량"])), name, TREND_SCHEMA)
+
+
+@pytest.mark.parametrize("file, name", [
+    (lambda: xlsx_file(pd.DataFrame(), header=False), "empty.xlsx"),
+    (lambda: io.BytesIO(b""), "empty.csv"),
+])
+def test_empty_file_is_reported(file, name):
+    # 형식과 관계없이 같은 오류를 보여줍니다.
+    with pytest.raises(IngestError, match="비어 있습니다"):
+        read_emissions(file(), name, TREND_SCHEMA)
+
+
+def test_unsupported_extension():
+    with pytest.raises(IngestError):
+        read_emissions(io.BytesIO(b""), "trend.json", TREND_SCHEMA)
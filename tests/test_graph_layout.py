@@ -0,0 +1,65 @@
+import numpy as np
+
+from utils.graph_core import CompactGraph
+from utils.graph_layout import LayoutCache, _repulsion_exact, _repulsion_grid, force_layout
+from utils.graph_render import graph_data
+
+
+def test_known_nodes_stay_put_when_graph_grows():
+    layout = LayoutCache()
+    first = layout.positions(1, CompactGraph.from_edges(range(1, 6), [(1, 2, 3), (2, 3, 1)])).copy()
+    second = layout.positions(2, CompactGraph.from_edges(range(1, 6), [(1, 2, 3), (2, 3, 1), (3, 4, 2)]))
+    # 1~3번은 이미 자리를 잡았으므로 그대로, 4번은 새로 연결돼 바깥 원에서 안쪽으로 들어옵니다.
+    assert np.array_equal(second[:3], first[:3])
+    assert not np.array_equal(second[3], first[3])
+
+
+def test_same_version_is_not_recomputed():
+    layout = LayoutCache()
+    compact = CompactGraph.from_edges(range(1, 4), [(1, 2, 3)])
+    assert layout.positions(1, compact) is layout.positions(1, compact)
+
+
+def test_grid_repulsion_approximates_exact():
+    rng = np.random.default_rng(0)
+    pos = rng.uniform(-500, 500, size=(400, 2))
+    active = np.arange(len(pos))
+    exact = _repulsion_exact(pos, 50.0, active)
+    grid = _repulsion_grid(pos, 50.0, active)
+    error = np.linalg.norm(grid - exact, axis=1) / np.linalg.norm(exact, axis=1)
+    assert np.median(error) < 0.1
+
+
+def test_fixed_nodes_do_not_move():
+    compact = CompactGraph.from_edges(range(4), [(0, 1, 3), (1, 2, 2), (2, 3, 1)])
+    init = np.array([[0.0, 0.0], [100.0, 0.0], [0.0, 100.0], [100.0, 100.0]])
+    fixed = np.array([True, True, False, False])
+    pos = force_layout(compact, init=init, fixed=fixed, iterations=10)
+    assert np.array_equal(pos[:2], init[:2])
+
+
+def test_positions_are_sent_with_nodes():
+    compact = CompactGraph.from_edges([1, 2], [(1, 2, 3)])
+    nodes, _ = graph_data(compact, np.array([[1.26, -3.0], [0.0, 4.04]]))
+    assert nodes[0] == {'id': 1, 'label': '1', 'title': "학생 1", 'x': 1.3, 'y': -3.0}
+    assert (nodes[1]['x'], nodes[1]['y']) == (0.0, 4.0)
+
+
+def test_moved_reports_only_nodes_that_changed_place():
+    layout = LayoutCache()
+    layout.positions(1, CompactGraph.from_edges(range(1, 6), [(1, 2, 3), (2, 3, 1)]))
+    layout.positions(2, CompactGraph.from_edges(range(1, 6), [(1, 2, 3), (2, 3, 1), (3, 4, 2)]))
+    moved = layout.moved(1, 2).tolist()
+    # 4번은 바깥 원에서 안쪽으로 들어오고, 1~3번은 그대로입니다. (바깥 원의 5번은 원이 커지면 움직일 수 있습니다)
+    assert 3 in moved and not {0, 1, 2} & set(moved)
+    assert layout.moved(1, 1).tolist() == []
+
+
+def test_reset_forgets_history():
+    layout = LayoutCache()
+    compact = CompactGraph.from_edges(range(1, 4), [(1, 2, 3)])
+    layout.positions(1, compact)
+    generation = layout.generation
+    layout.reset()
+    assert layout.generation == generation + 1
+    assert layout.moved(1, 1) is None
@@ -0,0 +1,52 @@
+import numpy as np
+
+from utils.graph_core import CompactGraph
+from utils.graph_render import delta_data, edge_id, graph_data, graph_options
+from utils.relation_graph import RelationGraph
+
+
+def test_graph_data():
+    compact = CompactGraph.from_edges([3, 1, 2], [(2, 1, 3), (3, 2, 1)])
+    nodes, edges = graph_data(compact)
+    assert [n['id'] for n in nodes] == [1, 2, 3]
+    assert nodes[0] == {'id': 1, 'label': '1', 'title': "학생 1"}
+    assert edges == [
+        {'id': '1-2', 'from': 2, 'to': 1, 'title': '가장_친밀', 'color': 'red', 'width': 4},
+        {'id': '2-3', 'from': 3, 'to': 2, 'title': '약간_친밀', 'color': 'lightgray', 'width': 1},
+    ]
+
+
+def test_edge_id_ignores_direction():
+    assert edge_id(7, 3) == edge_id(3, 7) == "3-7"
+
+
+def test_options_built_once_per_setting():
+    options = graph_options("white", True)
+    assert graph_options("white", True) is options
+    assert options['physics']['enabled'] is True
+    assert graph_options("white", False)['physics']['enabled'] is False
+    assert options['nodes']['font'] == {'color': 'white'}
+
+
+def test_delta_data_sends_only_changes():
+    graph = RelationGraph(students=range(1, 5))
+    graph.apply({'student_id': 1, 'room_friends': [2], 'pair_friend': None, 'talk_friends': [3], 'version': 1})
+    graph.apply({'student_id': 1, 'room_friends': [], 'pair_friend': 4, 'talk_friends': [3], 'version': 2})
+    _, compact, _, _ = graph.export()
+
+    nodes, edges, removed = delta_data(graph.changes_since(1), compact)
+    # 학생 노드는 처음부터 있으므로 엣지만 바뀝니다.
+    assert nodes == []
+    assert [e['id'] for e in edges] == ['1-4']
+    assert removed == ['1-2']
+
+
+def test_delta_data_includes_moved_nodes_with_positions():
+    graph = RelationGraph(students=range(1, 4))
+    graph.apply({'student_id': 1, 'room_friends': [2], 'pair_friend': None, 'talk_friends': [], 'version': 1})
+    _, compact, _, _ = graph.export()
+    positions = np.array([[0.0, 0.0], [10.0, 0.0], [5.0, 5.0]])
+
+    # 관계가 바뀌지 않은 3번도 자리가 바뀌었으면(moved) 새 좌표를 보냅니다.
+    nodes, _, _ = delta_data(graph.changes_since(0), compact, positions, moved=[2])
+    assert nodes == [{'id': 3, 'label': '3', 'title': "학생 3", 'x': 5.0, 'y': 5.0}]
@@ -0,0 +1,40 @@
+import io
+import time
+
+from PIL import Image
+
+from utils.image_proxy import STATIC_URL, ImageProxy
+
+URL = "https://example.com/spot.jpg"
+
+
+def jpeg(width, height):
+    buffer = io.BytesIO()
+    Image.new("RGB", (width, height), "red").save(buffer, "JPEG")
+    return buffer.getvalue()
+
+
+def wait_ready(proxy, urls, width):
+    deadline = time.time() + 10
+    while proxy.prepare(urls, width) and time.time() < deadline:
+        time.sleep(0.01)
+
+
+def test_src_falls_back_then_serves_static_variant(tmp_path):
+    proxy = ImageProxy(root=tmp_path / "cache", static_dir=tmp_path / "static", fetch=False)
+    proxy.seed(URL, jpeg(600, 300))
+    # 변형이 아직 없으면 원래 주소를 바로 돌려주고, 변형은 백그라운드에서 만듭니다.
+    assert proxy.src(URL, 150) == URL
+    wait_ready(proxy, [URL], 150)
+    src = proxy.src(URL, 150)
+    assert src.startswith(f"{STATIC_URL}/") and src.endswith("-w150.webp")
+    with Image.open(tmp_path / "static" / src.rsplit("/", 1)[1]) as image:
+        assert image.size == (150, 75)
+
+
+def test_missing_image_keeps_original_url(tmp_path):
+    proxy = ImageProxy(root=tmp_path / "cache", static_dir=tmp_path / "static", fetch=False)
+    wait_ready(proxy, [URL], 150)
+    # 받을 수 없는 이미지는 기다릴 것으로 세지 않고 원래 주소를 계속 씁니다.
+    assert proxy.prepare([URL], 150) == 0
+    assert proxy.src(URL, 150) == URL
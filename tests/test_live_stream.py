@@ -0,0 +1,41 @@
+import numpy as np
+
+from utils.live_stream import RingBuffer
+
+
+def test_keeps_last_capacity_points():
+    buffer = RingBuffer(capacity=5)
+    assert buffer.extend(np.arange(3), [0.0, 1.0, 2.0]) == 3
+    assert buffer.extend(np.arange(3, 8), np.arange(3.0, 8.0)) == 5
+
+    times, values, seq = buffer.since(0)
+    assert len(buffer) == 5 and seq == 8
+    assert times.tolist() == [3, 4, 5, 6, 7]
+    assert values.tolist() == [3.0, 4.0, 5.0, 6.0, 7.0]
+    assert buffer.last_time == 7
+
+
+def test_since_returns_only_new_points_across_wraparound():
+    buffer = RingBuffer(capacity=4)
+    buffer.extend(np.arange(3), np.arange(3.0))
+    _, _, seq = buffer.since(0)
+    buffer.extend(np.arange(3, 6), np.arange(3.0, 6.0))
+    times, values, seq = buffer.since(seq)
+    assert times.tolist() == [3, 4, 5] and seq == 6
+
+
+def test_batch_larger_than_capacity():
+    buffer = RingBuffer(capacity=3)
+    buffer.extend([1], [1.0])
+    buffer.extend(np.arange(2, 12), np.arange(2.0, 12.0))
+    times, values, _ = buffer.since(0)
+    assert times.tolist() == [9, 10, 11]
+    assert values.tolist() == [9.0, 10.0, 11.0]
+
+
+def test_ignores_old_and_missing_points():
+    buffer = RingBuffer(capacity=4)
+    buffer.extend([10, 20], [1.0, 2.0])
+    assert buffer.extend([15, 20, 30, 40], [9.0, 9.0, np.nan, 4.0]) == 1
+    times, values, _ = buffer.since(0)
+    assert times.tolist() == [10, 20, 40]
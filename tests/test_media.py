@@ -0,0 +1,21 @@
+from utils.media import lazy_img, thumbnail_url
+
+
+def test_youtube_thumbnail_is_shrunk():
+    url = "https://i.ytimg.com/vi/NQymyZjjFw0/hq720.jpg?sqp=abc"
+    assert thumbnail_url(url) == "https://i.ytimg.com/vi/NQymyZjjFw0/mqdefault.jpg"
+    assert thumbnail_url(url, width=480) == "https://i.ytimg.com/vi/NQymyZjjFw0/hqdefault.jpg"
+
+
+def test_sized_cdn_url_is_capped():
+    url = "https://cdn.example.com/c_limit,f_auto,h_1024,w_1024/spot.jpg"
+    assert thumbnail_url(url, width=150) == "https://cdn.example.com/c_limit,f_auto,h_150,w_150/spot.jpg"
+    # 크기를 바꿀 수 없는 주소는 그대로
+    assert thumbnail_url("https://example.com/spot.jpg") == "https://example.com/spot.jpg"
+
+
+def test_lazy_img_escapes_attributes():
+    tag = lazy_img('https://example.com/a.jpg?x=1&y="2"', '<b>오도리</b>')
+    assert 'loading="lazy"' in tag
+    assert '&amp;y=&quot;2&quot;' in tag
+    assert '&lt;b&gt;오도리&lt;/b&gt;' in tag
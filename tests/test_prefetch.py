@@ -0,0 +1,121 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import pytest
+
+from utils.prefetch import PriceSnapshot, SingleFlight, StockPrefetcher
+from utils.ticker_cache import TickerCache
+
+WAIT = 5  # 초
+
+
+def test_concurrent_calls_run_once():
+    flight = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def work():
+        calls.append(1)
+        started.set()
+        release.wait(WAIT)
+        return object()
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        leader = pool.submit(flight.do, "prices", work)
+        assert started.wait(WAIT)
+        followers = [pool.submit(flight.do, "prices", work) for _ in range(7)]
+        time.sleep(0.2)  # 뒤따른 호출들이 첫 실행을 기다리기 시작할 시간
+        assert flight.in_flight("prices")
+        release.set()
+        results = [leader.result(WAIT)] + [f.result(WAIT) for f in followers]
+
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+    assert not flight.in_flight("prices")
+
+
+def test_error_reaches_every_caller():
+    flight = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+
+    def fail():
+        started.set()
+        release.wait(WAIT)
+        raise RuntimeError("다운로드 오류")
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        leader = pool.submit(flight.do, "prices", fail)
+        assert started.wait(WAIT)
+        followers = [pool.submit(flight.do, "prices", fail) for _ in range(3)]
+        release.set()
+        for future in [leader] + followers:
+            with pytest.raises(RuntimeError):
+                future.result(WAIT)
+
+    # 실패한 뒤에는 같은 키로 다시 실행할 수 있습니다.
+    assert flight.do("prices", lambda: 42) == 42
+
+
+def test_different_keys_do_not_wait():
+    flight = SingleFlight()
+    release = threading.Event()
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        slow = pool.submit(flight.do, "slow", lambda: release.wait(WAIT))
+        assert flight.do("fast", lambda: "done") == "done"
+        release.set()
+        assert slow.result(WAIT) is True
+
+
+def test_do_background_skips_running_key():
+    flight = SingleFlight()
+    started, release, finished = threading.Event(), threading.Event(), threading.Event()
+    calls = []
+
+    def work():
+        calls.append(1)
+        started.set()
+        release.wait(WAIT)
+        finished.set()
+
+    assert flight.do_background("refresh", work)
+    # 첫 작업이 끝나기 전의 요청은 새로 시작하지 않습니다.
+    assert started.wait(WAIT)
+    assert not flight.do_background("refresh", work)
+    release.set()
+    assert finished.wait(WAIT)
+    assert calls == [1]
+
+
+class FakeStore:
+    def __init__(self):
+        self.requests = []
+
+    def get_prices(self, tickers, start, end, provider=None, **kwargs):
+        self.requests.append(list(tickers))
+        index = pd.date_range(start, end, freq="B", inclusive="left")
+        series = {t: pd.Series(range(len(index)), index=index, dtype=float, name=t) for t in tickers if t != "BAD"}
+        return series, {t: "없는 티커" for t in tickers if t == "BAD"}
+
+
+def test_frame_fetches_only_tickers_outside_snapshot():
+    index = pd.date_range("2024-01-01", "2024-03-01", freq="B")
+    snapshot = PriceSnapshot({"AAPL": pd.Series(1.0, index=index)}, {"MSFT": "받지 못함"},
+                             index[0], index[-1], time.time())
+    store = FakeStore()
+    prefetcher = StockPrefetcher(store, ["AAPL", "MSFT"], on_demand=TickerCache(store))
+
+    frame, failed = prefetcher.frame(snapshot, ["ORCL", "AAPL", "MSFT", "BAD"], "2024-02-05", "2024-02-10")
+    assert list(frame.columns) == ["ORCL", "AAPL"]
+    assert failed == {"MSFT": "받지 못함", "BAD": "없는 티커"}
+    assert store.requests == [["ORCL", "BAD"]]
+    # 한 번 받은 티커는 TickerCache에서 꺼내므로 다시 받지 않습니다.
+    prefetcher.frame(snapshot, ["ORCL", "AAPL"], "2024-02-05", "2024-02-10")
+    assert store.requests == [["ORCL", "BAD"]]
+
+
+def test_frame_without_on_demand_marks_missing():
+    snapshot = PriceSnapshot({}, {}, pd.Timestamp("2024-01-01"), pd.Timestamp("2024-03-01"), time.time())
+    _, failed = StockPrefetcher(FakeStore(), []).frame(snapshot, ["ORCL"], "2024-02-05", "2024-02-10")
+    assert failed == {"ORCL": "미리 받은 티커 목록에 없습니다."}
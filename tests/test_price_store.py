@@ -0,0 +1,78 @@
+import pandas as pd
+import pytest
+
+from utils.price_store import PriceStore
+from utils.stock_data import FixtureProvider
+
+DAYS = pd.bdate_range("2024-01-01", "2024-03-29")
+
+
+class CountingProvider(FixtureProvider):
+    """받아 간 (티커, 시작, 끝) 구간을 기록하는 고정 데이터 공급자"""
+
+    def __init__(self, series):
+        super().__init__(series=series)
+        self.calls = []
+
+    def history(self, ticker, start, end, timeout=None):
+        self.calls.append((ticker, pd.Timestamp(start), pd.Timestamp(end)))
+        return super().history(ticker, start, end, timeout)
+
+
+@pytest.fixture
+def provider():
+    return CountingProvider({"AAA": pd.Series(range(len(DAYS)), index=DAYS, dtype="float64")})
+
+
+def test_second_call_fetches_only_new_bars(tmp_path, provider):
+    store = PriceStore(root=tmp_path, refresh_interval=0)
+    first, failed = store.get_prices(["AAA"], "2024-01-01", "2024-02-01", provider, retries=0)
+    assert not failed
+    assert first["AAA"].index.max() == pd.Timestamp("2024-01-31")
+
+    second, failed = store.get_prices(["AAA"], "2024-01-01", "2024-03-01", provider, retries=0)
+    assert not failed
+    # 두 번째 요청은 저장된 마지막 거래일 다음 날부터만 받습니다.
+    assert provider.calls[1] == ("AAA", pd.Timestamp("2024-02-01"), pd.Timestamp("2024-03-01"))
+    expected = provider.series["AAA"]
+    expected = expected[expected.index < pd.Timestamp("2024-03-01")]
+    pd.testing.assert_series_equal(second["AAA"], expected, check_names=False, check_freq=False)
+
+    # 새로 받은 부분까지 저장소에 합쳐져 있어야 합니다.
+    stored, meta = store.load("AAA")
+    assert stored.index.min() == pd.Timestamp("2024-01-01")
+    assert stored.index.max() == pd.Timestamp("2024-02-29")
+
+
+def test_cached_range_needs_no_fetch(tmp_path, provider):
+    store = PriceStore(root=tmp_path, refresh_interval=0)
+    store.get_prices(["AAA"], "2024-01-01", "2024-02-01", provider, retries=0)
+    # 저장된 구간 안쪽이면 다시 받지 않습니다.
+    result, _ = store.get_prices(["AAA"], "2024-01-15", "2024-02-01", provider, retries=0)
+    assert len(provider.calls) == 1
+    assert result["AAA"].index.min() == pd.Timestamp("2024-01-15")
+
+
+def test_refresh_interval_limits_top_up(tmp_path, provider):
+    store = PriceStore(root=tmp_path, refresh_interval=3600)
+    store.get_prices(["AAA"], "2024-01-01", "2024-02-01", provider, retries=0)
+    # 방금 확인했으므로 끝이 늘어나도 refresh_interval 동안은 저장된 데이터를 그대로 씁니다.
+    result, failed = store.get_prices(["AAA"], "2024-01-01", "2024-03-01", provider, retries=0)
+    assert len(provider.calls) == 1
+    assert not failed
+    assert result["AAA"].index.max() == pd.Timestamp("2024-01-31")
+
+
+def test_earlier_start_refetches_everything(tmp_path, provider):
+    store = PriceStore(root=tmp_path, refresh_interval=0)
+    store.get_prices(["AAA"], "2024-02-01", "2024-03-01", provider, retries=0)
+    result, _ = store.get_prices(["AAA"], "2024-01-01", "2024-03-01", provider, retries=0)
+    assert provider.calls[1][1] == pd.Timestamp("2024-01-01")
+    assert result["AAA"].index.min() == pd.Timestamp("2024-01-01")
+
+
+def test_unknown_ticker_is_reported(tmp_path, provider):
+    store = PriceStore(root=tmp_path, refresh_interval=0)
+    result, failed = store.get_prices(["AAA", "NOPE"], "2024-01-01", "2024-02-01", provider, retries=0)
+    assert set(result) == {"AAA"}
+    assert set(failed) == {"NOPE"}
@@ -0,0 +1,102 @@
+import itertools
+
+import pytest
+
+from utils import relation_graph
+from utils.relation_graph import RelationGraph
+
+
+def response(student, room=(), pair=None, talk=(), version=None):
+    data = {'student_id': student, 'room_friends': list(room), 'pair_friend': pair, 'talk_friends': list(talk)}
+    if version is not None:
+        data['version'] = version
+    return data
+
+
+RESPONSES = [
+    response(1, room=[2, 3], pair=2, talk=[4]),
+    response(2, room=[1], talk=[3, 4]),
+    response(3, pair=1, talk=[2]),
+    response(4, room=[1, 2, 3]),
+]
+
+
+@pytest.mark.parametrize("order", list(itertools.permutations(range(len(RESPONSES))))[::5])
+def test_strongest_choice_wins_in_any_order(order):
+    graph = RelationGraph(students=range(1, 5))
+    for version, i in enumerate(order, start=1):
+        graph.apply({**RESPONSES[i], 'version': version})
+    _, edges = graph.snapshot()
+    # 양쪽이 고른 관계 중 더 강한 것: 짝(3) > 수련회 방(2) > 대화(1)
+    assert sorted(edges) == [(1, 2, 3), (1, 3, 3), (1, 4, 2), (2, 3, 1), (2, 4, 2), (3, 4, 2)]
+
+
+def test_resubmission_removes_edges():
+    graph = RelationGraph(students=range(1, 4))
+    graph.apply(response(1, room=[2], talk=[3], version=1))
+    delta = graph.apply(response(1, talk=[2], version=2))
+    assert delta.edges == {(1, 2): 1, (1, 3): 0}
+    assert graph.snapshot()[1] == [(1, 2, 1)]
+
+
+def test_changes_since_returns_current_state():
+    graph = RelationGraph(students=range(1, 4))
+    graph.apply(response(1, room=[2], version=1))
+    graph.apply(response(2, pair=3, version=2))
+    graph.apply(response(1, talk=[2], version=3))
+
+    assert graph.changes_since(0).edges == {(1, 2): 1, (2, 3): 3}
+    assert graph.changes_since(2).edges == {(1, 2): 1}
+    assert not graph.changes_since(3)
+
+
+def test_mark_seen_trims_log_below_slowest_reader():
+    graph = RelationGraph(students=range(1, 5))
+    graph.mark_seen('a', 0)
+    graph.mark_seen('b', 0)
+    for version, student in enumerate((1, 2, 3), start=1):
+        graph.apply(response(student, talk=[student + 1], version=version))
+
+    graph.mark_seen('a', 3)
+    assert graph.changes_since(0).edges  # 'b'가 아직 0에 있으므로 기록을 남깁니다.
+    graph.mark_seen('b', 2)
+    # 모두 2까지 받았으므로 그 앞의 기록은 지워지고, 지워진 구간을 물으면 None(전체 다시 받기)입니다.
+    assert graph.changes_since(1) is None
+    assert graph.changes_since(2).edges == {(3, 4): 1}
+
+
+def test_idle_reader_stops_pinning_log(monkeypatch):
+    clock = [0.0]
+    monkeypatch.setattr(relation_graph.time, 'monotonic', lambda: clock[0])
+    graph = RelationGraph(students=range(1, 4))
+    graph.mark_seen('idle', 0)
+    graph.apply(response(1, talk=[2], version=1))
+    graph.apply(response(2, talk=[3], version=2))
+
+    clock[0] = relation_graph.READER_TTL + 1
+    graph.mark_seen('active', 2)
+    assert graph.changes_since(0) is None
+
+
+def test_log_limit_forces_full_resend(monkeypatch):
+    monkeypatch.setattr(relation_graph, 'LOG_LIMIT', 3)
+    graph = RelationGraph(students=range(1, 11))
+    graph.mark_seen('slow', 0)
+    for version, student in enumerate(range(1, 6), start=1):
+        graph.apply(response(student, talk=[student + 1], version=version))
+    graph.mark_seen('fast', 5)
+
+    # 'slow'가 0에 남아 있어도 기록은 LOG_LIMIT개까지만 남깁니다.
+    assert graph.changes_since(0) is None
+    assert graph.changes_since(4).edges == {(5, 6): 1}
+
+
+def test_export_is_built_once_per_version():
+    graph = RelationGraph(students=range(1, 4))
+    graph.apply(response(1, room=[2], version=1))
+    first = graph.export()
+    assert graph.export() is first
+    graph.apply(response(2, pair=3, version=2))
+    version, compact, choices, responded = graph.export()
+    assert version == 2 and compact.n_edges == 2
+    assert sorted(choices) == [(1, 2, 2), (2, 3, 3)] and responded == [1, 2]
@@ -0,0 +1,42 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from utils.response_store import ResponseStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ResponseStore(tmp_path / "friends.sqlite3")
+
+
+def test_submit_bumps_version(store):
+    assert store.version() == 0
+    assert store.submit(1, [2, 3, 4], 2, [5]) == 1
+    assert store.submit(2, [1], None, []) == 2
+    assert store.version() == 2
+    assert store.version("다른 반") == 0
+
+
+def test_resubmit_replaces_previous_answer(store):
+    store.submit(1, [2, 3, 4], 2, [5, 6])
+    store.submit(2, [1], 1, [])
+    store.submit(1, [3], 4, [1, 7])  # 자기 자신은 저장하지 않습니다.
+
+    responses = {r['student_id']: r for r in store.responses()}
+    assert responses[1] == {'student_id': 1, 'room_friends': [3], 'pair_friend': 4,
+                            'talk_friends': [7], 'version': 3}
+    # 버전 이후의 응답만 읽으면 다시 제출한 학생만 나옵니다.
+    assert [r['student_id'] for r in store.responses(since_version=2)] == [1]
+
+
+def test_concurrent_submissions_get_distinct_versions(store):
+    students = range(1, 41)
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        versions = list(pool.map(lambda s: store.submit(s, [s % 40 + 1], None, [], class_id="3반"), students))
+
+    assert sorted(versions) == list(range(1, 41))
+    assert store.version("3반") == 40
+    responses = store.responses("3반")
+    assert sorted(r['student_id'] for r in responses) == list(students)
+    assert [r['version'] for r in responses] == sorted(r['version'] for r in responses)
@@ -0,0 +1,70 @@
+import networkx as nx
+import numpy as np
+import pytest
+
+from utils.graph_core import CompactGraph
+from utils.sociometry import analyze, betweenness, eigenvector, label_propagation
+
+
+def random_graph(n, p, seed):
+    """학생 1..n 사이에 무작위 관계를 둔 CompactGraph (관계 종류 1~3)"""
+    rng = np.random.default_rng(seed)
+    edges = [(a, b, int(rng.integers(1, 4)))
+             for a in range(1, n + 1) for b in range(a + 1, n + 1) if rng.random() < p]
+    return CompactGraph.from_edges(range(1, n + 1), edges)
+
+
+@pytest.mark.parametrize("n, p, seed", [(29, 0.1, 0), (60, 0.05, 1), (40, 0.3, 2)])
+def test_betweenness_matches_networkx(n, p, seed):
+    compact = random_graph(n, p, seed)
+    values, sampled = betweenness(compact)
+    assert not sampled
+    expected = nx.betweenness_centrality(compact.to_networkx(), normalized=True)
+    assert np.allclose(values, [expected[s] for s in compact.labels.tolist()])
+
+
+def test_betweenness_sampled_is_close():
+    compact = random_graph(300, 0.03, 3)
+    values, sampled = betweenness(compact, samples=150)
+    assert sampled
+    expected = nx.betweenness_centrality(compact.to_networkx(), normalized=True)
+    expected = np.array([expected[s] for s in compact.labels.tolist()])
+    # 표본 근사라도 중심성이 높은 학생은 같아야 합니다.
+    assert set(np.argsort(values)[-5:]) & set(np.argsort(expected)[-5:])
+    assert abs(values.sum() - expected.sum()) / expected.sum() < 0.2
+
+
+def test_eigenvector_matches_networkx():
+    compact = random_graph(40, 0.2, 4)
+    graph = compact.to_networkx()
+    assert nx.is_connected(graph)
+    expected = nx.eigenvector_centrality(graph, max_iter=1000, tol=1e-10, weight='weight')
+    expected = np.array([expected[s] for s in compact.labels.tolist()])
+    assert np.allclose(eigenvector(compact), expected / expected.max(), atol=1e-5)
+
+
+def test_label_propagation_separates_cliques():
+    # 서로 연결되지 않은 두 무리 + 혼자인 학생
+    edges = [(a, b, 2) for group in ((1, 2, 3, 4), (5, 6, 7)) for i, a in enumerate(group) for b in group[i + 1:]]
+    compact = CompactGraph.from_edges(range(1, 9), edges)
+    labels = label_propagation(compact)
+    assert len(set(labels[:4])) == 1 and len(set(labels[4:7])) == 1
+    assert labels[0] != labels[4]
+    assert labels[7] not in labels[:7]
+    assert list(label_propagation(compact)) == list(labels)  # 시드가 같으면 결과도 같습니다.
+
+
+def test_analyze_report():
+    choices = [(1, 2, 3), (2, 1, 3), (3, 1, 3), (1, 3, 2), (4, 1, 1)]
+    edges = [(1, 2, 3), (1, 3, 3), (1, 4, 1)]
+    compact = CompactGraph.from_edges(range(1, 6), edges)
+    report = analyze(compact, choices, responded=[1, 2, 3, 4])
+
+    table = report['table'].set_index('학생')
+    assert table['받은 선택'].tolist() == [3, 1, 1, 0, 0]
+    assert report['isolates'] == [4, 5]
+    assert report['pair_choices'] == 3
+    assert report['mutual_pairs'] == [(1, 2)]
+    assert report['pair_reciprocity'] == pytest.approx(2 / 3)
+    assert report['communities'] == [[1, 2, 3, 4]]
+    assert table.loc[5, '모둠'] == 0 and not table.loc[5, '응답']
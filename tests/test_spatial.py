@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+from utils.spatial import SpotIndex, haversine_km
+
+
+@pytest.fixture
+def spots():
+    rng = np.random.default_rng(0)
+    lats = rng.uniform(41.5, 45.4, 500)
+    lons = rng.uniform(139.8, 145.5, 500)
+    return [{'name': f"관광지 {i}", 'lat': float(lat), 'lon': float(lon)} for i, (lat, lon) in enumerate(zip(lats, lons))]
+
+
+def brute_distances(spots, lat, lon):
+    return haversine_km(lat, lon, np.array([s['lat'] for s in spots]), np.array([s['lon'] for s in spots]))
+
+
+def test_haversine_known_distance():
+    # 삿포로역 - 신치토세 공항 (직선 약 43km)
+    assert haversine_km(43.0687, 141.3508, 42.7752, 141.6923) == pytest.approx(42.9, abs=0.5)
+
+
+@pytest.mark.parametrize("radius", [1.0, 12.5, 80.0])
+def test_within_matches_brute_force(spots, radius):
+    index = SpotIndex(spots)
+    dist = brute_distances(spots, 43.06, 141.35)
+    found = index.within(43.06, 141.35, radius)
+    assert sorted(s['name'] for _, s in found) == sorted(spots[i]['name'] for i in np.flatnonzero(dist <= radius))
+    assert [d for d, _ in found] == sorted(d for d, _ in found)
+
+
+def test_nearest_matches_brute_force(spots):
+    index = SpotIndex(spots)
+    dist = brute_distances(spots, 44.0, 142.0)
+    found = index.nearest(44.0, 142.0, k=7)
+    assert [s['name'] for _, s in found] == [spots[i]['name'] for i in np.argsort(dist, kind='stable')[:7]]
+    assert len(index.nearest(44.0, 142.0, k=10_000)) == len(spots)
+
+
+def test_bbox_matches_brute_force(spots):
+    index = SpotIndex(spots)
+    found = index.bbox(42.5, 141.0, 43.5, 142.5)
+    expected = [s['name'] for s in spots if 42.5 <= s['lat'] <= 43.5 and 141.0 <= s['lon'] <= 142.5]
+    assert [s['name'] for _, s in found] == expected
+    assert all(d is None for d, _ in found)
+
+
+def test_empty_index():
+    index = SpotIndex([])
+    assert index.within(43.0, 141.0, 10) == []
+    assert index.nearest(43.0, 141.0) == []
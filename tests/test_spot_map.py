@@ -0,0 +1,16 @@
+from utils.spot_map import render_spot_map, spots_key
+
+
+def test_popup_escapes_spot_text():
+    spot = {'name': '<script>alert(1)</script>', 'description': '"설명" & <b>굵게</b>',
+            'image_url': 'https://example.com/a.jpg', 'lat': 43.06, 'lon': 141.35}
+    page = render_spot_map([spot])
+    assert '<script>alert(1)</script>' not in page
+    assert '&lt;script&gt;alert(1)&lt;/script&gt;' in page
+    assert '&quot;설명&quot; &amp; &lt;b&gt;굵게&lt;/b&gt;' in page
+
+
+def test_spots_key_depends_on_content():
+    spots = [{'name': '오도리 공원', 'lat': 43.06, 'lon': 141.35}]
+    assert spots_key(spots) == spots_key([dict(spots[0])])
+    assert spots_key(spots) != spots_key([{**spots[0], 'lat': 43.07}])
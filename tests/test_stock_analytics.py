@@ -0,0 +1,39 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.stock_analytics import align
+
+
+@pytest.fixture
+def prices():
+    # B는 사흘째에 상장했고, A는 닷새째가 휴장일입니다.
+    index = pd.date_range("2024-01-01", periods=6, freq="D")
+    return pd.DataFrame({
+        "A": [1.0, 2.0, 3.0, 4.0, np.nan, 6.0],
+        "B": [np.nan, np.nan, 30.0, 40.0, 50.0, 60.0],
+    }, index=index)
+
+
+def test_rebase_first_valid_keeps_every_date(prices):
+    result = align(prices, "rebase_first_valid")
+    assert len(result) == len(prices)
+    assert result["B"].isna().tolist() == [True, True, False, False, False, False]
+    assert result["A"].iloc[4] == 4.0  # 중간 빈칸만 직전 값으로 채웁니다.
+
+
+def test_ffill_starts_when_every_ticker_has_started(prices):
+    result = align(prices, "ffill")
+    assert result.index[0] == prices.index[2]
+    assert not result.isna().any().any()
+    assert result["A"].tolist() == [3.0, 4.0, 4.0, 6.0]
+
+
+def test_intersect_keeps_common_dates_only(prices):
+    result = align(prices, "intersect")
+    assert result.index.tolist() == [prices.index[i] for i in (2, 3, 5)]
+
+
+def test_unknown_policy():
+    with pytest.raises(ValueError):
+        align(pd.DataFrame({"A": [1.0]}), "bfill")
@@ -0,0 +1,22 @@
+import pandas as pd
+
+from utils.ticker_cache import trading_day_range
+
+
+def test_weekday_range_is_unchanged():
+    start, end = trading_day_range("2024-03-04", "2024-03-09")  # 월요일 ~ 금요일(끝은 다음 날 0시)
+    assert start == pd.Timestamp("2024-03-04")
+    assert end == pd.Timestamp("2024-03-09")
+
+
+def test_weekend_edges_move_to_trading_days():
+    # 토요일 시작은 다음 월요일로, 일요일까지의 끝은 금요일 다음 날로 맞춥니다.
+    start, end = trading_day_range("2024-03-02", "2024-03-11")
+    assert start == pd.Timestamp("2024-03-04")
+    assert end == pd.Timestamp("2024-03-09")
+
+
+def test_ranges_differing_only_by_weekend_share_a_key():
+    friday_end = trading_day_range("2024-01-01 09:30", "2024-03-09")
+    sunday_end = trading_day_range("2024-01-01", "2024-03-11")
+    assert friday_end == sunday_end
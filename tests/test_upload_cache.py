@@ -0,0 +1,42 @@
+import os
+
+import pandas as pd
+
+from utils.upload_cache import UploadCache, content_key
+
+
+def frame(n):
+    return pd.DataFrame({"value": range(n)})
+
+
+def file_size(cache, key):
+    return (cache.root / f"{key}.feather").stat().st_size
+
+
+def test_roundtrip(tmp_path):
+    cache = UploadCache(root=tmp_path)
+    hit, df = cache.get_or_parse("a", lambda: frame(3))
+    assert not hit
+    hit, df = cache.get_or_parse("a", lambda: frame(0))
+    assert hit and df["value"].tolist() == [0, 1, 2]
+
+
+def test_least_recently_used_file_is_evicted(tmp_path):
+    cache = UploadCache(root=tmp_path)
+    cache.put("a", frame(100))
+    size = file_size(cache, "a")
+    cache.max_bytes = size * 2
+    cache.put("b", frame(100))
+    # 'a'를 나중에 쓴 것으로 만들어, 새 파일이 들어오면 'b'가 먼저 지워지게 합니다.
+    os.utime(cache.root / "b.feather", (1, 1))
+    assert cache.get("a") is not None
+
+    cache.put("c", frame(100))
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+
+
+def test_key_depends_on_schema():
+    data = b"a,b\n1,2\n"
+    assert content_key(data, {"a": "int16"}) != content_key(data, {"a": "float32"})
+    assert content_key(data, {"a": "int16"}) == content_key(data, {"a": "int16"})
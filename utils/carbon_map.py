@@ -0,0 +1,123 @@
+import json
+from functools import lru_cache
+
+import numpy as np
+
+from utils.geo import load_geometry
+
+# 탄소배출량 지도
+# 지도를 두 단계로 나눕니다.
+# - render_base_map(): 국경 GeoJSON, 툴팁, 타일이 들어간 정적인 HTML. 해상도마다 한 번만 만듭니다.
+# - apply_emission_style(): 업로드된 데이터로 나라 코드 -> 색상 표만 계산해서 정적 HTML에 끼워 넣습니다.
+# 데이터가 바뀌어도 국경 데이터를 다시 읽거나 직렬화하지 않고, 데이터 크기만큼만 일합니다.
+# folium(branca, jinja2)은 무거우므로 기본 지도를 처음 만들 때 불러옵니다. (색상 표 계산에는 필요 없음)
+
+EMISSION_COLORS = ['#ffffcc', '#c7e9b4', '#7fcdbb', '#41b6c4', '#2c7fb8', '#253494']  # YlGnBu 6단계
+NO_DATA_COLOR = '#d9d9d9'
+LEGEND_CAPTION = '연간 탄소배출량 (백만 톤)'
+STYLE_PLACEHOLDER = '"__CARBON_STYLE_DATA__"'
+
+
+# 브라우저에서 나라 코드 -> 색상 표를 읽어 GeoJson 레이어를 색칠하고 범례를 그립니다.
+EMISSION_STYLE_TEMPLATE = """
+    {% macro script(this, kwargs) %}
+    (function() {
+        var data = """ + STYLE_PLACEHOLDER + """;
+        var layer = {{ this.layer.get_name() }};
+        var map = {{ this.map.get_name() }};
+        if (!data || typeof data !== "object") { return; }
+        function style(feature) {
+            var color = data.colors[feature.id];
+            return {
+                fillColor: color || data.no_data_color,
+                color: "#000000",
+                fillOpacity: 0.7,
+                weight: 0.2
+            };
+        }
+        // resetStyle(마우스 아웃)도 같은 색을 쓰도록 레이어 기본 스타일을 바꿉니다.
+        layer.options.style = style;
+        layer.setStyle(style);
+
+        var legend = L.control({position: "topright"});
+        legend.onAdd = function() {
+            var div = L.DomUtil.create("div");
+            div.style.cssText = "background:white;padding:6px 8px;font:12px sans-serif;border-radius:4px;";
+            var html = "<b>" + data.caption + "</b><br>";
+            for (var i = 0; i < data.legend_colors.length; i++) {
+                html += '<i style="display:inline-block;width:14px;height:10px;background:' +
+                    data.legend_colors[i] + '"></i> ' +
+                    data.bins[i].toLocaleString() + " ~ " + data.bins[i + 1].toLocaleString() + "<br>";
+            }
+            div.innerHTML = html;
+            return div;
+        };
+        legend.addTo(map);
+    })();
+    {% endmacro %}
+"""
+
+
+@lru_cache(maxsize=None)
+def _emission_style_class():
+    from branca.element import MacroElement
+    from jinja2 import Template
+
+    class EmissionStyle(MacroElement):
+        _template = Template(EMISSION_STYLE_TEMPLATE)
+
+        def __init__(self, layer, map_):
+            super().__init__()
+            self._name = "EmissionStyle"
+            self.layer = layer
+            self.map = map_
+
+    return EmissionStyle
+
+
+def render_base_map(geo_level):
+    """국경, 툴팁, 타일만 들어간 지도 HTML. 데이터와 무관하므로 해상도마다 한 번만 만들면 됩니다."""
+    import folium
+
+    country_geo = load_geometry(geo_level)
+
+    m = folium.Map(location=[0, 0], zoom_start=2, tiles="OpenStreetMap")
+    highlight_function = lambda x: {'fillColor': '#000000', 'color': '#000000', 'fillOpacity': 0.50, 'weight': 0.1}
+    layer = folium.GeoJson(
+        country_geo,
+        name='탄소배출량',
+        highlight_function=highlight_function,
+        tooltip=folium.GeoJsonTooltip(
+            fields=['name', 'id'],  # GeoJSON의 속성 (나라 이름, 코드)
+            aliases=['나라', '코드'],
+            localize=True
+        )
+    ).add_to(m)
+    m.add_child(_emission_style_class()(layer, m))
+    return m.get_root().render()
+
+
+def emission_style(emission_df):
+    """나라 코드 -> 색상 표와 범례 정보. 데이터 크기에 비례하는 작은 dict입니다."""
+    codes = emission_df['country_code'].astype(str).to_numpy()
+    values = emission_df['emission_mt'].to_numpy(dtype='float64')
+    vmin, vmax = float(values.min()), float(values.max())
+    if vmin == vmax:
+        vmax = vmin + 1
+    bins = np.linspace(vmin, vmax, len(EMISSION_COLORS) + 1)
+    # 각 값이 몇 번째 구간에 속하는지 한 번에 계산합니다.
+    levels = np.clip(np.searchsorted(bins, values, side='right') - 1, 0, len(EMISSION_COLORS) - 1)
+    palette = np.array(EMISSION_COLORS)
+    return {
+        'colors': dict(zip(codes.tolist(), palette[levels].tolist())),
+        'bins': [round(b, 2) for b in bins.tolist()],
+        'legend_colors': EMISSION_COLORS,
+        'no_data_color': NO_DATA_COLOR,
+        'caption': LEGEND_CAPTION,
+    }
+
+
+def apply_emission_style(base_html, emission_df):
+    """정적 지도 HTML에 데이터별 색상 표를 끼워 넣은 HTML을 돌려줍니다."""
+    payload = json.dumps(emission_style(emission_df), ensure_ascii=False).replace('</', '<\\/')
+    return base_html.replace(STYLE_PLACEHOLDER, payload, 1)
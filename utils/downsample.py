@@ -0,0 +1,99 @@
+import numpy as np
+import pandas as pd
+
+# 차트용 다운샘플링
+# 긴 시계열을 브라우저로 보내기 전에 화면 폭에 맞는 점 개수로 줄입니다.
+# - lttb: Largest-Triangle-Three-Buckets. 모양을 가장 잘 보존합니다.
+# - minmax: 구간마다 최솟값/최댓값만 남깁니다. 급등락(스파이크)을 놓치지 않습니다.
+# 컬럼마다 따로 줄인 뒤 긴 형식으로 내보내므로, 전송량은 기간 길이와 관계없이 컬럼 수 × 점 개수로 제한됩니다.
+
+METHODS = {
+    "lttb": "LTTB (모양 보존)",
+    "minmax": "구간별 최솟값/최댓값",
+    "none": "사용 안 함 (전체 데이터)",
+}
+
+
+def lttb_indices(x, y, n_out):
+    """LTTB로 남길 점의 위치(정렬된 정수 배열)를 돌려줍니다. x, y는 NaN이 없어야 합니다."""
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    # 첫 점과 마지막 점은 항상 남기고, 나머지를 n_out - 2개의 구간으로 나눕니다.
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    # 다음 구간의 평균점은 누적합으로 한 번에 구해 둡니다.
+    cx = np.concatenate(([0.0], np.cumsum(x)))
+    cy = np.concatenate(([0.0], np.cumsum(y)))
+    next_lo = edges[1:]
+    next_hi = np.append(edges[2:], n)
+    counts = next_hi - next_lo
+    avg_x = (cx[next_hi] - cx[next_lo]) / counts
+    avg_y = (cy[next_hi] - cy[next_lo]) / counts
+
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    prev = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        # 이전에 고른 점, 현재 구간의 후보들, 다음 구간의 평균점이 이루는 삼각형 넓이
+        area = np.abs(
+            (x[prev] - avg_x[i]) * (y[lo:hi] - y[prev])
+            - (x[prev] - x[lo:hi]) * (avg_y[i] - y[prev])
+        )
+        prev = lo + int(area.argmax())
+        selected[i + 1] = prev
+    return selected
+
+
+def minmax_indices(y, n_out):
+    """(n_out - 2) // 2개의 구간에서 최솟값과 최댓값 위치를 고릅니다. 구간 계산은 모두 배열 연산입니다."""
+    n = len(y)
+    n_buckets = max(1, (n_out - 2) // 2)
+    if n_out >= n:
+        return np.arange(n)
+    size = -(-n // n_buckets)  # 올림 나눗셈
+    padded = np.full(n_buckets * size, np.nan)
+    padded[:n] = y
+    buckets = padded.reshape(n_buckets, size)
+    offsets = np.arange(n_buckets) * size
+    lows = np.where(np.isnan(buckets), np.inf, buckets).argmin(axis=1) + offsets
+    highs = np.where(np.isnan(buckets), -np.inf, buckets).argmax(axis=1) + offsets
+    picked = np.concatenate(([0, n - 1], lows, highs))
+    return np.unique(picked[picked < n])
+
+
+def downsample_long(frame, max_points, method="lttb", var_name="series", value_name="value"):
+    """넓은 표를 컬럼별로 최대 max_points개씩만 남긴 긴 형식(인덱스, var_name, value_name)으로 바꿉니다.
+
+    컬럼마다 고른 날짜가 달라도 서로의 행을 늘리지 않으므로, 전송량은 컬럼 수 × max_points를 넘지 않습니다.
+    """
+    if method not in METHODS:
+        raise ValueError(f"알 수 없는 다운샘플링 방식입니다: {method}")
+    index_name = frame.index.name or "index"
+    if hasattr(frame.index, "asi8"):
+        x = frame.index.asi8.astype("float64")
+    else:
+        x = np.arange(len(frame), dtype="float64")
+    values = frame.to_numpy(dtype="float64")
+
+    picked_rows = []
+    for column in range(values.shape[1]):
+        y = values[:, column]
+        valid = np.flatnonzero(~np.isnan(y))
+        if method == "none" or len(valid) <= max_points:
+            picked = valid
+        elif method == "lttb":
+            picked = valid[lttb_indices(x[valid], y[valid], max_points)]
+        else:
+            picked = valid[minmax_indices(y[valid], max_points)]
+        picked_rows.append(picked)
+
+    counts = [len(picked) for picked in picked_rows]
+    rows = np.concatenate(picked_rows) if picked_rows else np.array([], dtype=np.int64)
+    columns = np.repeat(np.arange(values.shape[1]), counts)
+    return pd.DataFrame({
+        index_name: frame.index[rows],
+        var_name: np.repeat(frame.columns.to_numpy(dtype=object), counts),
+        value_name: values[rows, columns],
+    })
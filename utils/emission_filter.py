@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+
+# 연도/나라 필터 엔진
+# 데이터셋마다 한 번만 (나라, 연도) 순으로 정렬하고 나라별 시작·끝 위치를 기록해 둡니다.
+# 이후의 필터는 선택한 나라마다 연도 구간을 이진 탐색으로 찾아 잘라 붙이는 것뿐이라,
+# 슬라이더나 멀티셀렉트를 바꿀 때 전체 컬럼을 세 번씩 훑지 않습니다.
+
+
+class EmissionIndex:
+    def __init__(self, df, country_col='나라', year_col='연도'):
+        self.country_col = country_col
+        self.year_col = year_col
+
+        countries = df[country_col].astype(str)
+        categorical = pd.Categorical(countries)  # 범주는 정렬된 순서로 만들어집니다.
+        codes = categorical.codes.astype(np.int32)
+        years = df[year_col].to_numpy()
+
+        # 나라 코드, 연도 순으로 정렬
+        order = np.lexsort((years, codes))
+        frame = df.iloc[order].reset_index(drop=True)
+        frame[country_col] = pd.Categorical.from_codes(codes[order], categorical.categories)
+        self.frame = frame
+        self.years = years[order]
+
+        # offsets[i]:offsets[i + 1] 이 i번째 나라의 행 범위입니다.
+        self.offsets = np.searchsorted(codes[order], np.arange(len(categorical.categories) + 1))
+        self.countries = categorical.categories.tolist()
+        self._position = {name: i for i, name in enumerate(self.countries)}
+        self.min_year = int(self.years.min()) if len(self.years) else None
+        self.max_year = int(self.years.max()) if len(self.years) else None
+
+    def __len__(self):
+        return len(self.frame)
+
+    def row_positions(self, countries, year_from, year_to):
+        """선택 조건에 맞는 행 위치. 나라마다 이진 탐색 두 번이면 끝납니다."""
+        parts = []
+        for country in countries:
+            i = self._position.get(country)
+            if i is None:
+                continue
+            start, end = self.offsets[i], self.offsets[i + 1]
+            years = self.years[start:end]
+            lo = start + np.searchsorted(years, year_from, side='left')
+            hi = start + np.searchsorted(years, year_to, side='right')
+            if lo < hi:
+                parts.append(np.arange(lo, hi))
+        return np.concatenate(parts) if parts else np.array([], dtype=np.int64)
+
+    def filter(self, countries, year_from, year_to):
+        return self.frame.iloc[self.row_positions(countries, year_from, year_to)]
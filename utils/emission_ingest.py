@@ -0,0 +1,129 @@
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+# 탄소배출량 파일 스트리밍 읽기
+# 파일 전체를 한 번에 읽지 않고 CHUNK_ROWS 행씩 읽어, 필요한 컬럼만 작은 자료형으로 바꿔 쌓습니다.
+# - CSV: 헤더를 먼저 읽어 컬럼을 검사한 뒤 chunksize로 나눠 읽습니다.
+# - xlsx: openpyxl read-only 모드로 행을 흘려 읽습니다. (전체 시트를 메모리에 올리지 않음)
+# 메모리 사용량은 읽는 중인 청크 하나 + 압축된 결과 정도로 유지됩니다.
+
+CHUNK_ROWS = 50_000
+
+# 페이지별 필수 컬럼과 자료형
+MAP_SCHEMA = {'country_code': 'category', 'emission_mt': 'float32'}
+TREND_SCHEMA = {'연도': 'int16', '나라': 'category', '탄소배출량': 'float32'}
+EMPTY_FILE = "업로드된 파일이 비어 있습니다."  # 헤더 줄도 없는 파일 (형식과 관계없이 같은 메시지)
+
+
+class IngestError(ValueError):
+    """파일 형식이나 컬럼 구성이 맞지 않을 때 발생합니다. 메시지는 화면에 그대로 보여줍니다."""
+
+
+def _check_columns(header, schema):
+    missing = [col for col in schema if col not in header]
+    if missing:
+        raise IngestError(f"업로드된 파일에 '{', '.join(missing)}' 컬럼이 없습니다. 열 이름을 확인해주세요.")
+
+
+def _typed(chunk, schema):
+    # 숫자로 바꿀 수 없는 값이나 빈 값이 있는 행은 버리고, 컬럼마다 작은 자료형으로 바꿉니다.
+    chunk = chunk[list(schema)].copy()
+    for col, dtype in schema.items():
+        if dtype != 'category':
+            chunk[col] = pd.to_numeric(chunk[col], errors='coerce')
+    chunk = chunk.dropna(subset=list(schema))
+    for col, dtype in schema.items():
+        if dtype == 'category':
+            chunk[col] = chunk[col].astype(str).str.strip().astype('category')
+        else:
+            chunk[col] = chunk[col].astype(dtype)
+    return chunk.reset_index(drop=True)
+
+
+def _iter_csv(file, schema, chunk_rows):
+    try:
+        header = pd.read_csv(file, nrows=0).columns
+    except pd.errors.EmptyDataError:
+        raise IngestError(EMPTY_FILE) from None
+    _check_columns(header, schema)
+    file.seek(0)
+    reader = pd.read_csv(
+        file,
+        usecols=list(schema),
+        dtype={col: 'string' for col, dtype in schema.items() if dtype == 'category'},
+        chunksize=chunk_rows,
+    )
+    for chunk in reader:
+        yield _typed(chunk, schema)
+
+
+def _iter_xlsx(file, schema, chunk_rows):
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(file, read_only=True, data_only=True)
+    try:
+        # pd.read_excel과 같이 첫 번째 시트를 읽습니다.
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            raise IngestError(EMPTY_FILE)
+        header = [str(h).strip() if h is not None else '' for h in header]
+        _check_columns(header, schema)
+        positions = [header.index(col) for col in schema]
+
+        buffer = []
+        for row in rows:
+            buffer.append([row[i] if i < len(row) else None for i in positions])
+            if len(buffer) >= chunk_rows:
+                yield _typed(pd.DataFrame(buffer, columns=list(schema)), schema)
+                buffer = []
+        if buffer:
+            yield _typed(pd.DataFrame(buffer, columns=list(schema)), schema)
+    finally:
+        workbook.close()
+
+
+def _iter_xls(file, schema, chunk_rows):
+    # 예전 .xls 형식은 스트리밍 읽기를 지원하지 않아 한 번에 읽은 뒤 청크로 나눕니다.
+    df = pd.read_excel(file)
+    _check_columns(df.columns, schema)
+    for start in range(0, len(df), chunk_rows):
+        yield _typed(df.iloc[start:start + chunk_rows], schema)
+
+
+def iter_chunks(file, name, schema, chunk_rows=CHUNK_ROWS):
+    """업로드 파일을 청크 단위로 읽어 schema의 자료형으로 바꾼 DataFrame을 차례로 돌려줍니다."""
+    name = name.lower()
+    if name.endswith('.csv'):
+        return _iter_csv(file, schema, chunk_rows)
+    if name.endswith('.xlsx'):
+        return _iter_xlsx(file, schema, chunk_rows)
+    if name.endswith('.xls'):
+        return _iter_xls(file, schema, chunk_rows)
+    raise IngestError("지원되지 않는 파일 형식입니다. CSV 또는 Excel 파일을 업로드해주세요.")
+
+
+def concat_chunks(chunks, schema):
+    """청크들을 하나로 합칩니다. 범주형 컬럼은 범주를 합쳐서 category 자료형을 유지합니다."""
+    if not chunks:
+        return pd.DataFrame({col: pd.Series(dtype=dtype) for col, dtype in schema.items()})
+    columns = {}
+    for col, dtype in schema.items():
+        if dtype == 'category':
+            columns[col] = union_categoricals([chunk[col] for chunk in chunks])
+        else:
+            columns[col] = pd.concat([chunk[col] for chunk in chunks], ignore_index=True)
+    return pd.DataFrame(columns)
+
+
+def read_emissions(file, name, schema, chunk_rows=CHUNK_ROWS, on_first_chunk=None):
+    """파일 전체를 청크 단위로 읽어 하나의 DataFrame으로 돌려줍니다.
+
+    on_first_chunk가 있으면 첫 청크를 읽자마자 호출하므로, 나머지를 읽는 동안 미리보기를 보여줄 수 있습니다.
+    """
+    chunks = []
+    for chunk in iter_chunks(file, name, schema, chunk_rows):
+        if not chunks and on_first_chunk is not None:
+            on_first_chunk(chunk)
+        chunks.append(chunk)
+    return concat_chunks(chunks, schema)
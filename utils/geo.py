@@ -0,0 +1,191 @@
+import json
+import sys
+import threading
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+
+# 세계 지도 GeoJSON 자산
+# - build_assets(): 원본 world-countries.json을 해상도별로 단순화해 미리 만들어 둡니다.
+#   나라끼리 맞닿은 국경은 한 번만 단순화해 양쪽에 똑같이 쓰므로, 단순화 후에도 틈이나 겹침이 생기지 않습니다.
+# - load_geometry(): 서버 프로세스마다 한 번만 읽고 파싱한 결과를 모든 세션이 공유합니다.
+#
+# 자산 다시 만들기:  python -m utils.geo
+
+GEO_DIR = Path(__file__).resolve().parent.parent / "pages"
+SOURCE_PATH = GEO_DIR / "world-countries.json"
+
+# 해상도 이름 -> (단순화 허용 오차(도), 좌표 소수점 자릿수)
+LEVELS = {
+    "low": (0.5, 2),
+    "medium": (0.1, 3),
+    "high": (0.02, 4),
+}
+LEVEL_LABELS = {
+    "low": "낮음 (가장 가벼움)",
+    "medium": "보통",
+    "high": "높음",
+    "full": "원본",
+}
+DEFAULT_LEVEL = "medium"
+
+_load_lock = threading.Lock()
+
+
+def asset_path(level):
+    if level == "full":
+        return SOURCE_PATH
+    return GEO_DIR / f"world-countries.{level}.json"
+
+
+def _rings(feature):
+    geometry = feature["geometry"]
+    polygons = geometry["coordinates"] if geometry["type"] == "MultiPolygon" else [geometry["coordinates"]]
+    for polygon in polygons:
+        for ring in polygon:
+            yield ring
+
+
+def _douglas_peucker(points, tolerance):
+    # points: (n, 2) 배열. 양 끝점은 항상 남깁니다.
+    n = len(points)
+    if n <= 2:
+        return points
+    keep = np.zeros(n, dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, n - 1)]
+    while stack:
+        lo, hi = stack.pop()
+        if hi - lo < 2:
+            continue
+        a, b = points[lo], points[hi]
+        segment = points[lo + 1:hi]
+        ab = b - a
+        length = np.hypot(*ab)
+        if length == 0:
+            # 닫힌 고리처럼 양 끝점이 같으면 점까지의 거리를 씁니다.
+            distances = np.hypot(*(segment - a).T)
+        else:
+            distances = np.abs(ab[0] * (segment[:, 1] - a[1]) - ab[1] * (segment[:, 0] - a[0])) / length
+        index = int(distances.argmax())
+        if distances[index] > tolerance:
+            mid = lo + 1 + index
+            keep[mid] = True
+            stack.append((lo, mid))
+            stack.append((mid, hi))
+    return points[keep]
+
+
+def simplify_collection(collection, tolerance, precision):
+    """국경을 공유하는 나라끼리 같은 결과가 나오도록 단순화한 새 FeatureCollection을 돌려줍니다."""
+    # 1) 꼭짓점마다 그 점을 지나는 고리(ring)의 집합을 구합니다.
+    rings = [ring for feature in collection["features"] for ring in _rings(feature)]
+    owners = {}
+    for ring_id, ring in enumerate(rings):
+        for point in ring[:-1]:
+            owners.setdefault(tuple(point), set()).add(ring_id)
+    owners = {point: frozenset(ids) for point, ids in owners.items()}
+
+    arc_cache = {}
+
+    def simplify_arc(arc):
+        # 같은 국경은 방향과 관계없이 같은 키로 한 번만 단순화합니다.
+        forward = tuple(map(tuple, arc))
+        backward = forward[::-1]
+        key = min(forward, backward)
+        if key not in arc_cache:
+            arc_cache[key] = _douglas_peucker(np.asarray(key, dtype="float64"), tolerance)
+        result = arc_cache[key]
+        return result if key == forward else result[::-1]
+
+    def rounded(points):
+        points = [(round(x, precision), round(y, precision)) for x, y in points]
+        # 반올림으로 연속해서 같아진 점을 지웁니다.
+        return [p for i, p in enumerate(points) if p != points[i - 1]] if len(points) > 1 else points
+
+    def simplify_ring(ring):
+        points = [tuple(p) for p in ring[:-1]]
+        n = len(points)
+        if n < 3:
+            return ring
+        # 2) 지나는 고리 집합이 바뀌는 점(국경의 시작과 끝)을 고정점으로 잡습니다.
+        fixed = [
+            i for i in range(n)
+            if owners[points[i]] != owners[points[i - 1]] or owners[points[i]] != owners[points[(i + 1) % n]]
+        ]
+        if not fixed:
+            # 고정점이 없는 고리(섬, 다른 나라에 둘러싸인 나라)는 가장 작은 좌표에서 시작합니다.
+            fixed = [min(range(n), key=points.__getitem__)]
+        # 3) 고정점 사이의 구간(arc)을 따로 단순화해서 다시 잇습니다.
+        out = []
+        for k, start in enumerate(fixed):
+            stop = fixed[(k + 1) % len(fixed)]
+            length = (stop - start) % n or n
+            arc = [points[(start + j) % n] for j in range(length + 1)]
+            out.extend(map(tuple, simplify_arc(arc)[:-1]))
+        out = rounded(out)
+        if len(out) < 3:
+            # 너무 작아서 사라지는 고리는 단순화하지 않고 반올림만 합니다.
+            out = rounded(points)
+            if len(out) < 3:
+                return ring
+        return [list(p) for p in out] + [list(out[0])]
+
+    features = []
+    for feature in collection["features"]:
+        geometry = feature["geometry"]
+        if geometry["type"] == "MultiPolygon":
+            coordinates = [[simplify_ring(r) for r in polygon] for polygon in geometry["coordinates"]]
+        else:
+            coordinates = [simplify_ring(r) for r in geometry["coordinates"]]
+        features.append({
+            "type": "Feature",
+            "id": feature["id"],
+            # 툴팁에서 나라 코드를 보여줄 수 있도록 id를 properties에도 넣어 둡니다.
+            "properties": {**feature.get("properties", {}), "id": feature["id"]},
+            "geometry": {"type": geometry["type"], "coordinates": coordinates},
+        })
+    return {"type": "FeatureCollection", "features": features}
+
+
+def build_assets(levels=None):
+    """해상도별 단순화 GeoJSON 파일을 만들고 {해상도: 파일 크기}를 돌려줍니다."""
+    with open(SOURCE_PATH, "r", encoding="utf-8") as f:
+        source = json.load(f)
+    sizes = {}
+    for level in levels or LEVELS:
+        tolerance, precision = LEVELS[level]
+        simplified = simplify_collection(source, tolerance, precision)
+        path = asset_path(level)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(simplified, f, ensure_ascii=False, separators=(",", ":"))
+        sizes[level] = path.stat().st_size
+    return sizes
+
+
+@lru_cache(maxsize=None)
+def _load(level):
+    path = asset_path(level)
+    if not path.exists() and level in LEVELS:
+        # 배포본에 자산이 없으면 한 번 만들어서 씁니다.
+        build_assets([level])
+    with open(path, "r", encoding="utf-8") as f:
+        collection = json.load(f)
+    for feature in collection["features"]:
+        feature.setdefault("properties", {}).setdefault("id", feature.get("id"))
+    return collection
+
+
+def load_geometry(level=DEFAULT_LEVEL):
+    """해상도별 GeoJSON을 프로세스당 한 번만 읽어 공유합니다. 돌려받은 dict는 수정하지 마세요."""
+    if level not in LEVELS and level != "full":
+        raise ValueError(f"알 수 없는 지도 해상도입니다: {level}")
+    with _load_lock:
+        return _load(level)
+
+
+if __name__ == "__main__":
+    original = SOURCE_PATH.stat().st_size
+    for level, size in build_assets(sys.argv[1:] or None).items():
+        print(f"{asset_path(level).name}: {size:,} bytes ({size / original:.0%} of original)")
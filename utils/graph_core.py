@@ -0,0 +1,115 @@
+import numpy as np
+
+# 배열 기반의 작은 관계 그래프
+# 학급 하나(29명)가 아니라 학교나 지역 전체(수만 명)로 늘려도 메모리와 순회 비용이 작도록,
+# 엣지를 파이썬 dict가 아닌 배열로 저장합니다.
+# - 엣지 목록(COO): 양 끝 노드 위치(int32) 두 배열 + 관계 종류 코드(uint8) 한 배열
+# - 이웃 조회(CSR): 필요할 때 한 번 만들어 두는 indptr/indices/kinds 배열
+# - 색, 굵기, 이름 같은 표시 정보는 엣지마다 두지 않고 관계 종류 코드로 아래 표에서 찾습니다.
+# networkx나 pyvis 객체는 화면에 그리거나 다른 라이브러리에 넘길 때만 만듭니다.
+
+# 관계 종류 코드 -> 표시 정보 (0번은 '관계 없음' 자리)
+EDGE_TYPE_NAMES = np.array(['', '약간_친밀', '친밀', '가장_친밀'], dtype=object)
+EDGE_WEIGHTS = np.array([0, 1, 2, 3], dtype=np.uint8)
+EDGE_COLORS = np.array(['', 'lightgray', 'skyblue', 'red'], dtype=object)
+EDGE_WIDTHS = np.array([0, 1, 2, 4], dtype=np.uint8)
+
+
+def edge_style(kind):
+    """관계 종류 코드 하나의 표시 정보 (networkx 엣지 속성과 같은 모양)"""
+    return {
+        'type': EDGE_TYPE_NAMES[kind],
+        'weight': int(EDGE_WEIGHTS[kind]),
+        'color': EDGE_COLORS[kind],
+        'width': int(EDGE_WIDTHS[kind]),
+    }
+
+
+class CompactGraph:
+    """무방향 그래프. 노드는 0..n-1 위치로 다루고, labels[i]가 i번째 노드의 학생 번호입니다."""
+
+    def __init__(self, labels, src, dst, kinds):
+        self.labels = np.asarray(labels, dtype=np.int32)
+        self.src = np.asarray(src, dtype=np.int32)
+        self.dst = np.asarray(dst, dtype=np.int32)
+        self.kinds = np.asarray(kinds, dtype=np.uint8)
+        self._csr = None
+
+    @classmethod
+    def from_edges(cls, nodes, edges):
+        """학생 번호 목록과 (a, b, 관계 종류) 목록으로 만듭니다."""
+        labels = np.fromiter(nodes, dtype=np.int32)
+        order = np.argsort(labels, kind='stable')
+        labels = labels[order]
+        count = len(edges)
+        a = np.fromiter((e[0] for e in edges), dtype=np.int32, count=count)
+        b = np.fromiter((e[1] for e in edges), dtype=np.int32, count=count)
+        kinds = np.fromiter((e[2] for e in edges), dtype=np.uint8, count=count)
+        # 학생 번호 -> 위치: 정렬된 labels에서 이진 탐색
+        return cls(labels, np.searchsorted(labels, a), np.searchsorted(labels, b), kinds)
+
+    @property
+    def n_nodes(self):
+        return len(self.labels)
+
+    @property
+    def n_edges(self):
+        return len(self.src)
+
+    def csr(self):
+        """(indptr, indices, kinds). 노드 i의 이웃은 indices[indptr[i]:indptr[i + 1]] 입니다."""
+        if self._csr is None:
+            # 무방향이므로 양쪽 방향을 모두 넣고 출발 노드 순으로 정렬합니다.
+            heads = np.concatenate([self.src, self.dst])
+            tails = np.concatenate([self.dst, self.src])
+            kinds = np.concatenate([self.kinds, self.kinds])
+            order = np.argsort(heads, kind='stable')
+            indptr = np.zeros(self.n_nodes + 1, dtype=np.int64)
+            np.cumsum(np.bincount(heads, minlength=self.n_nodes), out=indptr[1:])
+            self._csr = (indptr, tails[order], kinds[order])
+        return self._csr
+
+    def neighbors(self, i):
+        indptr, indices, _ = self.csr()
+        return indices[indptr[i]:indptr[i + 1]]
+
+    def subgraph(self, mask):
+        """mask가 True인 노드만 남긴 그래프. 남은 노드끼리의 엣지만 유지합니다."""
+        mask = np.asarray(mask, dtype=bool)
+        position = np.cumsum(mask) - 1  # 기존 위치 -> 새 위치
+        keep = mask[self.src] & mask[self.dst]
+        return CompactGraph(self.labels[mask], position[self.src[keep]], position[self.dst[keep]], self.kinds[keep])
+
+    def degree(self, weighted=False):
+        """노드별 연결 수. weighted=True이면 관계 강도의 합입니다."""
+        weights = EDGE_WEIGHTS[self.kinds].astype(np.int64) if weighted else None
+        return (np.bincount(self.src, weights=weights, minlength=self.n_nodes)
+                + np.bincount(self.dst, weights=weights, minlength=self.n_nodes))
+
+    def edge_colors(self):
+        return EDGE_COLORS[self.kinds]
+
+    def edge_widths(self):
+        return EDGE_WIDTHS[self.kinds]
+
+    def to_networkx(self):
+        import networkx as nx
+
+        graph = nx.Graph()
+        graph.add_nodes_from(self.labels.tolist())
+        labels = self.labels
+        graph.add_edges_from(
+            (int(labels[a]), int(labels[b]), edge_style(kind))
+            for a, b, kind in zip(self.src.tolist(), self.dst.tolist(), self.kinds.tolist())
+        )
+        return graph
+
+    def to_pyvis(self, net):
+        """pyvis Network에 노드와 엣지를 넣어 돌려줍니다."""
+        labels = self.labels.tolist()
+        for node in labels:
+            net.add_node(node, label=str(node), title=f"학생 {node}")
+        names, colors, widths = EDGE_TYPE_NAMES[self.kinds], EDGE_COLORS[self.kinds], EDGE_WIDTHS[self.kinds].tolist()
+        for a, b, name, color, width in zip(self.src.tolist(), self.dst.tolist(), names, colors, widths):
+            net.add_edge(labels[a], labels[b], title=name, color=color, width=width)
+        return net
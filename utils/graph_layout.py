@@ -0,0 +1,217 @@
+import threading
+
+import numpy as np
+
+from utils.graph_core import EDGE_WEIGHTS
+
+# 서버에서 계산하는 관계 그래프 배치 (힘 기반 레이아웃, numpy)
+# 브라우저의 vis.js 물리 엔진은 보는 사람마다, 다시 그릴 때마다 시뮬레이션을 돌려 노드가 수백 개만 넘어도 탭이 멈추고
+# 그릴 때마다 배치가 달라집니다. 여기서는 그래프 버전마다 서버에서 한 번 배치를 계산해 좌표를 넘기고,
+# 브라우저의 물리 엔진은 끕니다.
+# - 반발력: 노드가 적으면 모든 쌍을 직접 계산하고, 많으면 격자 칸(Barnes-Hut처럼 먼 노드 무리를 칸의 무게중심
+#   하나로 묶음)으로 근사합니다.
+# - 새 노드만 배치: 이미 놓인 노드는 고정하고, 새로 생긴 노드만 이웃 근처에서 시작해 자리를 잡습니다.
+
+SCALE = 1000.0            # 배치 영역 한 변의 길이 (vis.js 좌표 단위)
+EXACT_LIMIT = 300         # 노드가 이보다 많으면 반발력을 격자로 근사합니다.
+LARGE_GRAPH = 5000        # 노드가 이보다 많으면 반복 횟수를 줄입니다.
+DEFAULT_ITERATIONS = 100
+LARGE_GRAPH_ITERATIONS = 30
+INCREMENTAL_ITERATIONS = 40
+HISTORY = 8               # 버전마다 보낸 좌표를 이만큼 기억해 두고, 세션에는 움직인 노드만 보냅니다.
+
+
+def _repulsion_exact(pos, k, active):
+    """active 노드가 모든 노드에게서 받는 반발력 (모든 쌍을 직접 계산)"""
+    delta = pos[active, None, :] - pos[None, :, :]
+    dist2 = (delta ** 2).sum(axis=-1)
+    dist2 = np.where(dist2 > 0, dist2, np.inf)  # 자기 자신 제외
+    force = np.zeros_like(pos)
+    force[active] = (delta * (k * k / dist2)[:, :, None]).sum(axis=1)
+    return force
+
+
+def _grid_cells(n):
+    # 칸 하나에 노드가 평균 네 개 남짓 들어가도록 (가까운 칸 계산과 먼 칸 계산의 비용이 비슷해지는 크기)
+    return int(np.clip(np.sqrt(n) / 2, 8, 64))
+
+
+def _repulsion_grid(pos, k, active, cells=None):
+    """격자 근사 반발력. 같은 칸과 이웃 칸의 노드끼리는 직접 계산하고,
+    나머지 먼 칸은 칸의 무게중심 하나로 묶어 칸 단위로 한 번만 계산합니다."""
+    n = len(pos)
+    cells = cells or _grid_cells(n)
+    lo = pos.min(axis=0)
+    size = np.maximum(pos.max(axis=0) - lo, 1e-9) / cells
+    cell_xy = np.minimum(((pos - lo) / size).astype(np.int64), cells - 1)
+    cell = cell_xy[:, 0] * cells + cell_xy[:, 1]
+    force = np.zeros_like(pos)
+
+    # 먼 칸: active 노드가 있는 칸 x 차 있는 칸 (칸 수는 최대 cells^2 개로 노드 수와 무관)
+    counts = np.bincount(cell, minlength=cells * cells).astype(float)
+    occupied = np.flatnonzero(counts)
+    centers = np.zeros((cells * cells, 2))
+    for d in range(2):
+        centers[occupied, d] = np.bincount(cell, weights=pos[:, d], minlength=cells * cells)[occupied] / counts[occupied]
+    targets = np.unique(cell[active])
+    delta = centers[targets, None, :] - centers[None, occupied, :]
+    dist2 = np.maximum((delta ** 2).sum(axis=-1), 1e-6)
+    near = ((np.abs(targets[:, None] // cells - occupied[None, :] // cells) <= 1)
+            & (np.abs(targets[:, None] % cells - occupied[None, :] % cells) <= 1))
+    weight = np.where(near, 0.0, counts[occupied][None, :] * k * k / dist2)
+    far = np.zeros((cells * cells, 2))
+    far[targets] = (delta * weight[:, :, None]).sum(axis=1)
+    force[active] += far[cell[active]]
+
+    # 가까운 칸: 칸 번호 순으로 정렬해 두고, 이웃 9칸 각각의 노드 범위를 한꺼번에 펼쳐 노드 쌍을 만듭니다.
+    order = np.argsort(cell, kind='stable')
+    starts = np.searchsorted(cell[order], np.arange(cells * cells + 1))
+    for dx in (-1, 0, 1):
+        for dy in (-1, 0, 1):
+            nx_, ny_ = cell_xy[active, 0] + dx, cell_xy[active, 1] + dy
+            inside = (nx_ >= 0) & (nx_ < cells) & (ny_ >= 0) & (ny_ < cells)
+            valid = active[inside]
+            other = nx_[inside] * cells + ny_[inside]
+            first, count = starts[other], starts[other + 1] - starts[other]
+            total = int(count.sum())
+            if total == 0:
+                continue
+            i = np.repeat(valid, count)
+            j = order[np.arange(total) + np.repeat(first - (np.cumsum(count) - count), count)]
+            keep = i != j
+            i, j = i[keep], j[keep]
+            d = pos[i] - pos[j]
+            w = k * k / np.maximum((d ** 2).sum(axis=1), 1e-6)
+            force[:, 0] += np.bincount(i, weights=d[:, 0] * w, minlength=n)
+            force[:, 1] += np.bincount(i, weights=d[:, 1] * w, minlength=n)
+    return force
+
+
+def force_layout(compact, init=None, fixed=None, iterations=None, seed=0):
+    """Fruchterman-Reingold 방식의 힘 기반 배치. (n, 2) 좌표 배열을 돌려줍니다.
+
+    init: 시작 좌표 (없으면 무작위), fixed: 움직이지 않을 노드의 불리언 배열
+    고정된 노드가 받는 힘은 계산하지 않으므로, 새 노드 몇 개만 배치할 때는 훨씬 빠릅니다.
+    """
+    n = compact.n_nodes
+    rng = np.random.default_rng(seed)
+    pos = rng.uniform(-SCALE / 2, SCALE / 2, size=(n, 2)) if init is None else np.array(init, dtype=float)
+    if n < 2:
+        return pos
+    movable = np.ones(n, dtype=bool) if fixed is None else ~np.asarray(fixed)
+    active = np.flatnonzero(movable)
+    if not len(active):
+        return pos
+    if iterations is None:
+        iterations = DEFAULT_ITERATIONS if n <= LARGE_GRAPH else LARGE_GRAPH_ITERATIONS
+
+    k = SCALE / np.sqrt(n)  # 노드 사이의 이상적인 거리
+    weights = EDGE_WEIGHTS[compact.kinds].astype(float)
+    src, dst = compact.src, compact.dst
+    repulsion = _repulsion_exact if n <= EXACT_LIMIT else _repulsion_grid
+    temperature = SCALE / 10
+
+    for _ in range(iterations):
+        force = repulsion(pos, k, active)
+        # 인력: 관계가 강할수록 더 가깝게
+        delta = pos[src] - pos[dst]
+        dist = np.maximum(np.sqrt((delta ** 2).sum(axis=1)), 1e-6)
+        pull = delta * (weights * dist / k)[:, None]
+        for d in range(2):
+            force[:, d] += np.bincount(dst, weights=pull[:, d], minlength=n) - np.bincount(src, weights=pull[:, d], minlength=n)
+        # 약한 중심 인력: 연결이 없는 학생이 멀리 흩어지지 않게 합니다.
+        force -= pos * (0.05 * np.sqrt(n) / k)
+
+        step = force[active]
+        length = np.maximum(np.sqrt((step ** 2).sum(axis=1)), 1e-9)
+        pos[active] += step * (np.minimum(length, temperature) / length)[:, None]
+        temperature *= 0.95
+    return pos
+
+
+class LayoutCache:
+    """그래프 하나의 배치를 기억해 두고, 새 버전에는 새로 연결된 노드만 배치합니다.
+
+    아직 아무와도 연결되지 않은 노드는 배치하지 않고 바깥 원 위에 번호 순으로 늘어놓습니다.
+    첫 관계가 생기면 그때 이웃 근처에 자리를 잡고, 이후에는 움직이지 않습니다.
+    """
+
+    def __init__(self, seed=0):
+        self.seed = seed
+        self._positions = {}  # 학생 번호 -> (x, y), 한 번 자리를 잡은 노드만
+        self._last = (None, None)  # (버전, 좌표 배열)
+        self._history = {}  # 버전 -> 좌표 배열 (최근 HISTORY개)
+        self.generation = 0  # reset()할 때마다 늘어납니다. 값이 바뀌면 브라우저에 좌표 전체를 다시 보내야 합니다.
+        self._lock = threading.Lock()
+
+    def reset(self):
+        """기억한 배치를 버립니다. 다음 호출에서 전체를 다시 배치합니다."""
+        with self._lock:
+            self._positions.clear()
+            self._last = (None, None)
+            self._history.clear()
+            self.generation += 1
+
+    def moved(self, since_version, version):
+        """since_version의 좌표에서 version의 좌표로 자리가 바뀐 노드 위치 배열. 기억하지 못하는 버전이면 None"""
+        with self._lock:
+            old, new = self._history.get(since_version), self._history.get(version)
+            if old is None or new is None or old.shape != new.shape:
+                return None
+            # 브라우저로 보내는 좌표는 소수 첫째 자리까지입니다.
+            return np.flatnonzero((np.abs(new - old) >= 0.05).any(axis=1))
+
+    def positions(self, version, compact):
+        """compact.labels 순서의 (n, 2) 좌표. 같은 버전이면 계산하지 않습니다."""
+        with self._lock:
+            last_version, last_pos = self._last
+            if last_version == version and last_pos is not None and len(last_pos) == compact.n_nodes:
+                return last_pos
+
+            labels = compact.labels.tolist()
+            connected = compact.degree() > 0
+            known = np.array([label in self._positions for label in labels], dtype=bool) & connected
+            new = connected & ~known
+
+            pos = self._initial(compact, labels, known, new)
+            if new.any():
+                # 연결된 학생끼리만 배치합니다. 바깥 원의 학생은 힘 계산에 넣지 않습니다.
+                iterations = INCREMENTAL_ITERATIONS if known.any() else None
+                pos[connected] = force_layout(compact.subgraph(connected), init=pos[connected],
+                                              fixed=known[connected], iterations=iterations, seed=self.seed)
+                pos[~connected] = _ring(pos[connected], int((~connected).sum()))
+            self._positions.update(
+                (label, tuple(xy)) for label, xy, c in zip(labels, pos.tolist(), connected) if c
+            )
+            self._last = (version, pos)
+            self._history[version] = pos
+            while len(self._history) > HISTORY:
+                del self._history[min(self._history)]
+            return pos
+
+    def _initial(self, compact, labels, known, new):
+        """놓인 노드는 그 자리에, 새 노드는 놓인 이웃들의 평균 위치 근처(이웃이 없으면 무작위)에서 시작합니다."""
+        rng = np.random.default_rng(self.seed + len(labels))
+        pos = np.zeros((len(labels), 2))
+        if known.any():
+            pos[known] = [self._positions[label] for label, k in zip(labels, known) if k]
+        indptr, indices, _ = compact.csr()
+        spread = SCALE / np.sqrt(len(labels))
+        for i in np.flatnonzero(new):
+            neighbors = indices[indptr[i]:indptr[i + 1]]
+            neighbors = neighbors[known[neighbors]]
+            if len(neighbors):
+                pos[i] = pos[neighbors].mean(axis=0) + rng.normal(scale=spread / 2, size=2)
+            else:
+                pos[i] = rng.uniform(-SCALE / 2, SCALE / 2, size=2)
+        isolated = ~(known | new)
+        pos[isolated] = _ring(pos[known | new], int(isolated.sum()))
+        return pos
+
+
+def _ring(placed, count):
+    """연결되지 않은 노드 count개를 배치된 노드들 바깥의 원 위에 고르게 놓습니다."""
+    radius = np.sqrt((placed ** 2).sum(axis=1)).max() * 1.15 if len(placed) else SCALE / 2
+    radius = max(radius, SCALE / 4)
+    angle = 2 * np.pi * np.arange(count) / max(count, 1) - np.pi / 2
+    return np.stack([radius * np.cos(angle), radius * np.sin(angle)], axis=1)
@@ -0,0 +1,75 @@
+import json
+from functools import lru_cache
+
+import numpy as np
+
+from utils.graph_core import EDGE_COLORS, EDGE_TYPE_NAMES, EDGE_WIDTHS
+
+# 관계 그래프를 브라우저(vis.js)로 보낼 데이터
+# 예전에는 요청마다 pyvis HTML 전체(템플릿 + 노드/엣지 JSON)를 새로 만들어 iframe을 통째로 다시 그렸습니다.
+# 지금은 vis.js 페이지가 정적 컴포넌트(utils/relation_map_frontend/index.html)라서 브라우저가 한 번만 불러오고,
+# 서버는 처음(또는 전체 다시 그리기)에만 전체 노드/엣지를 보내고 이후에는 바뀐 노드와 엣지만 보냅니다.
+# 브라우저는 받은 변경을 vis.js DataSet에 update/remove로 반영하므로 그래프 전체를 다시 배치하지 않습니다.
+
+DEFAULT_NODE_COLOR = '#97c2fc'
+
+
+@lru_cache(maxsize=8)
+def graph_options(font_color, physics):
+    """vis.js Network 옵션 (pyvis 기본값). 설정값 조합마다 프로세스에서 한 번만 만들고, 돌려준 dict는 고치지 않습니다."""
+    from pyvis.network import Network
+
+    net = Network(font_color=font_color, cdn_resources='remote')
+    net.toggle_physics(physics)
+    options = json.loads(net.options.to_json())
+    # 노드 공통 모양은 노드마다 반복하지 않고 옵션에 한 번만 넣습니다.
+    options['nodes'] = {'shape': 'dot', 'color': DEFAULT_NODE_COLOR, 'font': {'color': font_color}}
+    return options
+
+
+def edge_id(a, b):
+    """두 학생 사이 엣지의 vis.js id. 엣지가 바뀌거나 사라질 때 이 id로 찾아 고칩니다."""
+    return f"{min(a, b)}-{max(a, b)}"
+
+
+def node_data(labels, positions=None):
+    """학생 번호 목록 -> 노드 목록. positions(labels 순서의 (n, 2) 좌표)가 있으면 x, y 좌표를 넣습니다."""
+    labels = [int(node) for node in labels]
+    if positions is None:
+        return [{'id': node, 'label': str(node), 'title': f"학생 {node}"} for node in labels]
+    xs, ys = np.asarray(positions, dtype=float).reshape(-1, 2).round(1).T.tolist()
+    return [
+        {'id': node, 'label': str(node), 'title': f"학생 {node}", 'x': x, 'y': y}
+        for node, x, y in zip(labels, xs, ys)
+    ]
+
+
+def edge_data(a, b, kinds):
+    """엣지 양 끝 학생 번호 배열과 관계 종류 코드 배열 -> 엣지 목록"""
+    kinds = np.asarray(kinds, dtype=np.uint8)
+    names, colors, widths = EDGE_TYPE_NAMES[kinds], EDGE_COLORS[kinds], EDGE_WIDTHS[kinds].tolist()
+    return [
+        {'id': edge_id(x, y), 'from': x, 'to': y, 'title': name, 'color': color, 'width': width}
+        for x, y, name, color, width in zip(np.asarray(a).tolist(), np.asarray(b).tolist(), names, colors, widths)
+    ]
+
+
+def graph_data(compact, positions=None):
+    """CompactGraph 전체 -> (노드 목록, 엣지 목록)"""
+    labels = compact.labels
+    return node_data(labels, positions), edge_data(labels[compact.src], labels[compact.dst], compact.kinds)
+
+
+def delta_data(delta, compact, positions=None, moved=()):
+    """GraphDelta -> (바뀐 노드 목록, 바뀌거나 새로 생긴 엣지 목록, 사라진 엣지 id 목록)
+
+    moved: 자리가 바뀐 노드의 위치(compact.labels 기준). 서버 배치에서 새 노드가 들어오면 바깥 원의 학생들이 움직입니다.
+    """
+    index = set(np.searchsorted(compact.labels, sorted(delta.nodes)).tolist()) | set(np.asarray(moved).tolist())
+    index = sorted(index)
+    nodes = node_data(compact.labels[index], None if positions is None else np.asarray(positions)[index])
+
+    changed = sorted((a, b, kind) for (a, b), kind in delta.edges.items() if kind)
+    removed = sorted(edge_id(a, b) for (a, b), kind in delta.edges.items() if not kind)
+    a, b, kinds = (np.array(column) for column in zip(*changed)) if changed else ([], [], [])
+    return nodes, edge_data(a, b, kinds), removed
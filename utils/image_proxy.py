@@ -0,0 +1,198 @@
+import hashlib
+import io
+import json
+import os
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# 관광지 사진과 썸네일을 위한 로컬 이미지 파이프라인
+# - 원본: 이미지마다 한 번만 받아 내용 해시(sha256)를 이름으로 디스크에 저장합니다. (originals/<해시>)
+#   URL -> 내용 해시 대응은 urls/<URL 해시> 파일에 적어 둡니다.
+# - 변형: 페이지에서 실제로 쓰는 너비(150, 250, 300px)로 줄인 WebP를 Streamlit 정적 폴더에 만들어 둡니다.
+#   (static/images/<URL 해시>-w<너비>.webp, .streamlit/config.toml의 enableStaticServing으로 app/static/... 주소에서 제공)
+# - 제공: src()는 변형이 이미 있으면 그 정적 주소를, 없으면 원래 URL을 바로 돌려주고 변형은 백그라운드 스레드에서 만듭니다.
+#   페이지 HTML에는 주소만 들어가므로 <img loading="lazy">가 그대로 동작하고, 화면을 그리는 스레드는 외부 사이트를 기다리지 않습니다.
+# 받지 못했거나 Pillow가 없으면 계속 원래 URL을 씁니다.
+# 테스트에서는 IMAGE_FIXTURE_DIR의 manifest.json({URL: 파일 이름})이나 seed()로 원본을 미리 넣을 수 있고,
+# IMAGE_PROXY_FETCH=0이면 네트워크에서 받지 않습니다.
+
+DEFAULT_CACHE_DIR = Path(__file__).resolve().parent.parent / ".cache" / "images"
+DEFAULT_STATIC_DIR = Path(__file__).resolve().parent.parent / "static" / "images"
+STATIC_URL = "app/static/images"  # DEFAULT_STATIC_DIR의 주소 (페이지 기준 상대 주소)
+FETCH_TIMEOUT = 5           # 원본 다운로드 제한 시간 (초)
+FAILURE_TTL = 10 * 60       # 받지 못한 URL은 이 시간 동안 다시 시도하지 않습니다. (초)
+MAX_ORIGINAL_BYTES = 20 * 1024 * 1024
+WEBP_QUALITY = 80
+FILL_WORKERS = 4            # 변형을 만드는 백그라운드 스레드 수
+USER_AGENT = "Mozilla/5.0 (compatible; sapporo-guide-image-proxy)"
+
+
+def _sha256(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def _write_atomic(path, data):
+    tmp = path.with_suffix(f"{path.suffix}.{os.getpid()}.{threading.get_ident()}.tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+class ImageProxy:
+    def __init__(self, root=None, static_dir=None, fixture_dir=None, fetch=None, timeout=FETCH_TIMEOUT):
+        self.root = Path(root or os.environ.get("IMAGE_CACHE_DIR", DEFAULT_CACHE_DIR))
+        self.static_dir = Path(static_dir or os.environ.get("IMAGE_STATIC_DIR", DEFAULT_STATIC_DIR))
+        fixture_dir = fixture_dir or os.environ.get("IMAGE_FIXTURE_DIR")
+        self.fixture_dir = Path(fixture_dir) if fixture_dir else None
+        self.fetch = os.environ.get("IMAGE_PROXY_FETCH", "1") != "0" if fetch is None else fetch
+        self.timeout = timeout
+        for sub in ("originals", "urls"):
+            (self.root / sub).mkdir(parents=True, exist_ok=True)
+        self.static_dir.mkdir(parents=True, exist_ok=True)
+        self._failures = {}  # URL 또는 (URL, 너비) -> 실패 시각
+        self._ready = set()    # 정적 폴더에 있는 변형 (URL, 너비)
+        self._pending = set()  # 백그라운드에서 만드는 중인 변형 (URL, 너비)
+        self._executor = ThreadPoolExecutor(max_workers=FILL_WORKERS, thread_name_prefix="image-proxy")
+        self._lock = threading.Lock()
+        self._manifest = None
+
+    # --- 원본 ---
+
+    def _url_path(self, url):
+        return self.root / "urls" / _sha256(url.encode())
+
+    def seed(self, url, data):
+        """원본 바이트를 직접 넣습니다. (테스트 고정 데이터, 미리 받아 둔 파일)"""
+        digest = _sha256(data)
+        original = self.root / "originals" / digest
+        if not original.exists():
+            _write_atomic(original, data)
+        _write_atomic(self._url_path(url), digest.encode())
+        return digest
+
+    def _fixture(self, url):
+        if self.fixture_dir is None:
+            return None
+        if self._manifest is None:
+            try:
+                with open(self.fixture_dir / "manifest.json", encoding="utf-8") as f:
+                    self._manifest = json.load(f)
+            except (OSError, ValueError):
+                self._manifest = {}
+        name = self._manifest.get(url)
+        if name is None:
+            return None
+        try:
+            return (self.fixture_dir / name).read_bytes()
+        except OSError:
+            return None
+
+    def _download(self, url):
+        request = urllib.request.Request(url, headers={"User-Agent": USER_AGENT})
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            data = response.read(MAX_ORIGINAL_BYTES + 1)
+        if len(data) > MAX_ORIGINAL_BYTES:
+            raise ValueError(f"이미지가 너무 큽니다: {url}")
+        return data
+
+    def original_digest(self, url):
+        """원본의 내용 해시. 디스크 -> 고정 데이터 -> 네트워크 순으로 찾고, 없으면 None"""
+        try:
+            digest = self._url_path(url).read_text().strip()
+            if (self.root / "originals" / digest).exists():
+                return digest
+        except OSError:
+            pass
+
+        data = self._fixture(url)
+        if data is None:
+            if not self.fetch or time.time() - self._failures.get(url, 0) < FAILURE_TTL:
+                return None
+            try:
+                data = self._download(url)
+            except Exception:
+                self._failures[url] = time.time()
+                return None
+        return self.seed(url, data)
+
+    # --- 변형 ---
+
+    def _variant_name(self, url, width):
+        return f"{_sha256(url.encode())[:32]}-w{int(width)}.webp"
+
+    def variant(self, url, width):
+        """width 픽셀 너비로 줄인 WebP를 정적 폴더에 만들고 그 경로를 돌려줍니다. 만들 수 없으면 None"""
+        path = self.static_dir / self._variant_name(url, width)
+        if path.exists():
+            return path
+        digest = self.original_digest(url)
+        if digest is None:
+            return None
+        try:
+            from PIL import Image
+
+            with Image.open(self.root / "originals" / digest) as image:
+                image = image.convert("RGBA" if image.mode in ("RGBA", "LA", "P") else "RGB")
+                if image.width > width:
+                    # 가로 너비에 맞추고 세로는 비율대로 (키우지는 않습니다)
+                    image = image.resize((int(width), max(1, round(image.height * width / image.width))),
+                                         Image.Resampling.LANCZOS)
+                buffer = io.BytesIO()
+                image.save(buffer, "WEBP", quality=WEBP_QUALITY, method=4)
+        except Exception:
+            # Pillow가 없거나 이미지가 아닌 응답(HTML 오류 페이지 등)이면 원래 URL을 씁니다.
+            return None
+        _write_atomic(path, buffer.getvalue())
+        return path
+
+    def _fill(self, key):
+        try:
+            ok = self.variant(*key) is not None
+        except Exception:
+            ok = False
+        with self._lock:
+            self._pending.discard(key)
+            if ok:
+                self._ready.add(key)
+            else:
+                self._failures[key] = time.time()
+
+    def _is_ready(self, key):
+        if key in self._ready:
+            return True
+        if (self.static_dir / self._variant_name(*key)).exists():
+            # 다른 프로세스나 이전 실행에서 만들어 둔 변형
+            with self._lock:
+                self._ready.add(key)
+            return True
+        return False
+
+    def _schedule(self, key):
+        with self._lock:
+            if key in self._pending or key in self._ready or time.time() - self._failures.get(key, 0) < FAILURE_TTL:
+                return
+            self._pending.add(key)
+        self._executor.submit(self._fill, key)
+
+    def src(self, url, width):
+        """<img src>에 넣을 주소. 줄인 WebP가 있으면 정적 주소, 아직 없으면 원래 URL (그 사이 백그라운드에서 만듭니다)"""
+        key = (url, int(width))
+        if self._is_ready(key):
+            return f"{STATIC_URL}/{self._variant_name(url, width)}"
+        self._schedule(key)
+        return url
+
+    def prepare(self, urls, width):
+        """변형이 없는 이미지를 백그라운드에서 만들기 시작합니다. 아직 만드는 중인 이미지 수를 돌려줍니다.
+
+        받지 못한 이미지는 세지 않으므로, 0이 되면 더 기다려도 주소가 바뀌지 않습니다.
+        """
+        waiting = 0
+        for url in dict.fromkeys(urls):
+            key = (url, int(width))
+            if not self._is_ready(key):
+                self._schedule(key)
+                waiting += key in self._pending
+        return waiting
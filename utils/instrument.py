@@ -0,0 +1,239 @@
+import functools
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import nullcontext
+from pathlib import Path
+
+# 성능 측정 도구 (단계별 시간, 캐시 적중률, 화면으로 보내는 HTML 크기)
+# 켜는 방법
+# - APP_METRICS=1 환경 변수: 모든 세션에서 측정하고, 실행이 끝날 때마다 Prometheus 텍스트 파일과 로그 한 줄을 남깁니다.
+# - 주소 뒤에 ?debug=1: 그 세션에서만 측정하고 사이드바에 측정 패널을 보여줍니다.
+# 꺼져 있으면 stage()는 미리 만든 빈 컨텍스트를 돌려주고, 캐시 호출 수도 세지 않으므로 비용이 거의 없습니다.
+#
+# 페이지에서 쓰는 법
+#   instrument.start_run("페이지 이름")        # 페이지 맨 위
+#   with instrument.stage("주가 다운로드"): ...
+#   @instrument.cached(st.cache_data)           # st.cache_data 대신 (적중/미스 집계)
+#   instrument.html(html_content, height=500)   # st.components.v1.html 대신 (크기 집계)
+#   instrument.payload("이름", data)            # 컴포넌트로 보내는 데이터 (크기 집계)
+#   instrument.finish_run()                     # 페이지 맨 아래
+
+ENV_ENABLED = os.environ.get("APP_METRICS", "0") not in ("", "0")
+DEFAULT_METRICS_FILE = Path(__file__).resolve().parent.parent / ".cache" / "metrics.prom"
+DEBUG_QUERY_PARAM = "debug"
+
+logger = logging.getLogger("app.metrics")
+
+_NULL = nullcontext()
+_local = threading.local()   # 스크립트 실행 스레드마다 지금 실행의 기록
+_lock = threading.Lock()
+# 프로세스 전체 누적값 (Prometheus 출력용)
+_stage_totals = {}   # (페이지, 단계) -> [합계 초, 횟수]
+_cache_totals = {}   # 함수 이름 -> [호출 수, 미스 수]
+_payloads = {}       # (페이지, 이름) -> 마지막 크기 (바이트)
+
+
+class RunRecord:
+    """한 번의 스크립트 실행에서 모은 측정값"""
+
+    def __init__(self, page, show_panel):
+        self.page = page
+        self.show_panel = show_panel
+        self.started = time.perf_counter()
+        self.stages = []     # (단계, 초)
+        self.cache = {}      # 함수 이름 -> [호출 수, 미스 수]
+        self.payloads = {}   # 이름 -> 바이트
+
+    def stage(self, name):
+        return _Stage(self, name)
+
+
+class _Stage:
+    __slots__ = ("run", "name", "start")
+
+    def __init__(self, run, name):
+        self.run = run
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        self.run.stages.append((self.name, elapsed))
+        with _lock:
+            total = _stage_totals.setdefault((self.run.page, self.name), [0.0, 0])
+            total[0] += elapsed
+            total[1] += 1
+        return False
+
+
+def _query_flag():
+    try:
+        import streamlit as st
+
+        return st.query_params.get(DEBUG_QUERY_PARAM) == "1"
+    except Exception:
+        return False
+
+
+def start_run(page):
+    """페이지 실행을 시작할 때 부릅니다. 측정이 꺼져 있으면 아무것도 기록하지 않습니다."""
+    show_panel = _query_flag()
+    _local.run = RunRecord(page, show_panel) if (ENV_ENABLED or show_panel) else None
+
+
+def stage(name):
+    """with 문으로 감싼 구간의 시간을 잽니다."""
+    run = getattr(_local, "run", None)
+    if run is None:
+        return _NULL
+    return run.stage(name)
+
+
+def _count(name, index):
+    run = getattr(_local, "run", None)
+    if run is None:
+        return
+    run.cache.setdefault(name, [0, 0])[index] += 1
+    with _lock:
+        _cache_totals.setdefault(name, [0, 0])[index] += 1
+
+
+def cached(cache_decorator, name=None):
+    """st.cache_data/st.cache_resource를 감싸 호출 수와 미스 수(실제로 함수가 실행된 횟수)를 셉니다.
+
+    예) @instrument.cached(st.cache_data(max_entries=32))
+    """
+    def decorate(func):
+        label = name or func.__name__
+
+        @functools.wraps(func)
+        def on_miss(*args, **kwargs):
+            _count(label, 1)
+            return func(*args, **kwargs)
+
+        cached_func = cache_decorator(on_miss)
+
+        @functools.wraps(func)
+        def call(*args, **kwargs):
+            _count(label, 0)
+            return cached_func(*args, **kwargs)
+
+        call.clear = cached_func.clear
+        return call
+
+    return decorate
+
+
+def gauge(name, nbytes):
+    """화면으로 보내는 데이터의 크기를 기록합니다."""
+    run = getattr(_local, "run", None)
+    if run is None:
+        return
+    run.payloads[name] = run.payloads.get(name, 0) + nbytes
+    with _lock:
+        _payloads[(run.page, name)] = nbytes
+
+
+def html(content, name="html", **kwargs):
+    """st.components.v1.html과 같지만 보내는 HTML 크기를 기록합니다."""
+    import streamlit as st
+
+    if getattr(_local, "run", None) is not None:
+        gauge(name, len(content.encode("utf-8")))
+    return st.components.v1.html(content, **kwargs)
+
+
+def payload(name, data):
+    """컴포넌트로 보내는 data를 JSON으로 바꾼 크기를 기록합니다. (측정 중일 때만 직렬화합니다)"""
+    if getattr(_local, "run", None) is not None:
+        gauge(name, len(json.dumps(data, ensure_ascii=False).encode("utf-8")))
+
+
+# --- 출력 ---
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def prometheus_text():
+    """프로세스 누적 측정값을 Prometheus 텍스트 형식으로"""
+    with _lock:
+        stages = dict(_stage_totals)
+        caches = dict(_cache_totals)
+        payloads = dict(_payloads)
+    lines = ["# HELP app_stage_seconds 페이지 단계별 실행 시간", "# TYPE app_stage_seconds summary"]
+    for (page, name), (seconds, count) in sorted(stages.items()):
+        labels = f'page="{_escape(page)}",stage="{_escape(name)}"'
+        lines.append(f"app_stage_seconds_sum{{{labels}}} {seconds:.6f}")
+        lines.append(f"app_stage_seconds_count{{{labels}}} {count}")
+    lines += ["# HELP app_cache_calls_total 캐시 함수 호출 수", "# TYPE app_cache_calls_total counter"]
+    lines += [f'app_cache_calls_total{{function="{_escape(n)}"}} {c}' for n, (c, _) in sorted(caches.items())]
+    lines += ["# HELP app_cache_misses_total 캐시 미스(함수 실행) 수", "# TYPE app_cache_misses_total counter"]
+    lines += [f'app_cache_misses_total{{function="{_escape(n)}"}} {m}' for n, (_, m) in sorted(caches.items())]
+    lines += ["# HELP app_payload_bytes 마지막으로 보낸 HTML 크기", "# TYPE app_payload_bytes gauge"]
+    lines += [f'app_payload_bytes{{page="{_escape(p)}",name="{_escape(n)}"}} {b}' for (p, n), b in sorted(payloads.items())]
+    return "\n".join(lines) + "\n"
+
+
+def write_metrics_file(path=None):
+    path = Path(path or os.environ.get("APP_METRICS_FILE", DEFAULT_METRICS_FILE))
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+    tmp.write_text(prometheus_text(), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def _summary(run):
+    stages = {}
+    for name, seconds in run.stages:
+        stages[name] = round(stages.get(name, 0) + seconds * 1000, 1)
+    return {
+        "page": run.page,
+        "total_ms": round((time.perf_counter() - run.started) * 1000, 1),
+        "stages_ms": stages,
+        "cache": {name: {"calls": c, "misses": m} for name, (c, m) in run.cache.items()},
+        "payload_bytes": run.payloads,
+    }
+
+
+def finish_run():
+    """페이지 실행이 끝날 때 부릅니다. 로그 한 줄, Prometheus 파일, (?debug=1이면) 사이드바 패널을 남깁니다."""
+    run = getattr(_local, "run", None)
+    if run is None:
+        return
+    _local.run = None
+    summary = _summary(run)
+    if ENV_ENABLED:
+        logger.info("metrics %s", json.dumps(summary, ensure_ascii=False))
+        try:
+            write_metrics_file()
+        except OSError as e:
+            logger.warning("metrics 파일을 쓰지 못했습니다: %s", e)
+    if run.show_panel:
+        _show_panel(summary)
+
+
+def _show_panel(summary):
+    import pandas as pd
+    import streamlit as st
+
+    with st.sidebar.expander("⏱️ 성능 측정", expanded=True):
+        st.caption(f"이번 실행 {summary['total_ms']:,.1f} ms")
+        if summary["stages_ms"]:
+            st.dataframe(pd.DataFrame(
+                {"단계": list(summary["stages_ms"]), "ms": list(summary["stages_ms"].values())}
+            ), hide_index=True)
+        if summary["cache"]:
+            st.dataframe(pd.DataFrame([
+                {"캐시 함수": name, "호출": v["calls"], "미스": v["misses"], "적중": v["calls"] - v["misses"]}
+                for name, v in summary["cache"].items()
+            ]), hide_index=True)
+        for name, nbytes in summary["payload_bytes"].items():
+            st.caption(f"{name}: {nbytes / 1024:,.1f} KB")
+        st.download_button("Prometheus 형식으로 받기", prometheus_text(), file_name="metrics.prom")
@@ -0,0 +1,30 @@
+from pathlib import Path
+
+import numpy as np
+import streamlit.components.v1 as components
+
+# 실시간 주가 차트 컴포넌트
+# Streamlit 차트는 다시 그릴 때마다 데이터 전체를 보내야 해서, 대신 작은 정적 컴포넌트(live_chart_frontend/index.html)를 씁니다.
+# 같은 key로 다시 부르면 브라우저의 iframe이 그대로 남으므로, 서버는 새로 들어온 점만 보내고
+# 브라우저가 티커마다 최근 capacity개 점을 들고 있다가 이어 그립니다.
+# full=True로 보내면 브라우저가 가진 점을 버리고 이번에 보낸 점으로 새로 시작합니다. (주기적인 전체 다시 그리기)
+# 컴포넌트의 값은 브라우저가 마지막으로 전체 점을 받은 generation입니다. (iframe이 새로 만들어져 점을 잃으면 -1)
+
+_component = components.declare_component("live_chart", path=str(Path(__file__).resolve().parent / "live_chart_frontend"))
+
+
+def encode_points(points, base):
+    """{티커: (시각 ns, 가격)} -> 컴포넌트로 보낼 {티커: {"t": [ms], "v": [기준 대비 변화율 %]}}"""
+    series = {}
+    for ticker, (times, values) in points.items():
+        series[ticker] = {
+            "t": (times // 1_000_000).tolist(),
+            "v": np.round((values / base[ticker] - 1) * 100, 4).tolist(),
+        }
+    return series
+
+
+def live_chart(series, tickers, generation, full, capacity, height=400, key=None):
+    """series: encode_points()의 결과 (full이면 버퍼 전체, 아니면 이번에 새로 들어온 점만)"""
+    return _component(series=series, tickers=list(tickers), generation=generation, full=full,
+                      capacity=capacity, height=height, key=key, default=None)
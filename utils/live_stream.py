@@ -0,0 +1,293 @@
+import logging
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+# 실시간(장중) 주가 스트림
+# - RingBuffer: 티커마다 최근 capacity개 점만 들고 있는 고정 크기 numpy 버퍼. 메모리는 티커 수 x capacity로 고정됩니다.
+#   점마다 순번(seq)이 붙어 있어서, 읽는 쪽은 "마지막으로 본 순번 이후"의 새 점만 가져갈 수 있습니다.
+# - LiveSource: 새 점을 가져오는 공급자 인터페이스
+#   - YFinanceLiveSource: yfinance 1분봉을 주기적으로 받아옵니다.
+#   - ReplaySource: 녹화된 테이프(시각, 티커, 가격)를 원하는 배속으로 다시 흘려보냅니다. (네트워크 없이 부하 테스트)
+# - LiveFeed: 공급자 하나를 백그라운드 스레드로 폴링해 LiveBook(티커별 RingBuffer)에 쌓습니다.
+#   여러 세션이 같은 피드를 함께 읽고, 아무도 읽지 않으면 폴링을 멈춥니다.
+
+DEFAULT_CAPACITY = 2_000    # 티커마다 들고 있을 최근 점 수
+IDLE_TIMEOUT = 60           # 이 시간(초) 동안 읽는 세션이 없으면 폴링을 멈춥니다.
+YFINANCE_POLL_INTERVAL = float(os.environ.get("STOCK_LIVE_POLL", 30))  # 1분봉이므로 너무 자주 받을 필요가 없습니다.
+REPLAY_POLL_INTERVAL = 0.1
+TAPE_COLUMNS = ["time", "ticker", "price"]
+LIVE_SOURCES = {
+    "replay": "녹화 테이프 재생 (오프라인)",
+    "yfinance": "yfinance 1분봉",
+}
+
+logger = logging.getLogger(__name__)
+
+
+def _to_ns(index):
+    """DatetimeIndex -> UTC 기준 int64 나노초 배열"""
+    index = pd.DatetimeIndex(index)
+    if index.tz is not None:
+        index = index.tz_convert("UTC").tz_localize(None)
+    return index.to_numpy(dtype="datetime64[ns]").view("int64")
+
+
+class RingBuffer:
+    """(시각 ns, 값) 점을 최근 capacity개만 들고 있는 버퍼. 시각은 늘어나는 순서로만 들어옵니다."""
+
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        self.capacity = int(capacity)
+        self.times = np.zeros(self.capacity, dtype="int64")
+        self.values = np.zeros(self.capacity, dtype="float64")
+        self.total = 0  # 지금까지 들어온 점 수 (= 다음 점의 순번)
+
+    def __len__(self):
+        return min(self.total, self.capacity)
+
+    @property
+    def last_time(self):
+        return int(self.times[(self.total - 1) % self.capacity]) if self.total else None
+
+    def extend(self, times, values):
+        """마지막 점보다 뒤의 점만 붙입니다. 붙인 점 수를 돌려줍니다."""
+        times = np.asarray(times, dtype="int64")
+        values = np.asarray(values, dtype="float64")
+        keep = ~np.isnan(values)
+        if self.total:
+            keep &= times > self.last_time
+        times, values = times[keep], values[keep]
+        n = len(times)
+        if n == 0:
+            return 0
+        # 한 번에 capacity보다 많이 들어오면 마지막 capacity개만 쓰면 됩니다.
+        skip = max(0, n - self.capacity)
+        slots = (self.total + skip + np.arange(n - skip)) % self.capacity
+        self.times[slots] = times[skip:]
+        self.values[slots] = values[skip:]
+        self.total += n
+        return n
+
+    def since(self, seq=0):
+        """순번 seq부터의 점 (시각 배열, 값 배열, 다음 순번). 이미 버퍼에서 밀려난 점은 빠집니다."""
+        start = max(seq, self.total - len(self))
+        slots = (start + np.arange(self.total - start)) % self.capacity
+        return self.times[slots], self.values[slots], self.total
+
+
+class LiveBook:
+    """티커별 RingBuffer 모음. 여러 스레드가 함께 씁니다."""
+
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        self.capacity = capacity
+        self._buffers = {}
+        self._lock = threading.Lock()
+
+    def extend(self, bars):
+        """bars: {티커: (시각 ns 배열, 값 배열)}. 새로 붙은 점 수를 돌려줍니다."""
+        added = 0
+        with self._lock:
+            for ticker, (times, values) in bars.items():
+                buffer = self._buffers.get(ticker)
+                if buffer is None:
+                    buffer = self._buffers[ticker] = RingBuffer(self.capacity)
+                added += buffer.extend(times, values)
+        return added
+
+    def delta(self, tickers, cursors=None):
+        """cursors({티커: 순번}) 이후에 들어온 점만 ({티커: (시각, 값)}, 새 cursors). cursors가 없으면 버퍼 전체"""
+        cursors = dict(cursors or {})
+        points = {}
+        with self._lock:
+            for ticker in tickers:
+                buffer = self._buffers.get(ticker)
+                if buffer is None:
+                    continue
+                times, values, cursors[ticker] = buffer.since(cursors.get(ticker, 0))
+                if len(times):
+                    points[ticker] = (times, values)
+        return points, cursors
+
+    def to_tape(self):
+        """지금 들고 있는 점 전체를 테이프(시각, 티커, 가격) 형식의 DataFrame으로 (ReplaySource로 다시 재생 가능)"""
+        points, _ = self.delta(list(self._buffers))
+        frames = [
+            pd.DataFrame({"time": pd.to_datetime(times), "ticker": ticker, "price": values})
+            for ticker, (times, values) in points.items()
+        ]
+        if not frames:
+            return pd.DataFrame(columns=TAPE_COLUMNS)
+        return pd.concat(frames, ignore_index=True).sort_values("time", kind="stable", ignore_index=True)
+
+
+# --- 공급자 ---
+
+class LiveSource:
+    """poll(tickers)가 {티커: (시각 ns 배열, 값 배열)}를 돌려주는 공급자. 이미 준 점을 다시 줘도 됩니다. (버퍼가 걸러냄)"""
+
+    name = "base"
+    interval = 1.0  # 권장 폴링 간격 (초)
+
+    def poll(self, tickers):
+        raise NotImplementedError
+
+
+class YFinanceLiveSource(LiveSource):
+    name = "yfinance"
+
+    def __init__(self, interval=YFINANCE_POLL_INTERVAL):
+        self.interval = interval
+
+    def poll(self, tickers):
+        import yfinance as yf
+
+        data = yf.download(list(tickers), period="1d", interval="1m", auto_adjust=False,
+                           progress=False, threads=True)
+        if data is None or data.empty:
+            return {}
+        close = data["Close"]
+        if isinstance(close, pd.Series):
+            close = close.to_frame(tickers[0])
+        times = _to_ns(close.index)
+        return {ticker: (times, close[ticker].to_numpy(dtype="float64")) for ticker in close.columns}
+
+
+class ReplaySource(LiveSource):
+    """녹화된 테이프를 speed 배속으로 다시 흘려보냅니다. loop=True면 끝나면 처음부터 (시각을 이어 붙여) 반복합니다."""
+
+    name = "replay"
+    interval = REPLAY_POLL_INTERVAL
+
+    def __init__(self, tape, speed=1.0, loop=True, clock=time.monotonic):
+        tape = tape[TAPE_COLUMNS].dropna().sort_values("time", kind="stable")
+        times = _to_ns(tape["time"])
+        self.tape_start = int(times[0]) if len(times) else 0
+        self.span = int(times[-1]) - self.tape_start if len(times) else 0
+        step = np.diff(np.unique(times))
+        self.period = self.span + (int(step.min()) if len(step) else 60 * 10**9)  # 한 바퀴 길이 (ns)
+        self._tracks = {}
+        tickers = tape["ticker"].astype(str).to_numpy()
+        prices = tape["price"].to_numpy(dtype="float64")
+        for ticker in dict.fromkeys(tickers):
+            mask = tickers == ticker
+            self._tracks[ticker] = (times[mask] - self.tape_start, prices[mask])
+        self.speed = float(speed)
+        self.loop = loop
+        self.clock = clock
+        self._started = None
+        self._position = -1  # 마지막으로 내보낸 테이프 위치 (시작부터 ns)
+
+    @classmethod
+    def from_file(cls, path, **kwargs):
+        path = str(path)
+        tape = pd.read_parquet(path) if path.endswith(".parquet") else pd.read_csv(path, parse_dates=["time"])
+        return cls(tape, **kwargs)
+
+    @property
+    def tickers(self):
+        return list(self._tracks)
+
+    def poll(self, tickers):
+        now = self.clock()
+        if self._started is None:
+            self._started = now
+        position = int((now - self._started) * self.speed * 1e9)
+        previous, self._position = self._position, position
+        if position <= previous or not self._tracks:
+            return {}
+        if self.loop:
+            # 폴링 사이에 한 바퀴 넘게 지났다면 마지막 한 바퀴만 내보내면 됩니다.
+            previous = max(previous, position - self.period)
+            laps = range(max(previous, 0) // self.period, position // self.period + 1)
+        else:
+            laps = [0]
+
+        bars = {}
+        for ticker in tickers:
+            track = self._tracks.get(ticker)
+            if track is None:
+                continue
+            offsets, prices = track
+            times, values = [], []
+            for lap in laps:
+                shift = lap * self.period
+                lo = np.searchsorted(offsets, previous - shift, side="right")
+                hi = np.searchsorted(offsets, position - shift, side="right")
+                if hi > lo:
+                    times.append(offsets[lo:hi] + shift + self.tape_start)
+                    values.append(prices[lo:hi])
+            if times:
+                bars[ticker] = (np.concatenate(times), np.concatenate(values))
+        return bars
+
+
+def synthetic_tape(tickers, minutes=390, step_seconds=60, start_prices=None, seed=0, start=None):
+    """오프라인 재생용 가짜 장중 테이프 (분 단위 랜덤 워크). 티커마다 minutes*60/step_seconds개 점"""
+    rng = np.random.default_rng(seed)
+    start = pd.Timestamp(start or pd.Timestamp.now().normalize() + pd.Timedelta(hours=9, minutes=30))
+    times = pd.date_range(start, periods=int(minutes * 60 / step_seconds), freq=f"{step_seconds}s")
+    start_prices = start_prices or {}
+    frames = []
+    for ticker in tickers:
+        base = float(start_prices.get(ticker, 100.0))
+        # 1분 변동성 약 0.1%
+        path = base * np.exp(np.cumsum(rng.normal(0, 0.001 * np.sqrt(step_seconds / 60), len(times))))
+        frames.append(pd.DataFrame({"time": times, "ticker": ticker, "price": path.round(4)}))
+    return pd.concat(frames, ignore_index=True).sort_values("time", kind="stable", ignore_index=True)
+
+
+class LiveFeed:
+    """공급자 하나를 백그라운드 스레드로 폴링해 LiveBook에 쌓습니다. 마지막 읽기 뒤 idle_timeout초가 지나면 멈춥니다."""
+
+    def __init__(self, source, tickers, capacity=DEFAULT_CAPACITY, idle_timeout=IDLE_TIMEOUT):
+        self.source = source
+        self.tickers = list(dict.fromkeys(tickers))
+        self.book = LiveBook(capacity)
+        self.idle_timeout = idle_timeout
+        self.error = None
+        self.updated_at = None  # 마지막으로 새 점이 들어온 시각 (time.time())
+        self._last_read = time.monotonic()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def _run(self):
+        while time.monotonic() - self._last_read < self.idle_timeout:
+            started = time.monotonic()
+            try:
+                if self.book.extend(self.source.poll(self.tickers)):
+                    self.updated_at = time.time()
+                self.error = None
+            except Exception as e:
+                self.error = str(e)
+                logger.warning("실시간 데이터를 받지 못했습니다 (%s): %s", self.source.name, e)
+            time.sleep(max(0.0, self.source.interval - (time.monotonic() - started)))
+
+    def ensure_running(self):
+        with self._lock:
+            self._last_read = time.monotonic()
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name=f"live-{self.source.name}", daemon=True)
+                self._thread.start()
+
+    def delta(self, tickers, cursors=None):
+        """LiveBook.delta와 같고, 폴링이 멈춰 있었다면 다시 시작합니다."""
+        self.ensure_running()
+        return self.book.delta(tickers, cursors)
+
+
+def make_source(kind, tickers, speed=1.0, start_prices=None):
+    """LIVE_SOURCES의 이름으로 공급자를 만듭니다.
+
+    replay: STOCK_LIVE_TAPE 환경 변수의 테이프 파일(CSV 또는 Parquet)을 재생하고, 없으면 가짜 테이프를 만들어 재생합니다.
+    """
+    if kind == "yfinance":
+        return YFinanceLiveSource()
+    if kind == "replay":
+        path = os.environ.get("STOCK_LIVE_TAPE")
+        if path:
+            return ReplaySource.from_file(path, speed=speed)
+        return ReplaySource(synthetic_tape(tickers, start_prices=start_prices), speed=speed)
+    raise ValueError(f"알 수 없는 실시간 데이터 공급자: {kind}")
@@ -0,0 +1,32 @@
+import html
+import re
+
+# 이미지 표시 도우미
+# - thumbnail_url(): 원본 대신 작은 크기의 이미지 주소를 돌려줍니다. (크기를 바꿀 수 있는 주소 형식만)
+# - lazy_img(): 화면에 보일 때 불러오는 <img loading="lazy"> 태그. Streamlit 서버를 거치지 않고 브라우저가 바로 받습니다.
+
+# YouTube 썸네일: .../vi/<영상 ID>/<크기>.jpg
+_YOUTUBE_THUMB = re.compile(r"^https?://(?:img\.youtube\.com|i\.ytimg\.com)/vi/([\w-]{11})/[\w]+\.jpg")
+# 크기 지정이 주소에 들어 있는 이미지 CDN (예: ...c_limit,f_auto,h_1024,w_1024/...)
+_SIZED_PATH = re.compile(r"(?<=[/,])([wh])_(\d+)(?=[,/])")
+
+
+def youtube_thumbnail(video_id, size="mqdefault"):
+    """YouTube 썸네일 주소. mqdefault는 320x180으로 목록용으로 충분합니다."""
+    return f"https://i.ytimg.com/vi/{video_id}/{size}.jpg"
+
+
+def thumbnail_url(url, width=320):
+    """url이 가리키는 이미지의 작은 버전 주소. 크기를 바꿀 수 없는 주소는 그대로 돌려줍니다."""
+    match = _YOUTUBE_THUMB.match(url)
+    if match:
+        return youtube_thumbnail(match.group(1), "mqdefault" if width <= 320 else "hqdefault")
+    if _SIZED_PATH.search(url):
+        return _SIZED_PATH.sub(lambda m: f"{m.group(1)}_{min(int(m.group(2)), width)}", url)
+    return url
+
+
+def lazy_img(src, alt="", width=250, style=""):
+    """화면에 가까워졌을 때만 불러오는 이미지 태그 (st.markdown(..., unsafe_allow_html=True)로 표시)"""
+    return (f'<img src="{html.escape(src, quote=True)}" alt="{html.escape(alt, quote=True)}" '
+            f'width="{width}" loading="lazy" decoding="async" style="max-width:100%;height:auto;{style}">')
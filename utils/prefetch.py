@@ -0,0 +1,250 @@
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from utils.price_store import PriceStore
+from utils.stock_data import assemble_frame, default_tickers
+from utils.ticker_cache import TickerCache
+
+# 주가 미리 받기 (stale-while-revalidate)
+# - 서버 프로세스마다 StockPrefetcher 하나가 기본 티커 전체의 최근 3년 주가를 메모리에 들고 있습니다.
+# - PrefetchScheduler(데몬 스레드)가 정해진 주기나 시각(예: 장 마감 뒤)에 미리 새로 받아 둡니다.
+# - 페이지는 들고 있는 데이터를 기다리지 않고 바로 씁니다. 오래됐으면 백그라운드에서 새로 받기만 시작하고,
+#   화면에는 데이터 기준 시각을 보여줍니다. 처음 한 번(아직 데이터가 없을 때)만 다운로드를 기다립니다.
+# - 기본 목록에 없는 티커(사이드바에서 직접 추가)는 미리 받지 않고, 요청할 때 TickerCache로 받아 티커 단위로 캐시합니다.
+# - SingleFlight로 같은 작업은 한 번에 하나만 돌리므로, 방문자가 동시에 몰려도 다운로드는 한 번입니다.
+#
+# 환경 변수
+# - STOCK_PREFETCH: 지정하지 않으면 주가 페이지가 stock_prefetcher()를 처음 부를 때 스케줄러가 시작됩니다.
+#   1이면 첫 페이지(main.py)에서 바로 시작하고, 0이면 스케줄러를 끕니다. (방문할 때 오래된 데이터를 새로 받는 동작은 그대로)
+# - STOCK_PREFETCH_INTERVAL: 새로 받는 주기 (초, 기본 1시간). 데이터가 이보다 오래되면 오래된 것으로 봅니다.
+# - STOCK_PREFETCH_AT: 매일 새로 받을 서버 시각 목록 (예: "06:30,22:30"). 지정하면 주기 대신 씁니다.
+
+HISTORY_DAYS = 3 * 365
+DEFAULT_INTERVAL = 60 * 60  # 초
+FAILED_RETRY = 5 * 60       # 받지 못한 티커가 있으면 이 시간이 지나면 다시 받습니다. (초)
+REFRESH_KEY = "refresh"
+
+logger = logging.getLogger(__name__)
+
+
+def history_range(now=None):
+    """최근 3년 구간 (시작, 끝). 캐시 키가 실행할 때마다 바뀌지 않도록 날짜 단위로 맞추고, 끝은 내일 0시입니다."""
+    today = pd.Timestamp(now or datetime.now()).normalize()
+    return today - pd.Timedelta(days=HISTORY_DAYS), today + pd.Timedelta(days=1)
+
+
+class SingleFlight:
+    """같은 키의 작업이 이미 돌고 있으면 새로 시작하지 않고 그 결과를 함께 기다립니다."""
+
+    class _Call:
+        def __init__(self):
+            self.done = threading.Event()
+            self.value = None
+            self.error = None
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def in_flight(self, key):
+        with self._lock:
+            return key in self._calls
+
+    def do(self, key, func):
+        """func()의 결과. 다른 스레드가 같은 key로 실행 중이면 그 실행이 끝나기를 기다려 같은 결과를 받습니다."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = self._Call()
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.value
+        try:
+            call.value = func()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.value
+
+    def do_background(self, key, func):
+        """func()를 백그라운드 스레드에서 시작합니다. 이미 실행 중이면 아무것도 하지 않고 False"""
+        if self.in_flight(key):
+            return False
+
+        def run():
+            try:
+                self.do(key, func)
+            except Exception:
+                logger.exception("백그라운드 작업 실패: %s", key)
+
+        threading.Thread(target=run, name=f"singleflight-{key}", daemon=True).start()
+        return True
+
+
+class PriceSnapshot:
+    """한 번 새로 받은 결과 (티커별 Series, 실패 사유, 구간, 받은 시각)"""
+
+    def __init__(self, series, failed, start, end, fetched_at):
+        self.series = series
+        self.failed = failed
+        self.start = start
+        self.end = end
+        self.fetched_at = fetched_at
+
+    def series_for(self, tickers, start, end):
+        """[start, end) 구간의 {티커: Series}, {티커: 실패 사유}, 미리 받은 목록에 없는 티커 목록"""
+        start, end = pd.Timestamp(start), pd.Timestamp(end)
+        series = {
+            t: s[(s.index >= start) & (s.index < end)]
+            for t, s in self.series.items() if t in tickers
+        }
+        failed = {t: self.failed[t] for t in tickers if t in self.failed}
+        missing = [t for t in tickers if t not in self.series and t not in self.failed]
+        return series, failed, missing
+
+
+class StockPrefetcher:
+    def __init__(self, store, tickers, max_age=DEFAULT_INTERVAL, on_demand=None):
+        self.store = store
+        self.tickers = list(dict.fromkeys(tickers))
+        self.max_age = max_age
+        self.on_demand = on_demand  # 미리 받지 않은 티커를 받을 TickerCache (없으면 실패로 표시)
+        self._flight = SingleFlight()
+        self._snapshot = None
+
+    def _refresh(self):
+        start, end = history_range()
+        series, failed = self.store.get_prices(self.tickers, start, end)
+        snapshot = PriceSnapshot(series, failed, start, end, time.time())
+        self._snapshot = snapshot
+        return snapshot
+
+    def refresh(self):
+        """기본 티커 전체를 새로 받습니다. 이미 받는 중이면 그 결과를 함께 기다립니다."""
+        return self._flight.do(REFRESH_KEY, self._refresh)
+
+    @property
+    def ready(self):
+        """한 번이라도 받은 데이터가 있는지 (없으면 snapshot()이 다운로드를 기다립니다)"""
+        return self._snapshot is not None
+
+    @property
+    def refreshing(self):
+        return self._flight.in_flight(REFRESH_KEY)
+
+    def is_stale(self, snapshot, end=None):
+        max_age = min(self.max_age, FAILED_RETRY) if snapshot.failed else self.max_age
+        too_old = time.time() - snapshot.fetched_at > max_age
+        return too_old or (end is not None and pd.Timestamp(end) > snapshot.end)
+
+    def snapshot(self, end=None):
+        """(PriceSnapshot, 오래됐는지). 오래됐으면 백그라운드에서 새로 받기 시작하고 가지고 있던 데이터를 바로 돌려줍니다.
+
+        end: 화면에 필요한 구간의 끝. 날짜가 바뀌어 가진 데이터가 그날을 덮지 못하면 오래된 것으로 봅니다.
+        """
+        snapshot = self._snapshot
+        if snapshot is None:
+            snapshot = self.refresh()
+        stale = self.is_stale(snapshot, end)
+        if stale:
+            self._flight.do_background(REFRESH_KEY, self._refresh)
+        return snapshot, stale
+
+    def frame(self, snapshot, tickers, start, end):
+        """선택 순서대로 컬럼을 맞춘 [start, end) 구간의 넓은 DataFrame과 {티커: 실패 사유}
+
+        미리 받은 티커는 snapshot에서 꺼내고, 나머지는 on_demand(TickerCache)로 받습니다. (이 티커들만 다운로드를 기다립니다)
+        """
+        tickers = list(dict.fromkeys(tickers))
+        series, failed, missing = snapshot.series_for(tickers, start, end)
+        if missing and self.on_demand is not None:
+            fetched, fetch_failed = self.on_demand.get_series(missing, start, end)
+            series.update(fetched)
+            failed.update(fetch_failed)
+        elif missing:
+            failed.update({t: "미리 받은 티커 목록에 없습니다." for t in missing})
+        return assemble_frame(series, tickers), {t: failed[t] for t in tickers if t in failed}
+
+
+class PrefetchScheduler:
+    """job을 시작하자마자 한 번, 그 뒤로는 interval초마다 또는 매일 times(시, 분) 시각마다 실행하는 데몬 스레드"""
+
+    def __init__(self, job, interval=DEFAULT_INTERVAL, times=None):
+        self.job = job
+        self.interval = interval
+        self.times = list(times or [])
+        self._stop = threading.Event()
+        self._thread = None
+
+    def next_delay(self, now=None):
+        if not self.times:
+            return self.interval
+        now = now or datetime.now()
+        upcoming = []
+        for hour, minute in self.times:
+            at = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+            if at <= now:
+                at += timedelta(days=1)
+            upcoming.append(at)
+        return (min(upcoming) - now).total_seconds()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.job()
+            except Exception:
+                logger.exception("주가 미리 받기 실패")
+            self._stop.wait(self.next_delay())
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="stock-prefetch", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+
+def parse_times(spec):
+    """"06:30,22:30" -> [(6, 30), (22, 30)]"""
+    times = []
+    for part in (spec or "").split(","):
+        if part.strip():
+            hour, minute = part.strip().split(":")
+            times.append((int(hour), int(minute)))
+    return times
+
+
+_lock = threading.Lock()
+_prefetcher = None
+
+
+def stock_prefetcher():
+    """프로세스에 하나뿐인 StockPrefetcher. 처음 부를 때 스케줄러도 시작합니다. (STOCK_PREFETCH=0이면 스케줄러 없이)"""
+    global _prefetcher
+    with _lock:
+        if _prefetcher is None:
+            interval = float(os.environ.get("STOCK_PREFETCH_INTERVAL", DEFAULT_INTERVAL))
+            times = parse_times(os.environ.get("STOCK_PREFETCH_AT"))
+            # 정해진 시각에만 받는다면 하루가 지나야 오래된 것으로 봅니다.
+            max_age = 24 * 60 * 60 if times else interval
+            # 미리 받기는 저장소의 확인 간격을 기다리지 않고 매번 최신 거래일이 있는지 확인합니다.
+            # 기본 목록에 없는 티커는 저장소의 기본 확인 간격을 따르고, 티커 단위 메모리 캐시를 거칩니다.
+            _prefetcher = StockPrefetcher(PriceStore(refresh_interval=0), default_tickers(), max_age=max_age,
+                                          on_demand=TickerCache(PriceStore()))
+            if os.environ.get("STOCK_PREFETCH", "1") != "0":
+                PrefetchScheduler(_prefetcher.refresh, interval, times).start()
+    return _prefetcher
@@ -0,0 +1,28 @@
+import math
+
+import streamlit as st
+
+# 큰 표나 긴 목록을 한 번에 브라우저로 보내지 않고 한 쪽씩 나눠 보여줍니다.
+
+PAGE_SIZE = 100
+
+
+def page_range(total, key, page_size=PAGE_SIZE, label="페이지"):
+    """쪽 선택 위젯을 그리고, 지금 쪽에 보여줄 (시작, 끝) 위치를 돌려줍니다."""
+    pages = max(1, math.ceil(total / page_size))
+    page = 1
+    if pages > 1:
+        # 목록이 줄어 저장된 쪽 번호가 범위를 벗어나면 첫 쪽으로 돌아갑니다.
+        if st.session_state.get(key, 1) > pages:
+            st.session_state[key] = 1
+        page = st.number_input(f"{label} (총 {pages:,}쪽)", min_value=1, max_value=pages, value=1, step=1, key=key)
+    start = (page - 1) * page_size
+    return start, min(start + page_size, total)
+
+
+def show_paginated(df, key, page_size=PAGE_SIZE):
+    total = len(df)
+    start, end = page_range(total, key, page_size)
+    st.dataframe(df.iloc[start:end])
+    if total:
+        st.caption(f"전체 {total:,}행 중 {start + 1:,}–{end:,}행")
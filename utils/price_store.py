@@ -0,0 +1,111 @@
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from utils.stock_data import EMPTY_DATA, fetch_ranges
+
+# 로컬 주가 저장소
+# 티커마다 Parquet 파일 하나(<티커>.parquet)와 메타 정보(<티커>.json)를 둡니다.
+# 이미 받은 구간은 디스크에서 읽고, 마지막 저장일 이후의 부족한 날짜만 새로 받아 합칩니다.
+
+DEFAULT_STORE_DIR = Path(__file__).resolve().parent.parent / ".cache" / "prices"
+DEFAULT_REFRESH_INTERVAL = 60 * 60  # 같은 티커의 최신 데이터 확인 간격 (초)
+
+
+def _tmp_path(path):
+    # 세션과 미리 받기 스레드가 한 프로세스에서 같은 티커를 동시에 저장할 수 있으므로 스레드 id까지 붙입니다.
+    return path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+
+
+class PriceStore:
+    def __init__(self, root=None, refresh_interval=DEFAULT_REFRESH_INTERVAL):
+        self.root = Path(root or os.environ.get("STOCK_STORE_DIR", DEFAULT_STORE_DIR))
+        self.refresh_interval = refresh_interval
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def _paths(self, ticker):
+        # 파일 이름에 쓸 수 없는 문자만 바꿉니다. (예: BRK/A)
+        safe = ticker.replace("/", "_").replace("\\", "_")
+        return self.root / f"{safe}.parquet", self.root / f"{safe}.json"
+
+    def load(self, ticker):
+        data_path, meta_path = self._paths(ticker)
+        if not data_path.exists() or not meta_path.exists():
+            return None, None
+        try:
+            series = pd.read_parquet(data_path)["close"]
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+        except Exception:
+            # 손상된 파티션은 없는 것으로 보고 다시 받습니다.
+            return None, None
+        return series, meta
+
+    def save(self, ticker, series, meta):
+        data_path, meta_path = self._paths(ticker)
+        # 임시 파일에 쓴 뒤 교체해서, 다른 프로세스가 반쯤 쓰인 파일을 읽지 않게 합니다.
+        tmp = _tmp_path(data_path)
+        series.rename("close").to_frame().to_parquet(tmp)
+        os.replace(tmp, data_path)
+        tmp = _tmp_path(meta_path)
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp, meta_path)
+
+    def _missing_range(self, series, meta, start, end):
+        # 저장된 구간으로 충분하면 None, 아니면 새로 받아야 할 (시작, 끝)을 돌려줍니다.
+        if series is None:
+            return start, end
+        if start < pd.Timestamp(meta["start"]):
+            # 요청 구간이 저장된 구간보다 앞서면 전체를 다시 받습니다. (드문 경우)
+            return start, end
+        last_bar = series.index.max() if not series.empty else start - pd.Timedelta(days=1)
+        last_business_day = pd.Timestamp(end - pd.Timedelta(days=1)).normalize()
+        if last_business_day.weekday() >= 5:
+            last_business_day -= pd.offsets.BDay(1)
+        if last_bar >= last_business_day:
+            return None
+        if time.time() - meta.get("checked_at", 0) < self.refresh_interval:
+            return None
+        return last_bar + pd.Timedelta(days=1), end
+
+    def get_prices(self, tickers, start, end, provider=None, **fetch_kwargs):
+        """저장소를 먼저 읽고 부족한 뒷부분만 받아 합친 뒤 {티커: Series}, {티커: 실패 사유}를 돌려줍니다."""
+        start, end = pd.Timestamp(start).normalize(), pd.Timestamp(end)
+        stored, jobs = {}, {}
+        for ticker in dict.fromkeys(tickers):
+            series, meta = self.load(ticker)
+            stored[ticker] = (series, meta)
+            missing = self._missing_range(series, meta, start, end)
+            if missing is not None:
+                jobs[ticker] = missing
+
+        fetched, failed = fetch_ranges(jobs, provider, **fetch_kwargs)
+
+        result = {}
+        now = time.time()
+        for ticker, (series, meta) in stored.items():
+            if ticker in fetched:
+                delta = fetched[ticker]
+                if series is not None and jobs[ticker][0] > start:
+                    merged = pd.concat([series, delta])
+                    merged = merged[~merged.index.duplicated(keep="last")].sort_index()
+                    new_meta = {"start": meta["start"], "checked_at": now}
+                else:
+                    merged = delta
+                    new_meta = {"start": start.isoformat(), "checked_at": now}
+                self.save(ticker, merged, new_meta)
+                series = merged
+            elif ticker in jobs and series is not None and failed.get(ticker) == EMPTY_DATA:
+                # 새 거래일이 아직 없는 경우입니다. 확인 시각만 갱신합니다.
+                self.save(ticker, series, {"start": meta["start"], "checked_at": now})
+
+            if series is not None and not series.empty:
+                # 받아오기에 실패해도 저장된 데이터가 있으면 그대로 보여줍니다.
+                failed.pop(ticker, None)
+                result[ticker] = series[(series.index >= start) & (series.index < end)]
+        return result, failed
@@ -0,0 +1,177 @@
+import bisect
+import threading
+import time
+
+from utils.graph_core import CompactGraph, edge_style
+
+# 학생 관계 그래프 (증분 갱신)
+# 매번 모든 응답을 처음부터 다시 읽어 그래프를 만들지 않고, 새로 들어오거나 바뀐 응답만 반영합니다.
+# 두 학생 사이의 관계는 양쪽이 서로를 고른 관계 중 가장 강한 것으로 정합니다. (가장_친밀 > 친밀 > 약간_친밀)
+# 응답이 들어온 순서와 관계없이 항상 같은 결과가 나옵니다.
+
+# 관계 강도 -> 표시 방식 (width는 pyvis에서 사용). 관계 강도는 graph_core의 관계 종류 코드와 같습니다.
+EDGE_STYLES = {strength: edge_style(strength) for strength in (1, 2, 3)}
+# 질문 -> 관계 강도 (질문 3: 대화 상대, 질문 1: 수련회 방, 질문 2: 짝)
+QUESTION_STRENGTH = {'talk_friends': 1, 'room_friends': 2, 'pair_friend': 3}
+# 변경 기록은 아직 읽어 갈 세션이 있는 만큼만 남깁니다.
+READER_TTL = 30 * 60   # 이 시간(초) 동안 읽지 않은 세션은 더 기다리지 않습니다. (다시 오면 전체를 받습니다)
+LOG_LIMIT = 200_000    # 변경 기록 최대 길이. 이보다 뒤처진 세션은 전체를 다시 받습니다.
+
+
+def choice_strengths(response):
+    """한 학생의 응답을 {친구: 관계 강도}로 바꿉니다. 여러 질문에서 고른 친구는 가장 강한 관계를 씁니다."""
+    student = response['student_id']
+    strengths = {}
+    for question, strength in QUESTION_STRENGTH.items():
+        friends = response.get(question)
+        if friends is None:
+            continue
+        if not isinstance(friends, (list, tuple, set)):
+            friends = [friends]
+        for friend in friends:
+            if friend != student:
+                strengths[friend] = max(strengths.get(friend, 0), strength)
+    return strengths
+
+
+class GraphDelta:
+    """한 번의 갱신으로 바뀐 노드와 엣지. edges 값이 0이면 엣지가 사라졌다는 뜻입니다."""
+
+    def __init__(self):
+        self.nodes = set()
+        self.edges = {}
+
+    def merge(self, other):
+        self.nodes |= other.nodes
+        self.edges.update(other.edges)
+        return self
+
+    def __bool__(self):
+        return bool(self.nodes or self.edges)
+
+
+class RelationGraph:
+    def __init__(self, students=()):
+        self.nodes = set(students)
+        self.version = 0       # 마지막으로 반영한 응답 저장소 버전
+        self._choices = {}     # 학생 -> {친구: 관계 강도} (그 학생이 직접 고른 관계)
+        self._edges = {}       # (작은 번호, 큰 번호) -> 관계 강도
+        self._log_versions = []  # 변경 기록: 버전 (오름차순)
+        self._log = []           # 변경 기록: ('node', 번호) 또는 ('edge', (a, b))
+        self._log_floor = 0      # 이 버전까지의 기록은 지웠습니다.
+        self._readers = {}       # 세션 -> (마지막으로 받은 버전, 받은 시각)
+        self._export = None      # (버전, export() 결과)
+        self._lock = threading.RLock()
+
+    def _strength(self, a, b):
+        return max(self._choices.get(a, {}).get(b, 0), self._choices.get(b, {}).get(a, 0))
+
+    def apply(self, response):
+        """응답 하나를 반영하고 바뀐 부분(GraphDelta)을 돌려줍니다. 비용은 그 학생이 고른 친구 수에 비례합니다."""
+        with self._lock:
+            delta = GraphDelta()
+            student = response['student_id']
+            old = self._choices.get(student, {})
+            new = choice_strengths(response)
+            self._choices[student] = new
+
+            for node in (student, *new):
+                if node not in self.nodes:
+                    self.nodes.add(node)
+                    delta.nodes.add(node)
+
+            for friend in old.keys() | new.keys():
+                key = (min(student, friend), max(student, friend))
+                strength = self._strength(student, friend)
+                if strength != self._edges.get(key, 0):
+                    if strength:
+                        self._edges[key] = strength
+                    else:
+                        del self._edges[key]
+                    delta.edges[key] = strength
+
+            self.version = max(self.version, response.get('version', self.version + 1))
+            for node in delta.nodes:
+                self._log_versions.append(self.version)
+                self._log.append(('node', node))
+            for key in delta.edges:
+                self._log_versions.append(self.version)
+                self._log.append(('edge', key))
+            return delta
+
+    def sync(self, store, class_id):
+        """저장소에서 마지막으로 반영한 버전 이후의 응답만 읽어 반영합니다."""
+        with self._lock:
+            delta = GraphDelta()
+            for response in store.responses(class_id, since_version=self.version):
+                delta.merge(self.apply(response))
+            return delta
+
+    def changes_since(self, version):
+        """version 이후에 바뀐 노드와 엣지의 현재 상태. 세션마다 마지막으로 본 버전을 넘겨 자기 몫의 변경만 받습니다.
+
+        그 사이의 기록이 이미 지워졌으면 None입니다. (전체를 다시 받아야 합니다)
+        """
+        with self._lock:
+            if version < self._log_floor:
+                return None
+            delta = GraphDelta()
+            start = bisect.bisect_right(self._log_versions, version)
+            for kind, key in self._log[start:]:
+                if kind == 'node':
+                    delta.nodes.add(key)
+                else:
+                    delta.edges[key] = self._edges.get(key, 0)
+            return delta
+
+    def mark_seen(self, reader, version):
+        """reader(세션)가 version까지 받았다고 기록하고, 더는 아무도 읽지 않을 변경 기록을 지웁니다."""
+        with self._lock:
+            now = time.monotonic()
+            self._readers[reader] = (version, now)
+            for key, (_, seen_at) in list(self._readers.items()):
+                if now - seen_at > READER_TTL:
+                    del self._readers[key]
+            # 모든 세션이 이미 받은 버전까지의 기록은 필요 없습니다.
+            floor = min(v for v, _ in self._readers.values())
+            cut = bisect.bisect_right(self._log_versions, floor)
+            # 그래도 너무 길면 가장 오래된 기록부터 지웁니다. (그보다 뒤처진 세션은 전체를 다시 받습니다)
+            cut = max(cut, len(self._log) - LOG_LIMIT)
+            if cut > 0:
+                self._log_floor = max(self._log_floor, self._log_versions[cut - 1])
+                del self._log_versions[:cut]
+                del self._log[:cut]
+
+    def snapshot(self):
+        """다른 세션이 갱신하는 중에도 안전하게 읽을 수 있는 (노드 목록, (a, b, 관계 강도) 목록) 사본"""
+        with self._lock:
+            return sorted(self.nodes), [(a, b, strength) for (a, b), strength in self._edges.items()]
+
+    def choices(self):
+        """학생이 직접 고른 관계의 (고른 학생, 고른 친구, 관계 강도) 목록. 방향이 있습니다."""
+        with self._lock:
+            return [(student, friend, strength)
+                    for student, chosen in self._choices.items() for friend, strength in chosen.items()]
+
+    def responded(self):
+        """응답을 제출한 학생 번호 목록"""
+        with self._lock:
+            return sorted(self._choices)
+
+    def to_compact(self):
+        """현재 그래프를 배열 기반 CompactGraph로 내보냅니다."""
+        nodes, edges = self.snapshot()
+        return CompactGraph.from_edges(nodes, edges)
+
+    def export(self):
+        """(버전, CompactGraph, 방향 있는 선택 목록, 응답한 학생 목록)을 같은 시점 기준으로 돌려줍니다.
+
+        버전마다 한 번만 만들고, 버전이 그대로면 같은 객체를 돌려줍니다. (받는 쪽에서 고치지 않습니다)
+        """
+        with self._lock:
+            if self._export is None or self._export[0] != self.version:
+                self._export = (self.version, (self.version, self.to_compact(), self.choices(), self.responded()))
+            return self._export[1]
+
+    def to_networkx(self):
+        return self.to_compact().to_networkx()
@@ -0,0 +1,17 @@
+from pathlib import Path
+
+import streamlit.components.v1 as components
+
+# 관계 맵 컴포넌트 (vis.js)
+# 같은 key로 다시 부르면 브라우저의 iframe과 vis.js Network가 그대로 남으므로,
+# 서버는 바뀐 노드와 엣지만 보내고 브라우저가 DataSet에 update/remove로 반영합니다.
+# full=True로 보내면 브라우저가 가진 노드와 엣지를 버리고 이번에 보낸 것으로 새로 그립니다.
+# 컴포넌트의 값은 브라우저가 마지막으로 전체를 받은 generation입니다. (iframe이 새로 만들어져 그래프를 잃으면 -1)
+
+_component = components.declare_component("relation_map", path=str(Path(__file__).resolve().parent / "relation_map_frontend"))
+
+
+def relation_map(nodes, edges, removed, generation, full, options, height=750, bgcolor="#222222", key=None):
+    """nodes, edges: graph_render.graph_data() 또는 delta_data()의 결과, removed: 사라진 엣지 id 목록"""
+    return _component(nodes=nodes, edges=edges, removed=list(removed), generation=generation, full=full,
+                      options=options, height=height, bgcolor=bgcolor, key=key, default=None)
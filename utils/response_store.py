@@ -0,0 +1,139 @@
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+# 친구 관계 설문 응답 저장소 (SQLite, WAL 모드)
+# - 여러 세션이 동시에 제출해도 안전하도록 제출 하나를 트랜잭션 하나로 처리합니다.
+# - 같은 학생이 다시 제출하면 이전 응답을 덮어씁니다. (upsert)
+# - 학급마다 응답 집합의 버전을 두어, 바뀐 응답만 골라 읽거나 분석 결과를 캐시할 때 씁니다.
+
+DEFAULT_DB_PATH = Path(__file__).resolve().parent.parent / ".cache" / "friends.sqlite3"
+DEFAULT_CLASS_ID = "기본"
+
+# 질문 코드: room(수련회 방, 3명), pair(짝, 1명), talk(대화 상대, 모두)
+QUESTIONS = ("room", "pair", "talk")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS class_versions (
+    class_id TEXT PRIMARY KEY,
+    version INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS submissions (
+    class_id TEXT NOT NULL,
+    student_id INTEGER NOT NULL,
+    version INTEGER NOT NULL,
+    submitted_at REAL NOT NULL,
+    PRIMARY KEY (class_id, student_id)
+);
+CREATE INDEX IF NOT EXISTS submissions_by_version ON submissions (class_id, version);
+CREATE TABLE IF NOT EXISTS choices (
+    class_id TEXT NOT NULL,
+    student_id INTEGER NOT NULL,
+    question TEXT NOT NULL,
+    friend_id INTEGER NOT NULL,
+    PRIMARY KEY (class_id, student_id, question, friend_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS choices_by_friend ON choices (class_id, question, friend_id);
+"""
+
+
+class ResponseStore:
+    def __init__(self, path=None):
+        self.path = Path(path or os.environ.get("FRIEND_DB_PATH", DEFAULT_DB_PATH))
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # sqlite3 연결은 스레드 사이에 공유할 수 없으므로 스레드마다 따로 엽니다.
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # isolation_level=None: 트랜잭션을 직접 BEGIN/COMMIT 합니다.
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=30000")
+            self._local.conn = conn
+        return conn
+
+    def submit(self, student_id, room_friends, pair_friend, talk_friends, class_id=DEFAULT_CLASS_ID):
+        """응답을 저장하고(재제출이면 덮어쓰기) 학급의 새 버전 번호를 돌려줍니다."""
+        choices = [("room", f) for f in room_friends] + [("talk", f) for f in talk_friends]
+        if pair_friend:
+            choices.append(("pair", pair_friend))
+        rows = [(class_id, student_id, q, int(f)) for q, f in dict.fromkeys(choices) if int(f) != student_id]
+
+        conn = self._connect()
+        # BEGIN IMMEDIATE: 쓰기 잠금을 먼저 잡아, 동시에 제출한 세션끼리 버전 번호가 겹치지 않게 합니다.
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "INSERT INTO class_versions (class_id, version) VALUES (?, 1) "
+                "ON CONFLICT (class_id) DO UPDATE SET version = version + 1",
+                (class_id,),
+            )
+            version = conn.execute(
+                "SELECT version FROM class_versions WHERE class_id = ?", (class_id,)
+            ).fetchone()[0]
+            conn.execute("DELETE FROM choices WHERE class_id = ? AND student_id = ?", (class_id, student_id))
+            conn.executemany(
+                "INSERT INTO choices (class_id, student_id, question, friend_id) VALUES (?, ?, ?, ?)", rows
+            )
+            conn.execute(
+                "INSERT INTO submissions (class_id, student_id, version, submitted_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (class_id, student_id) DO UPDATE SET "
+                "version = excluded.version, submitted_at = excluded.submitted_at",
+                (class_id, student_id, version, time.time()),
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return version
+
+    def version(self, class_id=DEFAULT_CLASS_ID):
+        row = self._connect().execute(
+            "SELECT version FROM class_versions WHERE class_id = ?", (class_id,)
+        ).fetchone()
+        return row[0] if row else 0
+
+    def responses(self, class_id=DEFAULT_CLASS_ID, since_version=0):
+        """since_version 이후에 제출된 응답을 제출 순서대로 돌려줍니다. (기본값: 전체)
+
+        각 응답은 {'student_id', 'room_friends', 'pair_friend', 'talk_friends', 'version'} 형태입니다.
+        """
+        conn = self._connect()
+        # 같은 스냅샷에서 두 테이블을 읽도록 읽기 트랜잭션으로 묶습니다.
+        conn.execute("BEGIN")
+        try:
+            submissions = conn.execute(
+                "SELECT student_id, version FROM submissions WHERE class_id = ? AND version > ? ORDER BY version",
+                (class_id, since_version),
+            ).fetchall()
+            choices = conn.execute(
+                "SELECT c.student_id, c.question, c.friend_id FROM choices c "
+                "JOIN submissions s ON s.class_id = c.class_id AND s.student_id = c.student_id "
+                "WHERE c.class_id = ? AND s.version > ?",
+                (class_id, since_version),
+            ).fetchall()
+        finally:
+            conn.execute("COMMIT")
+
+        result = {
+            student: {"student_id": student, "room_friends": [], "pair_friend": None,
+                      "talk_friends": [], "version": version}
+            for student, version in submissions
+        }
+        for student, question, friend in choices:
+            response = result[student]
+            if question == "pair":
+                response["pair_friend"] = friend
+            else:
+                response[f"{question}_friends"].append(friend)
+        for response in result.values():
+            response["room_friends"].sort()
+            response["talk_friends"].sort()
+        return list(result.values())
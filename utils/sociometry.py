@@ -0,0 +1,182 @@
+import numpy as np
+import pandas as pd
+
+from utils.graph_core import EDGE_WEIGHTS
+
+# 학급 관계 분석 (소시오메트리)
+# 모은 응답으로 학생마다 다음 지표를 계산합니다.
+# - 받은 선택 수, 연결 수, 가중 연결 정도(관계 강도의 합)
+# - 짝(질문 2) 선택의 상호성
+# - 매개 중심성: 학생 수가 많으면 출발 학생을 표본으로 뽑아 근사합니다.
+# - 고유벡터 중심성: 거듭제곱법(power iteration)
+# - 모둠(커뮤니티): 가중치 레이블 전파(label propagation), 시드를 고정해 매번 같은 결과
+# - 고립 학생: 아무에게도 선택받지 못한 학생
+# 모든 계산은 CompactGraph의 배열 위에서 numpy로 하므로 학교 규모의 그래프도 몇 초 안에 끝납니다.
+
+PAIR_STRENGTH = 3  # 짝 선택의 관계 강도 (relation_graph.QUESTION_STRENGTH['pair_friend'])
+DEFAULT_BETWEENNESS_SAMPLES = 256  # 학생 수가 이보다 많으면 매개 중심성을 표본으로 근사합니다.
+
+
+def _expand(indptr, indices, frontier):
+    """CSR에서 frontier 노드들의 (출발, 도착) 이웃 쌍을 한 번에 꺼냅니다."""
+    starts = indptr[frontier]
+    counts = indptr[frontier + 1] - starts
+    total = int(counts.sum())
+    if total == 0:
+        return frontier[:0], frontier[:0]
+    offsets = np.repeat(starts - (np.cumsum(counts) - counts), counts)
+    return np.repeat(frontier, counts), indices[np.arange(total) + offsets]
+
+
+def betweenness(compact, samples=DEFAULT_BETWEENNESS_SAMPLES, seed=0):
+    """정규화한 매개 중심성 (가중치 없음, Brandes 알고리즘). (값 배열, 표본 근사 여부)
+
+    학생 수가 samples보다 많으면 출발 학생 samples명만 뽑아 계산하고 n / samples 배로 늘립니다.
+    너비 우선 탐색은 한 단계(거리)씩 배열 연산으로 처리합니다.
+    """
+    n = compact.n_nodes
+    result = np.zeros(n)
+    if n < 3:
+        return result, False
+    indptr, indices, _ = compact.csr()
+    sampled = n > samples
+    sources = np.random.default_rng(seed).choice(n, samples, replace=False) if sampled else np.arange(n)
+
+    for source in sources:
+        dist = np.full(n, -1, dtype=np.int64)
+        sigma = np.zeros(n)
+        dist[source] = 0
+        sigma[source] = 1
+        frontier = np.array([source])
+        levels = []  # 거리 단계마다 최단 경로 위의 (앞 노드, 뒤 노드) 쌍
+        depth = 0
+        while len(frontier):
+            heads, tails = _expand(indptr, indices, frontier)
+            unseen = tails[dist[tails] < 0]
+            dist[unseen] = depth + 1
+            on_path = dist[tails] == depth + 1
+            heads, tails = heads[on_path], tails[on_path]
+            np.add.at(sigma, tails, sigma[heads])
+            levels.append((heads, tails))
+            frontier = np.unique(unseen)
+            depth += 1
+
+        delta = np.zeros(n)
+        for heads, tails in reversed(levels):
+            np.add.at(delta, heads, sigma[heads] / sigma[tails] * (1 + delta[tails]))
+        delta[source] = 0
+        result += delta
+
+    # networkx.betweenness_centrality(normalized=True)와 같은 척도
+    scale = 1 / ((n - 1) * (n - 2))
+    if sampled:
+        scale *= n / samples
+    return result * scale, sampled
+
+
+def eigenvector(compact, max_iter=200, tol=1e-8):
+    """관계 강도를 가중치로 쓴 고유벡터 중심성 (거듭제곱법, 최댓값이 1이 되도록 정규화)"""
+    n = compact.n_nodes
+    if n == 0 or compact.n_edges == 0:
+        return np.zeros(n)
+    weights = EDGE_WEIGHTS[compact.kinds].astype(float)
+    x = np.full(n, 1.0 / n)
+    for _ in range(max_iter):
+        # (A + I) x: 자기 자신을 더해 두 무리로 나뉜 그래프에서도 값이 진동하지 않고 수렴하게 합니다.
+        y = (x
+             + np.bincount(compact.src, weights=weights * x[compact.dst], minlength=n)
+             + np.bincount(compact.dst, weights=weights * x[compact.src], minlength=n))
+        y /= np.linalg.norm(y)
+        if np.abs(y - x).sum() < n * tol:
+            x = y
+            break
+        x = y
+    # 아무와도 연결되지 않은 학생은 0으로 둡니다.
+    x[compact.degree() == 0] = 0
+    return x / x.max() if x.max() > 0 else x
+
+
+def label_propagation(compact, max_iter=30, seed=0):
+    """가중치 레이블 전파로 나눈 모둠 번호 (0부터, 큰 모둠 순). 시드가 같으면 결과도 같습니다."""
+    n = compact.n_nodes
+    labels = np.arange(n)
+    if compact.n_edges == 0:
+        return labels
+    indptr, indices, kinds = compact.csr()
+    weights = EDGE_WEIGHTS[kinds].astype(float)
+    rng = np.random.default_rng(seed)
+    active = np.flatnonzero(np.diff(indptr) > 0)
+
+    for _ in range(max_iter):
+        changed = False
+        for node in rng.permutation(active):
+            start, end = indptr[node], indptr[node + 1]
+            neighbor_labels = labels[indices[start:end]]
+            candidates, inverse = np.unique(neighbor_labels, return_inverse=True)
+            score = np.bincount(inverse, weights=weights[start:end])
+            best = candidates[score == score.max()]
+            # 지금 레이블이 최고 점수 중 하나면 그대로 두고, 아니면 가장 작은 번호를 고릅니다.
+            if labels[node] not in best:
+                labels[node] = best.min()
+                changed = True
+        if not changed:
+            break
+
+    # 모둠 번호를 큰 모둠부터 0, 1, 2, ... 로 다시 매깁니다.
+    unique, inverse, counts = np.unique(labels, return_inverse=True, return_counts=True)
+    rank = np.empty(len(unique), dtype=np.int64)
+    rank[np.lexsort((unique, -counts))] = np.arange(len(unique))
+    return rank[inverse]
+
+
+def analyze(compact, choices, responded=(), betweenness_samples=DEFAULT_BETWEENNESS_SAMPLES, seed=0):
+    """학급 관계 분석 결과
+
+    compact: CompactGraph (무방향, 관계 강도)
+    choices: (고른 학생, 고른 친구, 관계 강도) 목록 (방향 있음)
+    responded: 응답을 제출한 학생 번호 목록
+    """
+    labels = compact.labels
+    n = compact.n_nodes
+
+    choices = np.array(choices, dtype=np.int64).reshape(-1, 3)
+    chooser = np.searchsorted(labels, choices[:, 0])
+    chosen = np.searchsorted(labels, choices[:, 1])
+    received = np.bincount(chosen, minlength=n)
+
+    # 짝 선택의 상호성: 짝으로 고른 친구가 나를 짝으로 골랐는지
+    is_pair = choices[:, 2] == PAIR_STRENGTH
+    pair_codes = chooser[is_pair] * n + chosen[is_pair]
+    mutual = np.isin(pair_codes, chosen[is_pair] * n + chooser[is_pair])
+    mutual_pairs = sorted({
+        (int(min(labels[a], labels[b])), int(max(labels[a], labels[b])))
+        for a, b in zip(chooser[is_pair][mutual], chosen[is_pair][mutual])
+    })
+
+    bc, sampled = betweenness(compact, samples=betweenness_samples, seed=seed)
+    community = label_propagation(compact, seed=seed)
+    degree = compact.degree()
+
+    table = pd.DataFrame({
+        '학생': labels,
+        '받은 선택': received,
+        '연결 수': degree,
+        '관계 강도 합': compact.degree(weighted=True).astype(np.int64),
+        '매개 중심성': bc.round(4),
+        '고유벡터 중심성': eigenvector(compact).round(4),
+        # 다른 학생과 연결이 없는 학생은 모둠이 없습니다.
+        '모둠': np.where(degree > 0, community + 1, 0),
+        '응답': np.isin(labels, np.asarray(responded, dtype=np.int64)),
+    })
+    table['고립'] = table['받은 선택'] == 0
+
+    groups = table[table['모둠'] > 0].groupby('모둠')['학생'].apply(list)
+    return {
+        'table': table,
+        'communities': [members for members in groups.tolist() if len(members) > 1],
+        'isolates': table.loc[table['고립'], '학생'].tolist(),
+        'pair_choices': int(is_pair.sum()),
+        'mutual_pairs': mutual_pairs,
+        'pair_reciprocity': float(mutual.mean()) if is_pair.any() else 0.0,
+        'betweenness_sampled': sampled,
+    }
@@ -0,0 +1,101 @@
+import json
+import math
+from pathlib import Path
+
+import numpy as np
+
+# 관광지 공간 색인 (위도/경도 격자)
+# 관광지를 격자 칸에 나눠 담아 두고, 질의할 때는 질의 범위에 걸치는 칸의 관광지만 거리 계산합니다.
+# 관광지가 수천 곳으로 늘어나도 질의 비용은 주변 칸에 든 관광지 수에만 비례합니다.
+# 거리는 하버사인(haversine) 공식으로 구한 대원 거리(km)입니다.
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEG_LAT = math.pi * EARTH_RADIUS_KM / 180
+DEFAULT_CELL_KM = 5.0
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """두 지점(들) 사이의 대원 거리 (km). numpy 배열도 받습니다."""
+    lat1, lon1, lat2, lon2 = map(np.radians, (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def load_spots(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+class SpotIndex:
+    """관광지 목록의 격자 색인. 질의 결과는 (거리 km 또는 None, 관광지 dict) 목록입니다."""
+
+    def __init__(self, spots, cell_km=DEFAULT_CELL_KM):
+        self.spots = list(spots)
+        self.lats = np.array([s['lat'] for s in self.spots], dtype=float)
+        self.lons = np.array([s['lon'] for s in self.spots], dtype=float)
+        # 격자 칸 크기(도). 경도 방향은 관광지들의 평균 위도에서 cell_km가 되도록 잡습니다.
+        mid_lat = float(self.lats.mean()) if len(self.spots) else 0.0
+        self.cell_lat = cell_km / KM_PER_DEG_LAT
+        self.cell_lon = cell_km / (KM_PER_DEG_LAT * max(math.cos(math.radians(mid_lat)), 0.01))
+
+        rows, cols = self._cell(self.lats, self.lons)
+        self._cells = {}
+        for i, key in enumerate(zip(rows.tolist(), cols.tolist())):
+            self._cells.setdefault(key, []).append(i)
+        self._cells = {key: np.array(ids) for key, ids in self._cells.items()}
+
+    def __len__(self):
+        return len(self.spots)
+
+    def _cell(self, lat, lon):
+        return (np.floor(np.asarray(lat) / self.cell_lat).astype(np.int64),
+                np.floor(np.asarray(lon) / self.cell_lon).astype(np.int64))
+
+    def _candidates(self, south, west, north, east):
+        """위경도 범위에 걸치는 칸들에 든 관광지 번호"""
+        (r0, c0), (r1, c1) = self._cell(south, west), self._cell(north, east)
+        if (r1 - r0 + 1) * (c1 - c0 + 1) > len(self._cells):
+            # 범위가 넓으면 칸을 하나씩 보는 것보다 차 있는 칸을 훑는 편이 빠릅니다.
+            ids = [ids for (r, c), ids in self._cells.items() if r0 <= r <= r1 and c0 <= c <= c1]
+        else:
+            ids = [self._cells[(r, c)] for r in range(int(r0), int(r1) + 1) for c in range(int(c0), int(c1) + 1)
+                   if (r, c) in self._cells]
+        return np.concatenate(ids) if ids else np.array([], dtype=np.int64)
+
+    def _result(self, ids, dist=None):
+        if dist is None:
+            return [(None, self.spots[i]) for i in ids.tolist()]
+        return [(round(float(d), 2), self.spots[i]) for d, i in zip(dist.tolist(), ids.tolist())]
+
+    def within(self, lat, lon, radius_km):
+        """(lat, lon)에서 radius_km 안의 관광지 (가까운 순)"""
+        dlat = radius_km / KM_PER_DEG_LAT
+        dlon = radius_km / (KM_PER_DEG_LAT * max(math.cos(math.radians(min(abs(lat) + dlat, 89.9))), 0.01))
+        ids = self._candidates(lat - dlat, lon - dlon, lat + dlat, lon + dlon)
+        dist = haversine_km(lat, lon, self.lats[ids], self.lons[ids])
+        keep = dist <= radius_km
+        ids, dist = ids[keep], dist[keep]
+        order = np.argsort(dist, kind='stable')
+        return self._result(ids[order], dist[order])
+
+    def nearest(self, lat, lon, k=5):
+        """(lat, lon)에서 가까운 관광지 k곳 (가까운 순). 찾을 때까지 탐색 반경을 두 배씩 넓힙니다."""
+        k = min(k, len(self.spots))
+        if k <= 0:
+            return []
+        radius = max(self.cell_lat, self.cell_lon) * KM_PER_DEG_LAT
+        while True:
+            found = self.within(lat, lon, radius)
+            if len(found) >= k or radius > math.pi * EARTH_RADIUS_KM:
+                return found[:k]
+            radius *= 2
+
+    def bbox(self, south, west, north, east):
+        """위경도 사각형 안의 관광지 (입력 순서대로)"""
+        ids = self._candidates(south, west, north, east)
+        keep = (self.lats[ids] >= south) & (self.lats[ids] <= north) & (self.lons[ids] >= west) & (self.lons[ids] <= east)
+        return self._result(np.sort(ids[keep]))
+
+
+def load_index(path, cell_km=DEFAULT_CELL_KM):
+    return SpotIndex(load_spots(Path(path)), cell_km=cell_km)
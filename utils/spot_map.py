@@ -0,0 +1,56 @@
+import hashlib
+import json
+from html import escape
+
+from utils.media import thumbnail_url
+
+# 관광지 지도
+# 관광지 목록은 거의 바뀌지 않으므로, 지도 HTML은 목록 내용이 같으면 한 번만 만들어 재사용합니다.
+# spots_key()로 목록 내용의 해시를 구해 캐시 키로 쓰고, 목록이 바뀌었을 때만 다시 렌더링합니다.
+# folium은 지도를 실제로 렌더링할 때 불러오므로, 캐시된 지도를 쓰는 동안에는 페이지가 folium을 기다리지 않습니다.
+
+SAPPORO_CENTER = [43.0642, 141.3469]
+POPUP_IMAGE_WIDTH = 150
+
+
+def spots_key(spots):
+    """관광지 목록 내용의 해시. 순서와 값이 같으면 같은 키가 나옵니다."""
+    return hashlib.sha256(json.dumps(spots, ensure_ascii=False, sort_keys=True).encode()).hexdigest()
+
+
+def render_spot_map(spots, center=SAPPORO_CENTER, zoom_start=12, image_src=None):
+    """관광지 마커가 들어간 지도의 HTML 문자열
+
+    image_src: 원본 이미지 URL -> 팝업 <img src>에 넣을 주소 (기본값: 작은 크기의 원격 주소)
+    """
+    import folium
+    from folium.plugins import MarkerCluster
+
+    image_src = image_src or (lambda url: thumbnail_url(url, width=POPUP_IMAGE_WIDTH))
+    m = folium.Map(location=center, zoom_start=zoom_start, tiles="cartodbpositron")
+
+    # 마커 클러스터 추가 (마커가 많을 경우 유용)
+    marker_cluster = MarkerCluster().add_to(m)
+
+    # 관광지 마커 추가
+    for spot in spots:
+        # 관광지 목록은 JSON 파일에서 읽으므로, 이름과 설명은 HTML로 해석되지 않게 이스케이프합니다.
+        # 팝업 내용은 folium.IFrame(data: 주소 iframe) 대신 지도 문서에 바로 넣습니다.
+        # 그래야 정적 이미지의 상대 주소(app/static/...)가 Streamlit 서버 기준으로 풀립니다.
+        name = escape(spot['name'], quote=True)
+        html = f"""
+        <div style="width:200px;max-height:250px;overflow:auto;">
+        <h4>{name}</h4>
+        <img src="{escape(image_src(spot['image_url']), quote=True)}" loading="lazy" alt="{name}" style="width:150px;height:auto;"><br>
+        <p>{escape(spot['description'], quote=True)}</p>
+        </div>
+        """
+        popup = folium.Popup(html, max_width=260)
+        folium.Marker(
+            location=[spot['lat'], spot['lon']],
+            popup=popup,
+            tooltip=name,
+            icon=folium.Icon(color='red', icon='info-sign')
+        ).add_to(marker_cluster)
+
+    return folium.Figure().add_child(m).render()
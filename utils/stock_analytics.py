@@ -0,0 +1,91 @@
+import numpy as np
+import pandas as pd
+
+# 주가 분석 엔진
+# 컬럼(티커)마다 파이썬 루프를 돌지 않고, 전체 배열을 한 번에 계산합니다.
+# 티커 수백 개 × 수십 년 일별 데이터에서도 numpy 연산 몇 번으로 끝납니다.
+
+TRADING_DAYS_PER_YEAR = 252
+
+# 결측 날짜 처리 방식
+ALIGN_POLICIES = {
+    "rebase_first_valid": "티커별 첫 유효값 기준 (상장일이 달라도 모든 날짜 유지)",
+    "ffill": "직전 값으로 채우기 (모든 티커가 시작된 날부터)",
+    "intersect": "모든 티커에 값이 있는 날짜만",
+}
+
+
+def align(frame, policy="rebase_first_valid"):
+    """outer join으로 합쳐진 가격 표의 결측값을 정책에 맞게 정리합니다."""
+    if policy == "intersect":
+        return frame.dropna()
+    if policy == "ffill":
+        # 휴장일 차이로 생긴 빈칸은 직전 값으로 채우고, 상장 전 구간만 잘라냅니다.
+        return frame.ffill().dropna()
+    if policy == "rebase_first_valid":
+        # 상장 전 구간은 NaN으로 남겨두고, 중간 빈칸만 직전 값으로 채웁니다.
+        return frame.ffill()
+    raise ValueError(f"알 수 없는 정렬 방식입니다: {policy}")
+
+
+def first_valid_values(values):
+    # 각 컬럼에서 처음으로 NaN이 아닌 값. 값이 하나도 없으면 NaN.
+    valid = ~np.isnan(values)
+    first = valid.argmax(axis=0)
+    base = values[first, np.arange(values.shape[1])]
+    base[~valid.any(axis=0)] = np.nan
+    return base
+
+
+def rebase(frame):
+    """각 티커를 첫 유효값 대비 비율로 바꿉니다. 기준값이 0이거나 없는 티커 목록도 함께 돌려줍니다."""
+    values = frame.to_numpy(dtype="float64")
+    if values.size == 0:
+        return frame.astype("float64"), []
+    base = first_valid_values(values)
+    invalid = (base == 0) | np.isnan(base)
+    # 정규화할 수 없는 컬럼은 원본 값을 그대로 사용합니다.
+    rebased = values / np.where(invalid, 1.0, base)
+    return (
+        pd.DataFrame(rebased, index=frame.index, columns=frame.columns),
+        list(frame.columns[invalid]),
+    )
+
+
+def log_returns(frame):
+    values = frame.to_numpy(dtype="float64")
+    with np.errstate(divide="ignore", invalid="ignore"):
+        logs = np.log(values)
+    returns = np.full_like(logs, np.nan)
+    returns[1:] = logs[1:] - logs[:-1]
+    returns[~np.isfinite(returns)] = np.nan
+    return pd.DataFrame(returns, index=frame.index, columns=frame.columns)
+
+
+def rolling_volatility(frame, window=21, periods_per_year=TRADING_DAYS_PER_YEAR):
+    # 연율화한 이동 변동성 (로그 수익률의 이동 표준편차 × √252)
+    return log_returns(frame).rolling(window, min_periods=window).std() * np.sqrt(periods_per_year)
+
+
+def drawdown(frame):
+    # 이전 최고점 대비 하락률. fmax는 NaN을 건너뛰므로 상장 전 구간이 있어도 됩니다.
+    values = frame.to_numpy(dtype="float64")
+    if values.size == 0:
+        return frame.astype("float64")
+    peaks = np.fmax.accumulate(values, axis=0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        result = values / peaks - 1.0
+    return pd.DataFrame(result, index=frame.index, columns=frame.columns)
+
+
+def correlation(frame):
+    """일별 로그 수익률의 상관계수 행렬."""
+    returns = log_returns(frame).iloc[1:]
+    values = returns.to_numpy()
+    if len(values) > 1 and not np.isnan(values).any():
+        # 결측값이 없으면 numpy로 한 번에 계산합니다.
+        matrix = np.corrcoef(values, rowvar=False)
+        matrix = np.atleast_2d(matrix)
+        return pd.DataFrame(matrix, index=frame.columns, columns=frame.columns)
+    # 상장일이 달라 결측값이 있으면 티커 쌍마다 겹치는 구간으로 계산합니다.
+    return returns.corr(min_periods=2)
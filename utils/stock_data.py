@@ -0,0 +1,175 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+import pandas as pd
+
+# 주가 데이터 수집 계층
+# - PriceProvider: 데이터 공급자 인터페이스 (yfinance, 로컬 fixture 등으로 교체 가능)
+# - fetch_ranges: 티커마다 필요한 구간을 스레드 풀로 동시에 받습니다. (PriceStore가 부족한 구간만 넘깁니다)
+# - assemble_frame: 티커별 Series를 한 번의 concat으로 넓은 표로 만듭니다.
+# 페이지는 utils.prefetch(기본 티커)와 utils.ticker_cache(그 밖의 티커)를 거쳐 이 계층을 씁니다.
+
+DEFAULT_MAX_WORKERS = 8
+DEFAULT_TIMEOUT = 15   # 티커 1개 요청당 제한 시간 (초)
+DEFAULT_RETRIES = 2    # 실패 시 재시도 횟수
+EMPTY_DATA = "데이터가 비어 있습니다."
+
+# 글로벌 시총 상위 기업 티커 (변동될 수 있으므로 최신 정보로 업데이트 필요)
+DEFAULT_TICKERS = [
+    "AAPL",  # Apple
+    "MSFT",  # Microsoft
+    "GOOG",  # Alphabet (Google)
+    "AMZN",  # Amazon
+    "NVDA",  # NVIDIA
+    "META",  # Meta Platforms
+    "TSLA",  # Tesla
+    "BRK-A", # Berkshire Hathaway (Class A)
+    "LLY",   # Eli Lilly and Company
+    "JPM",   # JPMorgan Chase & Co.
+    "V",     # Visa Inc.
+    "JNJ"    # Johnson & Johnson
+]
+
+
+def default_tickers():
+    # STOCK_TICKERS 환경 변수(쉼표로 구분)로 티커 목록을 바꿀 수 있습니다. (벤치마크, 테스트용)
+    if os.environ.get("STOCK_TICKERS"):
+        return [t.strip() for t in os.environ["STOCK_TICKERS"].split(",") if t.strip()]
+    return list(DEFAULT_TICKERS)
+
+
+class PriceProvider:
+    """티커 하나의 일별 종가를 pd.Series(인덱스: 날짜)로 돌려주는 공급자."""
+
+    name = "base"
+
+    def history(self, ticker, start, end, timeout=None):
+        raise NotImplementedError
+
+
+class YFinanceProvider(PriceProvider):
+    name = "yfinance"
+
+    def history(self, ticker, start, end, timeout=None):
+        import yfinance as yf
+
+        # auto_adjust=False 여야 'Adj Close' 컬럼이 함께 내려옵니다.
+        data = yf.Ticker(ticker).history(
+            start=start, end=end, auto_adjust=False, timeout=timeout or DEFAULT_TIMEOUT
+        )
+        return close_series(data)
+
+
+class FixtureProvider(PriceProvider):
+    """로컬 CSV(<티커>.csv, Date/Close 컬럼) 또는 메모리의 Series로 yfinance를 대신합니다.
+
+    테스트나 벤치마크에서 네트워크 없이 같은 코드 경로를 돌릴 때 사용합니다.
+    """
+
+    name = "fixture"
+
+    def __init__(self, directory=None, series=None, delay=0.0):
+        self.directory = directory
+        self.series = dict(series or {})
+        self.delay = delay  # 네트워크 지연 흉내 (초)
+
+    def history(self, ticker, start, end, timeout=None):
+        if self.delay:
+            time.sleep(self.delay)
+        if ticker in self.series:
+            data = self.series[ticker]
+        elif self.directory is not None:
+            path = os.path.join(self.directory, f"{ticker}.csv")
+            if not os.path.exists(path):
+                return pd.Series(dtype="float64")
+            data = pd.read_csv(path, index_col=0, parse_dates=True)
+        else:
+            return pd.Series(dtype="float64")
+        if isinstance(data, pd.DataFrame):
+            data = close_series(data)
+        data = _naive_daily_index(data)
+        return data[(data.index >= pd.Timestamp(start).normalize()) & (data.index < pd.Timestamp(end))]
+
+
+def close_series(data):
+    # 'Adj Close'가 있으면 우선 사용하고, 없으면 'Close'를 사용합니다.
+    if data is None or data.empty:
+        return pd.Series(dtype="float64")
+    for col in ("Adj Close", "Close"):
+        if col in data.columns:
+            return _naive_daily_index(data[col].astype("float64"))
+    return pd.Series(dtype="float64")
+
+
+def _naive_daily_index(series):
+    # 거래소마다 다른 시간대를 없애고 날짜 단위로 맞춰야 티커끼리 정렬됩니다.
+    index = pd.DatetimeIndex(series.index)
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    series = series.copy()
+    series.index = index.normalize()
+    return series[~series.index.duplicated(keep="last")].sort_index()
+
+
+def get_default_provider():
+    # STOCK_PROVIDER 환경 변수로 공급자를 바꿀 수 있습니다. 예) fixture:/tmp/prices
+    spec = os.environ.get("STOCK_PROVIDER", "yfinance")
+    if spec.startswith("fixture:"):
+        return FixtureProvider(directory=spec.split(":", 1)[1])
+    return YFinanceProvider()
+
+
+def _fetch_one(provider, ticker, start, end, timeout, retries, backoff):
+    last_error = None
+    for attempt in range(retries + 1):
+        try:
+            series = provider.history(ticker, start, end, timeout=timeout)
+            return series, None
+        except Exception as e:
+            last_error = e
+            if attempt < retries:
+                time.sleep(backoff * (2 ** attempt))
+    return None, f"다운로드 오류: {last_error}"
+
+
+def fetch_ranges(jobs, provider=None, max_workers=DEFAULT_MAX_WORKERS,
+                 timeout=DEFAULT_TIMEOUT, retries=DEFAULT_RETRIES, backoff=0.5):
+    """{티커: (시작, 끝)} 요청을 동시에 처리해 ({티커: Series}, {티커: 실패 사유})를 돌려줍니다."""
+    provider = provider or get_default_provider()
+    results, failed = {}, {}
+    if not jobs:
+        return results, failed
+
+    executor = ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(jobs))))
+    futures = {
+        executor.submit(_fetch_one, provider, ticker, start, end, timeout, retries, backoff): ticker
+        for ticker, (start, end) in jobs.items()
+    }
+    # 재시도까지 포함한 전체 마감 시간. 가장 느린 티커 하나가 전체 시간을 결정합니다.
+    deadline = timeout * (retries + 1) + backoff * (2 ** retries)
+    done, not_done = wait(futures, timeout=deadline)
+    executor.shutdown(wait=False, cancel_futures=True)
+
+    for future in done:
+        ticker = futures[future]
+        series, error = future.result()
+        if error is not None:
+            failed[ticker] = error
+        elif series is None or series.empty:
+            failed[ticker] = EMPTY_DATA
+        else:
+            results[ticker] = series
+    for future in not_done:
+        failed[futures[future]] = f"{deadline:.0f}초 안에 응답이 없습니다."
+    # 완료 순서와 관계없이 요청한 순서대로 실패 목록을 정리합니다.
+    return results, {t: failed[t] for t in jobs if t in failed}
+
+
+def assemble_frame(series_by_ticker, order):
+    # 루프 안에서 join을 반복하지 않고 마지막에 한 번만 concat 합니다.
+    columns = [series_by_ticker[t].rename(t) for t in order if t in series_by_ticker]
+    if not columns:
+        return pd.DataFrame()
+    return pd.concat(columns, axis=1, join="outer").sort_index()
+
@@ -0,0 +1,68 @@
+import threading
+import time
+from collections import OrderedDict
+
+import pandas as pd
+
+# 티커 단위 메모리 캐시
+# 키는 (티커, 거래일 기준 시작, 거래일 기준 끝) 입니다. 선택 목록 전체가 아니라 티커마다 캐시하므로,
+# 멀티셀렉트에서 티커를 빼거나 순서를 바꿔도 다시 받지 않고, 새로 추가된 티커만 받아옵니다.
+# 주가 페이지에서는 미리 받아 두는 기본 티커(utils.prefetch) 밖의, 사이드바에서 직접 추가한 티커에 씁니다.
+
+DEFAULT_MAX_ENTRIES = 512
+DEFAULT_TTL = 60 * 60  # 초
+
+
+def trading_day_range(start, end):
+    """[start, end) 구간을 거래일(평일) 경계로 맞춥니다. 주말만 다른 두 구간은 같은 키가 됩니다."""
+    start = pd.Timestamp(start).normalize()
+    if start.weekday() >= 5:
+        start += pd.offsets.BDay(1)
+    last = (pd.Timestamp(end) - pd.Timedelta(days=1)).normalize()
+    if last.weekday() >= 5:
+        last -= pd.offsets.BDay(1)
+    return start, last + pd.Timedelta(days=1)
+
+
+class TickerCache:
+    def __init__(self, store, max_entries=DEFAULT_MAX_ENTRIES, ttl=DEFAULT_TTL):
+        self.store = store
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()  # 키 -> (저장 시각, Series)
+        self._lock = threading.Lock()
+
+    def _lookup(self, key, now):
+        entry = self._entries.get(key)
+        if entry is None or now - entry[0] > self.ttl:
+            return None
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    def get_series(self, tickers, start, end, provider=None, **fetch_kwargs):
+        """캐시에 없는 티커만 저장소에서 받아 {티커: Series}, {티커: 실패 사유}를 돌려줍니다."""
+        start, end = trading_day_range(start, end)
+        tickers = list(dict.fromkeys(tickers))
+        now = time.time()
+
+        series, missing = {}, []
+        with self._lock:
+            for ticker in tickers:
+                hit = self._lookup((ticker, start, end), now)
+                if hit is None:
+                    missing.append(ticker)
+                else:
+                    series[ticker] = hit
+
+        failed = {}
+        if missing:
+            fetched, failed = self.store.get_prices(missing, start, end, provider, **fetch_kwargs)
+            with self._lock:
+                for ticker, values in fetched.items():
+                    self._entries[(ticker, start, end)] = (now, values)
+                    self._entries.move_to_end((ticker, start, end))
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+            series.update(fetched)
+        return series, failed
+
@@ -0,0 +1,94 @@
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+
+import pandas as pd
+import streamlit as st
+
+# 업로드 파일 캐시 (내용 주소 방식)
+# 업로드된 파일의 바이트를 해시한 값을 키로, 파싱과 검증을 마친 DataFrame을 Feather(Arrow) 파일로 저장합니다.
+# 슬라이더나 멀티셀렉트를 움직여 스크립트가 다시 실행되어도, 다른 세션에서 같은 파일을 올려도
+# 엑셀을 다시 파싱하지 않고 Feather 파일을 바로 읽습니다.
+# 전체 크기가 max_bytes를 넘으면 가장 오래 쓰지 않은 파일부터 지웁니다. (LRU)
+
+DEFAULT_CACHE_DIR = Path(__file__).resolve().parent.parent / ".cache" / "uploads"
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+FORMAT_VERSION = 1  # 파싱 방식이 바뀌면 올려서 예전 캐시를 쓰지 않게 합니다.
+
+
+def content_key(data, schema):
+    # 같은 파일이라도 페이지마다 읽는 컬럼과 자료형(schema)이 다르므로 키에 함께 넣습니다.
+    digest = hashlib.sha256(data)
+    digest.update(json.dumps([FORMAT_VERSION, schema], ensure_ascii=False, sort_keys=True).encode())
+    return digest.hexdigest()
+
+
+def upload_key(uploaded_file, schema):
+    """업로드 파일의 캐시 키. 한 세션에서 같은 업로드는 바이트를 한 번만 해시합니다."""
+    memo = st.session_state.setdefault("_upload_keys", {})
+    file_id = getattr(uploaded_file, "file_id", None) or (uploaded_file.name, uploaded_file.size)
+    memo_key = (file_id, json.dumps(schema, ensure_ascii=False, sort_keys=True))
+    if memo_key not in memo:
+        memo[memo_key] = content_key(uploaded_file.getvalue(), schema)
+    return memo[memo_key]
+
+
+class UploadCache:
+    def __init__(self, root=None, max_bytes=DEFAULT_MAX_BYTES):
+        self.root = Path(root or os.environ.get("UPLOAD_CACHE_DIR", DEFAULT_CACHE_DIR))
+        self.max_bytes = max_bytes
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, key):
+        return self.root / f"{key}.feather"
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            df = pd.read_feather(path)
+        except (FileNotFoundError, OSError, ValueError):
+            # 없거나, 다른 프로세스가 지우는 중이거나, 손상된 파일은 캐시 미스로 봅니다.
+            return None
+        # 최근 사용 시각을 갱신해 LRU 정리에서 뒤로 밀리게 합니다.
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return df
+
+    def put(self, key, df):
+        path = self._path(key)
+        # 여러 세션(스레드)이 같은 파일을 동시에 올려도 서로의 임시 파일을 덮어쓰지 않게 스레드 id까지 붙입니다.
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        df.reset_index(drop=True).to_feather(tmp)
+        os.replace(tmp, path)
+        self.evict()
+
+    def evict(self):
+        entries = []
+        for path in self.root.glob("*.feather"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def get_or_parse(self, key, parse):
+        """캐시에 있으면 바로 돌려주고, 없으면 parse()로 읽어 저장한 뒤 돌려줍니다. (캐시 적중 여부, DataFrame)"""
+        df = self.get(key)
+        if df is not None:
+            return True, df
+        df = parse()
+        self.put(key, df)
+        return False, df
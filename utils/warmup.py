@@ -0,0 +1,55 @@
+import importlib
+import logging
+import os
+import sys
+import threading
+import time
+
+# 무거운 라이브러리 미리 불러오기
+# 페이지들은 folium, plotly, yfinance, pyvis 같은 무거운 라이브러리를 실제로 쓰는 순간에 불러옵니다.
+# 그래서 첫 화면은 빨리 뜨지만, 다른 페이지로 처음 넘어갈 때 그 import 시간을 기다려야 합니다.
+# start()는 서버 프로세스마다 한 번, 백그라운드 스레드에서 이 라이브러리들을 미리 불러 둡니다.
+# main.py가 첫 화면을 다 그린 뒤에 부르고, APP_WARMUP=0이면 아무것도 하지 않습니다.
+
+HEAVY_MODULES = (
+    "folium",
+    "folium.plugins",
+    "plotly.express",
+    "yfinance",
+    "pyvis.network",
+    "openpyxl",
+    "PIL.Image",
+)
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_thread = None
+timings = {}  # 모듈 이름 -> 불러오는 데 걸린 시간 (초). 이미 불러와 있던 모듈은 없습니다.
+
+
+def _preload(modules):
+    for name in modules:
+        if name in sys.modules:
+            continue
+        start = time.perf_counter()
+        try:
+            importlib.import_module(name)
+        except Exception as e:  # 설치되지 않은 선택 라이브러리는 건너뜁니다.
+            logger.info("미리 불러오지 못했습니다: %s (%s)", name, e)
+            continue
+        timings[name] = time.perf_counter() - start
+        time.sleep(0)  # 모듈 사이에 요청을 처리하는 스레드에게 차례를 넘깁니다.
+    logger.info("미리 불러오기 완료: %s", ", ".join(f"{n} {t:.2f}s" for n, t in timings.items()) or "없음")
+
+
+def start(modules=HEAVY_MODULES):
+    """백그라운드에서 modules를 불러오는 스레드를 (프로세스마다 한 번만) 시작합니다. 스레드 또는 None"""
+    global _thread
+    if os.environ.get("APP_WARMUP", "1") == "0":
+        return None
+    with _lock:
+        if _thread is None:
+            _thread = threading.Thread(target=_preload, args=(tuple(modules),), name="import-warmup", daemon=True)
+            _thread.start()
+    return _thread